@@ -0,0 +1,395 @@
+import argparse
+import asyncio
+import itertools
+import json
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from olay_gunlugu import log
+from web_soket import (WebSoket, WebSoketHatasi, http_istegi_oku, http_yaniti, yukseltme_istegi_mi,
+                       yukseltme_yaniti)
+
+VARSAYILAN_PORT = 8765
+
+# İkili mesajın başında JPEG imzası yoksa ilk 8 bayt karenin zamanıdır (float64, little endian)
+_JPEG_IMZASI = b"\xff\xd8"
+_ZAMAN = struct.Struct("<d")
+
+
+# Tarayıcı istemcisi: kamerayı açar, her yanıttan sonra bir sonraki kareyi JPEG olarak gönderir
+_ISTEMCI_SAYFASI = """<!DOCTYPE html>
+<html lang="tr"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>Spor Hareket Analizi</title>
+<style>body{font-family:sans-serif;margin:1em}video{max-width:100%}#sayac{font-size:3em}</style>
+</head><body>
+<video id="video" autoplay playsinline muted></video>
+<div id="sayac">0</div><div id="mesaj">Kamera açılıyor...</div>
+<script>
+const video = document.getElementById("video");
+const tuval = document.createElement("canvas");
+const ws = new WebSocket(`ws://${location.host}/analiz${location.search}`);
+function gonder() {
+  tuval.width = video.videoWidth; tuval.height = video.videoHeight;
+  tuval.getContext("2d").drawImage(video, 0, 0);
+  tuval.toBlob(b => ws.send(b), "image/jpeg", 0.7);
+}
+ws.onmessage = e => {
+  const y = JSON.parse(e.data);
+  document.getElementById("sayac").textContent = y.mod ? `${y.mod}: ${y.sayaclar[y.mod]}` : "-";
+  document.getElementById("mesaj").textContent = y.aciklamalar || y.hata || "";
+  gonder();
+};
+navigator.mediaDevices.getUserMedia({video: {width: 640}}).then(akis => {
+  video.srcObject = akis;
+  video.onloadeddata = () => ws.readyState === 1 ? gonder() : ws.onopen = gonder;
+});
+</script></body></html>
+"""
+
+
+def kare_mesaji(jpeg, zaman=None):
+    """Sunucuya gönderilecek ikili kare mesajı; zaman verilmezse sunucunun saati kullanılır"""
+    return jpeg if zaman is None else _ZAMAN.pack(zaman) + jpeg
+
+
+class PartiliCikarim:
+    """Bağlantıların karelerini tek çıkarım thread'inde ortak partilerle modele verir.
+
+    Her oturum bir sonraki kareyi sonucunu aldıktan sonra gönderir; bu yüzden
+    bir partide oturum başına en fazla bir kare olur. Parti, kare gönderen bütün
+    oturumların karesi gelene, en_buyuk_parti'ye ulaşana veya ilk kareden sonra
+    bekleme_suresi dolana kadar toplanır. Model çalışırken gelen kareler sonraki
+    partide birikir; oturum sayısı arttıkça partiler kendiliğinden büyür.
+    """
+
+    def __init__(self, cikarim, en_buyuk_parti=8, bekleme_suresi=0.005):
+        self.cikarim = cikarim
+        self.en_buyuk_parti = max(1, en_buyuk_parti)
+        self.bekleme_suresi = bekleme_suresi
+        # Model thread güvenli değil; çıkarımlar tek thread'de sırayla yapılır
+        self._yurutucu = ThreadPoolExecutor(1, thread_name_prefix="sunucu-cikarim")
+        self._kuyruk = None
+        self._gorev = None
+        # Kare gönderen açık oturum sayısı; parti bu kadar kareyi beklemez
+        self.kaynak_sayisi = 0
+
+        self.parti_sayisi = 0
+        self.kare_sayisi = 0
+        self.cikarim_suresi = 0.0
+
+    def baslat(self):
+        self._kuyruk = asyncio.Queue()
+        self._gorev = asyncio.get_running_loop().create_task(self._dongu())
+
+    async def durdur(self):
+        if self._gorev is not None:
+            self._gorev.cancel()
+            try:
+                await self._gorev
+            except asyncio.CancelledError:
+                pass
+            self._gorev = None
+        self._yurutucu.shutdown(wait=True)
+
+    async def cikar(self, frame):
+        """Kareyi sıradaki partiye ekler, partinin o kareye ait sonucunu döndürür"""
+        gelecek = asyncio.get_running_loop().create_future()
+        self._kuyruk.put_nowait((frame, gelecek))
+        return await gelecek
+
+    async def _dongu(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            parti = [await self._kuyruk.get()]
+            son = loop.time() + self.bekleme_suresi
+            while len(parti) < min(self.en_buyuk_parti, max(1, self.kaynak_sayisi)):
+                if not self._kuyruk.empty():
+                    parti.append(self._kuyruk.get_nowait())
+                    continue
+                kalan = son - loop.time()
+                if kalan <= 0:
+                    break
+                try:
+                    parti.append(await asyncio.wait_for(self._kuyruk.get(), kalan))
+                except asyncio.TimeoutError:
+                    break
+
+            baslangic = time.perf_counter()
+            try:
+                sonuclar = await loop.run_in_executor(self._yurutucu, self.cikarim,
+                                                      [frame for frame, _ in parti])
+            except Exception as hata:
+                # Partideki oturumlar hatayı görür; sunucu diğer partilerle sürer
+                for _, gelecek in parti:
+                    if not gelecek.done():
+                        gelecek.set_exception(hata)
+                continue
+            self.cikarim_suresi += time.perf_counter() - baslangic
+            self.parti_sayisi += 1
+            self.kare_sayisi += len(parti)
+            for (_, gelecek), sonuc in zip(parti, sonuclar):
+                # Bağlantısı kopan oturumun beklemesi iptal edilmiş olabilir
+                if not gelecek.done():
+                    gelecek.set_result(sonuc)
+
+    def istatistik(self):
+        return {
+            "parti_sayisi": self.parti_sayisi,
+            "kare_sayisi": self.kare_sayisi,
+            "ortalama_parti": self.kare_sayisi / self.parti_sayisi if self.parti_sayisi else 0,
+            "cikarim_fps": self.kare_sayisi / self.cikarim_suresi if self.cikarim_suresi > 0 else 0
+        }
+
+
+class AnalizOturumu:
+    """Tek bağlantının sayaçları ve durum makinesi.
+
+    Gelen her kare veya keypoint mesajı sırayla analiz edilir ve karşılığında
+    sayaçlar ile açıklama mesajı döner.
+    """
+
+    def __init__(self, ad, mod, yumusat=False):
+        from spor_gui import SporHareketAnalizi
+        from yumusatma import KeypointYumusatici
+
+        self.ad = ad
+        # Model analizcide kullanılmaz; çıkarım sunucunun ortak partilerinde yapılır
+        self.analiz = SporHareketAnalizi(model=object())
+        self.analiz.kaynak = ad
+        self.analiz.mod_degistir(mod)
+        self.yumusatici = KeypointYumusatici() if yumusat else None
+        self.kare_no = -1
+        self.goruntu_gonderdi = False
+
+    def isle(self, keypoints, frame_height, zaman=None):
+        self.kare_no += 1
+        if zaman is None:
+            zaman = time.time()
+        if keypoints is not None and self.yumusatici is not None:
+            keypoints = self.yumusatici.tek(keypoints, zaman, frame_height)
+        mesaj, sayildi = self.analiz.hareket_analiz(keypoints, frame_height, zaman, kare_no=self.kare_no)
+        return self.yanit(aciklamalar=mesaj, sayildi=sayildi, kisi=keypoints is not None)
+
+    def yanit(self, **alanlar):
+        return dict({
+            "kare": self.kare_no,
+            "mod": self.analiz.aktif_mod,
+            "otomatik": self.analiz.otomatik,
+            "sayaclar": dict(self.analiz.sayaclar),
+        }, **alanlar)
+
+
+class AnalizSunucusu:
+    """Kareleri veya keypoint'leri WebSocket üzerinden alıp sayaçları geri akıtan sunucu.
+
+    /analiz adresine açılan her WebSocket bağlantısı kendi AnalizOturumu'nu alır
+    (?mod=squat ile mod, ?yumusat=1 ile süzgeç seçilir). Mesajlar:
+
+    - ikili: JPEG kare; başında JPEG imzası yoksa ilk 8 bayt karenin zamanıdır
+      (bkz. kare_mesaji). Kareler PartiliCikarim ile diğer oturumlarınkilerle
+      aynı partide modele verilir.
+    - metin (JSON): {"keypoints": (17, 3) liste, "frame_height": h, "zaman": sn}
+      modeli hiç çalıştırmadan analiz edilir; {"mod": ad} modu değiştirir,
+      {"sifirla": true} sayaçları sıfırlar.
+
+    Her mesaja {"kare", "mod", "otomatik", "sayaclar", "aciklamalar", "sayildi",
+    "kisi"} alanlı bir JSON yanıt döner. GET /durum sunucu istatistiklerini, GET /
+    kamerayı açıp kareleri gönderen tarayıcı sayfasını verir.
+    """
+
+    def __init__(self, cikarim, mod, yumusat=False, en_buyuk_parti=8, bekleme_suresi=0.005):
+        from spor_gui import ilk_kisi_keypoints
+
+        self._ilk_kisi_keypoints = ilk_kisi_keypoints
+        self.mod = mod
+        self.yumusat = yumusat
+        self.cikarim = PartiliCikarim(cikarim, en_buyuk_parti, bekleme_suresi)
+        self._sunucu = None
+        self.port = None
+        self._oturum_no = itertools.count(1)
+        self.oturumlar = {}
+        self.mesaj_sayisi = 0
+        self.baslangic = time.perf_counter()
+
+    async def baslat(self, host="127.0.0.1", port=VARSAYILAN_PORT):
+        self.cikarim.baslat()
+        self._sunucu = await asyncio.start_server(self._baglanti, host, port)
+        self.port = self._sunucu.sockets[0].getsockname()[1]
+        self.baslangic = time.perf_counter()
+        return self.port
+
+    async def kapat(self):
+        if self._sunucu is not None:
+            self._sunucu.close()
+            await self._sunucu.wait_closed()
+        await self.cikarim.durdur()
+
+    async def _baglanti(self, reader, writer):
+        try:
+            yontem, yol, sorgu, basliklar = await http_istegi_oku(reader)
+        except (WebSoketHatasi, ConnectionError):
+            writer.close()
+            return
+        if yol == "/analiz" and yukseltme_istegi_mi(basliklar):
+            writer.write(yukseltme_yaniti(basliklar))
+            await writer.drain()
+            await self._oturum(WebSoket(reader, writer), sorgu, writer.get_extra_info("peername"))
+            return
+        if yontem == "GET" and yol == "/durum":
+            writer.write(http_yaniti("200 OK", json.dumps(self.istatistik(), ensure_ascii=False),
+                                     "application/json"))
+        elif yontem == "GET" and yol == "/":
+            writer.write(http_yaniti("200 OK", _ISTEMCI_SAYFASI, "text/html; charset=utf-8"))
+        else:
+            writer.write(http_yaniti("404 Not Found", "Bulunamadı\n"))
+        await writer.drain()
+        writer.close()
+
+    async def _oturum(self, soket, sorgu, adres):
+        from egzersiz_tanima import OTOMATIK
+        from spor_gui import MODLAR
+
+        mod = sorgu.get("mod", self.mod)
+        if mod not in MODLAR + [OTOMATIK]:
+            await soket.gonder(json.dumps({"hata": f"Bilinmeyen mod: {mod}"}))
+            await soket.kapat(1008)
+            return
+        ad = f"oturum-{next(self._oturum_no)}"
+        oturum = AnalizOturumu(ad, mod, sorgu.get("yumusat") == "1" or self.yumusat)
+        self.oturumlar[ad] = oturum
+        log.info("Oturum açıldı: %s (%s)", ad, adres, extra={"olay": "oturum", "oturum": ad, "mod": mod})
+        try:
+            while True:
+                mesaj = await soket.al()
+                if mesaj is None:
+                    break
+                self.mesaj_sayisi += 1
+                try:
+                    yanit = await self._mesaji_isle(oturum, mesaj)
+                except (ValueError, KeyError, TypeError) as hata:
+                    yanit = oturum.yanit(hata=f"Geçersiz mesaj: {hata}")
+                await soket.gonder(json.dumps(yanit, ensure_ascii=False))
+        except (WebSoketHatasi, ConnectionError) as hata:
+            log.warning("Oturum %s bağlantı hatası: %s", ad, hata)
+        finally:
+            if oturum.goruntu_gonderdi:
+                self.cikarim.kaynak_sayisi -= 1
+            del self.oturumlar[ad]
+            await soket.kapat()
+            log.info("Oturum kapandı: %s, %d kare", ad, oturum.kare_no + 1,
+                     extra={"olay": "oturum_sonu", "oturum": ad, "sayaclar": dict(oturum.analiz.sayaclar)})
+
+    async def _mesaji_isle(self, oturum, mesaj):
+        if isinstance(mesaj, bytes):
+            zaman = None
+            if not mesaj.startswith(_JPEG_IMZASI):
+                if len(mesaj) < _ZAMAN.size:
+                    raise ValueError(f"ikili mesaj en az {_ZAMAN.size} bayt olmalı, gelen {len(mesaj)}")
+                zaman, = _ZAMAN.unpack_from(mesaj)
+                mesaj = mesaj[_ZAMAN.size:]
+            # Çözme GIL'i bırakır; olay döngüsü diğer oturumlara devam eder
+            frame = await asyncio.get_running_loop().run_in_executor(
+                None, cv2.imdecode, np.frombuffer(mesaj, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError("JPEG çözülemedi")
+            if not oturum.goruntu_gonderdi:
+                oturum.goruntu_gonderdi = True
+                self.cikarim.kaynak_sayisi += 1
+            sonuc = await self.cikarim.cikar(frame)
+            return oturum.isle(self._ilk_kisi_keypoints([sonuc]), frame.shape[0], zaman)
+
+        istek = json.loads(mesaj)
+        if not isinstance(istek, dict):
+            raise ValueError(f"JSON nesnesi bekleniyordu, gelen {type(istek).__name__}")
+        if "keypoints" in istek:
+            keypoints = np.asarray(istek["keypoints"], dtype=np.float32)
+            if keypoints.shape != (17, 3):
+                raise ValueError(f"keypoints (17, 3) olmalı, gelen {keypoints.shape}")
+            zaman = istek.get("zaman")
+            if zaman is not None:
+                zaman = float(zaman)
+            return oturum.isle(keypoints, float(istek["frame_height"]), zaman)
+        if "mod" in istek:
+            from egzersiz_tanima import OTOMATIK
+            from spor_gui import MODLAR
+
+            if istek["mod"] not in MODLAR + [OTOMATIK]:
+                return oturum.yanit(hata=f"Bilinmeyen mod: {istek['mod']}")
+            oturum.analiz.mod_degistir(istek["mod"])
+        if istek.get("sifirla"):
+            oturum.analiz.sifirla()
+        return oturum.yanit()
+
+    def istatistik(self):
+        gecen = time.perf_counter() - self.baslangic
+        return {
+            "oturum_sayisi": len(self.oturumlar),
+            "mesaj_sayisi": self.mesaj_sayisi,
+            "mesaj_hizi": self.mesaj_sayisi / gecen if gecen > 0 else 0,
+            "cikarim": self.cikarim.istatistik(),
+            "oturumlar": {ad: oturum.yanit() for ad, oturum in self.oturumlar.items()},
+        }
+
+
+def sunucu_main(argv):
+    """python spor_gui.py sunucu komutunu çalıştırır"""
+    import model_deposu
+    from egzersiz_tanima import OTOMATIK
+    from model_deposu import CIKARIM_AYARLARI
+    from olay_gunlugu import gunlugu_kur
+    from spor_gui import (MODLAR, arka_uc_argumanlari_ekle, olay_veritabani_argumani_ekle,
+                          olay_veritabanini_kapat, yumusatma_argumani_ekle)
+
+    parser = argparse.ArgumentParser(prog="spor_gui.py sunucu",
+                                     description="Kareleri veya keypoint'leri WebSocket üzerinden alıp "
+                                                 "tekrar sayan analiz sunucusu")
+    parser.add_argument("--host", default="127.0.0.1", help="Dinlenecek adres (varsayılan: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=VARSAYILAN_PORT,
+                        help=f"Dinlenecek port (varsayılan: {VARSAYILAN_PORT})")
+    parser.add_argument("--mode", default=OTOMATIK, choices=MODLAR + [OTOMATIK],
+                        help="Oturumların varsayılan modu; istemci ?mod= ile değiştirebilir")
+    parser.add_argument("--parti", type=int, default=8,
+                        help="Bir çıkarımdaki en fazla kare sayısı (varsayılan: 8)")
+    parser.add_argument("--bekleme-ms", type=float, default=5.0,
+                        help="Parti dolmadıysa diğer oturumların karesini bekleme süresi (varsayılan: 5)")
+    parser.add_argument("--log-seviye", default="INFO",
+                        help="Konsola yazılacak en düşük günlük seviyesi (varsayılan: INFO)")
+    yumusatma_argumani_ekle(parser)
+    arka_uc_argumanlari_ekle(parser)
+    olay_veritabani_argumani_ekle(parser)
+    args = parser.parse_args(argv)
+    gunlugu_kur(args.log_seviye, veritabani_yolu=args.olay_db)
+    model_deposu.arka_uc_sec(args.arka_uc)
+    model_deposu.imgsz_sec(args.imgsz)
+
+    # Model ilk bağlantıyı bekletmesin diye baştan yüklenir
+    model = model_deposu.model_al()
+
+    def cikarim(kareler):
+        return model(kareler, verbose=False, **CIKARIM_AYARLARI)
+
+    async def calistir():
+        sunucu = AnalizSunucusu(cikarim, args.mode, args.yumusat, args.parti, args.bekleme_ms / 1000)
+        try:
+            port = await sunucu.baslat(args.host, args.port)
+        except OSError as hata:
+            print(f"Sunucu başlatılamadı: {hata}", file=sys.stderr)
+            return 1
+        print(f"Analiz sunucusu: ws://{args.host}:{port}/analiz | tarayıcı: http://{args.host}:{port}/ | "
+              f"durum: http://{args.host}:{port}/durum")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await sunucu.kapat()
+
+    try:
+        return asyncio.run(calistir())
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        olay_veritabanini_kapat()
@@ -0,0 +1,184 @@
+import glob
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# "onnx-int8" gibi adlar arka uç + nicemleme olarak ayrıştırılır
+ARKA_UCLAR = ["pytorch", "onnx", "onnx-int8", "openvino", "openvino-int8"]
+
+VARSAYILAN_KLASOR = os.path.join(os.path.expanduser("~"), ".cache", "spor_hareket_analizi", "modeller")
+
+# Dışa aktarma için gereken paketler (içe aktarma adı, pip adı)
+_GEREKEN_PAKETLER = {
+    "onnx": [("onnx", "onnx"), ("onnxruntime", "onnxruntime")],
+    "openvino": [("openvino", "openvino")],
+}
+
+# INT8 kalibrasyonunda kullanılan kare sayısı
+KALIBRASYON_KARE_SAYISI = 32
+
+
+def arka_uc_coz(ad):
+    """"onnx-int8" -> ("onnx", True)"""
+    if ad not in ARKA_UCLAR:
+        raise ValueError(f"Bilinmeyen arka uç: {ad} (seçenekler: {', '.join(ARKA_UCLAR)})")
+    tur, _, nicem = ad.partition("-")
+    return tur, nicem == "int8"
+
+
+def paketleri_denetle(tur):
+    """Arka ucun ihtiyaç duyduğu paketler kurulu değilse anlaşılır bir hata verir"""
+    eksik = [pip_adi for modul, pip_adi in _GEREKEN_PAKETLER.get(tur, [])
+             if importlib.util.find_spec(modul) is None]
+    if eksik:
+        raise ImportError(f"'{tur}' arka ucu için şu paketler gerekli: pip install {' '.join(eksik)}")
+
+
+def agirlik_ozeti(yol, parca=1 << 20):
+    ozet = hashlib.sha256()
+    with open(yol, "rb") as f:
+        while True:
+            veri = f.read(parca)
+            if not veri:
+                break
+            ozet.update(veri)
+    return ozet.hexdigest()[:16]
+
+
+def agirliklari_bul(yol):
+    """Ağırlık dosyasının diskteki yolu; yoksa ultralytics'in PyTorch yolunda yaptığı gibi indirilir"""
+    if os.path.isfile(yol):
+        return yol
+    from ultralytics import YOLO
+
+    # "yolov8n-pose.pt" gibi adlar ilk yüklemede indirilir; ckpt_path indirilen dosyayı gösterir
+    return YOLO(yol).ckpt_path or yol
+
+
+def artefakt_yolu(yol, ad, imgsz, klasor=VARSAYILAN_KLASOR):
+    """Dışa aktarılmış modelin önbellekteki yeri; ağırlıklar değişince yol da değişir"""
+    tur, _ = arka_uc_coz(ad)
+    kok = os.path.splitext(os.path.basename(yol))[0]
+    hedef = os.path.join(klasor, f"{kok}-{agirlik_ozeti(yol)}-{ad}-{imgsz}")
+    # OpenVINO bir klasör (xml + bin), ONNX tek dosya üretir; ultralytics türü addan tanır
+    return hedef + "_openvino_model" if tur == "openvino" else hedef + ".onnx"
+
+
+def kalibrasyon_kareleri(videolar, imgsz, adet=KALIBRASYON_KARE_SAYISI):
+    """Videolara eşit aralıkla dağılmış kareleri model girişi biçiminde (1, 3, imgsz, imgsz) döndürür"""
+    kareler = []
+    kare_basina = max(1, adet // max(1, len(videolar)))
+    for video in videolar:
+        cap = cv2.VideoCapture(video)
+        toplam = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for kare_no in np.linspace(0, max(0, toplam - 1), kare_basina).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(kare_no))
+            ok, frame = cap.read()
+            if ok:
+                kareler.append(_letterbox(frame, imgsz))
+        cap.release()
+    if not kareler:
+        raise ValueError("INT8 kalibrasyonu için kare okunamadı")
+    return kareler
+
+
+def _letterbox(frame, imgsz):
+    # ultralytics önişlemesiyle aynı: oranı koru, 114 gri ile doldur, RGB, 0-1
+    h, w = frame.shape[:2]
+    oran = min(imgsz / h, imgsz / w)
+    yeni_w, yeni_h = round(w * oran), round(h * oran)
+    kucuk = cv2.resize(frame, (yeni_w, yeni_h), interpolation=cv2.INTER_LINEAR)
+    tuval = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    ust, sol = (imgsz - yeni_h) // 2, (imgsz - yeni_w) // 2
+    tuval[ust:ust + yeni_h, sol:sol + yeni_w] = kucuk
+    girdi = tuval[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return girdi[None]
+
+
+def _onnx_int8(kaynak, hedef, kalibrasyon):
+    """ONNX modelini gerçek karelerle kalibre edip statik INT8 (QDQ) modele çevirir"""
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class _Okuyucu(CalibrationDataReader):
+        def __init__(self, giris_adi):
+            self.ornekler = iter({giris_adi: kare} for kare in kalibrasyon)
+
+        def get_next(self):
+            return next(self.ornekler, None)
+
+    import onnx
+    kaynak_model = onnx.load(kaynak)
+    quantize_static(kaynak, hedef, _Okuyucu(kaynak_model.graph.input[0].name), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+
+    # ultralytics sınıf adlarını ve kpt_shape'i model meta verisinden okur
+    nicemli = onnx.load(hedef)
+    del nicemli.metadata_props[:]
+    nicemli.metadata_props.extend(kaynak_model.metadata_props)
+    onnx.save(nicemli, hedef)
+
+
+def disa_aktar(yol, ad, imgsz=640, klasor=VARSAYILAN_KLASOR, kalibrasyon_videolari=None):
+    """PyTorch ağırlıklarını istenen arka uca aktarır ve önbellekteki yolu döndürür.
+
+    Aynı ağırlık, arka uç ve imgsz için daha önce aktarıldıysa yeniden aktarılmaz.
+    Girdi boyutu dinamik bırakılır; kişi kırpma küçük imgsz ile çalışabilir.
+    """
+    tur, int8 = arka_uc_coz(ad)
+    if tur == "pytorch":
+        return yol
+    # Özet ve kopya için ağırlıkların diskte olması gerekir
+    yol = agirliklari_bul(yol)
+    hedef = artefakt_yolu(yol, ad, imgsz, klasor)
+    if os.path.exists(hedef):
+        return hedef
+
+    paketleri_denetle(tur)
+    from ultralytics import YOLO
+
+    os.makedirs(klasor, exist_ok=True)
+    # ultralytics çıktıyı ağırlıkların yanına yazar; yarım kalan aktarım önbelleğe düşmesin
+    with tempfile.TemporaryDirectory(dir=klasor) as gecici:
+        kopya = os.path.join(gecici, os.path.basename(yol))
+        shutil.copy2(yol, kopya)
+        model = YOLO(kopya)
+        if tur == "onnx":
+            cikti = model.export(format="onnx", imgsz=imgsz, dynamic=True)
+            if int8:
+                nicemli = os.path.join(gecici, "int8.onnx")
+                _onnx_int8(cikti, nicemli, kalibrasyon_kareleri(_kalibrasyon_videolari(kalibrasyon_videolari),
+                                                                imgsz))
+                cikti = nicemli
+        else:
+            # OpenVINO INT8 (NNCF) ultralytics'in kalibrasyon veri kümesini kullanır
+            ayarlar = {"int8": True} if int8 else {}
+            cikti = model.export(format="openvino", imgsz=imgsz, dynamic=True, **ayarlar)
+        os.replace(cikti, hedef)
+    return hedef
+
+
+def _kalibrasyon_videolari(videolar):
+    if videolar:
+        return videolar
+    # Verilmezse depodaki örnek videolar
+    klasor = os.path.dirname(os.path.abspath(__file__))
+    bulunan = sorted(glob.glob(os.path.join(klasor, "*.mp4")))
+    if not bulunan:
+        raise ValueError("INT8 kalibrasyonu için video bulunamadı")
+    return bulunan
+
+
+def keypoint_duzenle(keypoints):
+    """Arka uçtan gelen tek kişilik keypoint'leri (17, 3) float32 biçimine getirir.
+
+    Güven sütunu olmayan (17, 2) çıktılarda güven 1 kabul edilir.
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32).reshape(17, -1)
+    if keypoints.shape[1] == 2:
+        keypoints = np.concatenate([keypoints, np.ones((17, 1), dtype=np.float32)], axis=1)
+    return keypoints[:, :3]
@@ -0,0 +1,720 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from arka_uclar import ARKA_UCLAR
+
+try:
+    import resource
+except ImportError:
+    # Windows'ta yok; tepe bellek raporlanmaz
+    resource = None
+
+VARSAYILAN_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_beklenen.json")
+
+# Önceki çalıştırmaya göre izin verilen en fazla yavaşlama oranı
+VARSAYILAN_TOLERANS = 0.2
+
+# Arka uç karşılaştırmasında keypoint sapmasına katılan en düşük güven
+SAPMA_GUVEN_ESIGI = 0.5
+
+# imgsz taramasında denenen giriş boyutları (büyükten küçüğe)
+VARSAYILAN_IMGSZ_TARAMASI = [640, 512, 416, 352, 320, 288, 256, 224, 192, 160]
+
+
+def manifest_oku(yol):
+    """{video: {"mod": ..., "tekrar": ...}} biçimindeki beklenen sonuçları okur"""
+    with open(yol, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tepe_bellek_mb():
+    """Sürecin şimdiye kadarki en yüksek yerleşik belleği (MB)"""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döndürür
+    return tepe / (1024 * 1024) if sys.platform == "darwin" else tepe / 1024
+
+
+def cozme_hizi(video_path):
+    """Yalnızca kare çözme hızını (fps) ölçer"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    kare = 0
+    baslangic = time.perf_counter()
+    while cap.read()[0]:
+        kare += 1
+    gecen = time.perf_counter() - baslangic
+    cap.release()
+    return kare / gecen if gecen > 0 else 0
+
+
+def videoyu_olc(video_path, mod, beklenen, model, parti_boyutu=1, yumusat=False):
+    """Tek videoyu boru hattı ve analizciyle işleyip hız, gecikme ve doğruluk ölçer.
+
+    Aynı keypoint'ler modu kendisi tanıyan ikinci bir analizciden de geçirilir;
+    tanınan mod, onun saydığı tekrar ve iki analizcinin kare başına maliyeti raporlanır.
+    """
+    from spor_gui import CIKARIM_AYARLARI, SporHareketAnalizi, ilk_kisi_keypoints
+    from boru_hatti import BoruHatti, video_kare_zamani
+    from yumusatma import KeypointYumusatici
+
+    cozme_fps = cozme_hizi(video_path)
+
+    cap = cv2.VideoCapture(video_path)
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    analiz = SporHareketAnalizi(model=model)
+    analiz.mod_degistir(mod)
+    otomatik = SporHareketAnalizi(model=model)
+    yumusatici = KeypointYumusatici() if yumusat else None
+
+    cikarim_suresi = [0.0]
+    analiz_suresi = 0.0
+    otomatik_suresi = 0.0
+    analiz_sayisi = 0
+
+    def cikarim(frame):
+        t0 = time.perf_counter()
+        results = model(frame, verbose=False, **CIKARIM_AYARLARI)
+        cikarim_suresi[0] += time.perf_counter() - t0
+        return results
+
+    hat = BoruHatti(
+        cap,
+        cikarim,
+        canli=False,
+        zaman_hesapla=lambda c, no: video_kare_zamani(c, no, video_fps),
+        parti_boyutu=parti_boyutu
+    )
+    gecikmeler = []
+    baslangic = time.perf_counter()
+    hat.baslat()
+    for kare in hat.sonuclar():
+        keypoints = ilk_kisi_keypoints(kare.results)
+        if keypoints is not None:
+            t0 = time.perf_counter()
+            if yumusatici is not None:
+                keypoints = yumusatici.tek(keypoints, kare.zaman, kare.kare.shape[0])
+            analiz.hareket_analiz(keypoints, kare.kare.shape[0], kare.zaman)
+            t1 = time.perf_counter()
+            otomatik.hareket_analiz(keypoints, kare.kare.shape[0], kare.zaman)
+            analiz_suresi += t1 - t0
+            otomatik_suresi += time.perf_counter() - t1
+            analiz_sayisi += 1
+        # Karenin okunmasından analizin bitmesine kadar geçen süre
+        gecikmeler.append(time.perf_counter() - kare.okuma_zamani)
+    hat.durdur()
+    gecen = time.perf_counter() - baslangic
+    cap.release()
+    if hat.hata is not None:
+        raise hat.hata
+
+    kare_sayisi = len(gecikmeler)
+    sayi = analiz.ozet()[f"{mod}_sayisi"]
+    taninan = otomatik.aktif_mod or None
+    gecikme_ms = np.asarray(gecikmeler) * 1000 if gecikmeler else np.zeros(1)
+    return {
+        "video": os.path.basename(video_path),
+        "mod": mod,
+        "kare_sayisi": kare_sayisi,
+        "cozme_fps": cozme_fps,
+        "cikarim_fps": kare_sayisi / cikarim_suresi[0] if cikarim_suresi[0] > 0 else 0,
+        "uctan_uca_fps": kare_sayisi / gecen if gecen > 0 else 0,
+        "gecikme_p50_ms": float(np.percentile(gecikme_ms, 50)),
+        "gecikme_p95_ms": float(np.percentile(gecikme_ms, 95)),
+        "tepe_bellek_mb": tepe_bellek_mb(),
+        "beklenen": beklenen,
+        "sayi": sayi,
+        "mutlak_hata": abs(sayi - beklenen),
+        "dogru": sayi == beklenen,
+        "taninan_mod": taninan,
+        "tanima_dogru": taninan == mod,
+        "otomatik_sayi": otomatik.sayaclar.get(taninan, 0),
+        "analiz_us": analiz_suresi / analiz_sayisi * 1e6 if analiz_sayisi else 0,
+        "otomatik_analiz_us": otomatik_suresi / analiz_sayisi * 1e6 if analiz_sayisi else 0
+    }
+
+
+def git_surumu():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def benchmark_calistir(manifest, klasor, parti_boyutu=1, arka_uc="pytorch", yumusat=False):
+    """Manifestteki her videoyu ölçer ve özet raporu döndürür"""
+    from model_deposu import CIKARIM_AYARLARI, MODEL_YOLU, model_al
+
+    # Yükleme ve ısıtma ölçümlere girmesin
+    model = model_al(arka_uc=arka_uc)
+
+    videolar = []
+    for ad, beklenen in manifest.items():
+        video_path = os.path.join(klasor, ad)
+        try:
+            videolar.append(videoyu_olc(video_path, beklenen["mod"], beklenen["tekrar"], model, parti_boyutu,
+                                        yumusat))
+        except Exception as e:
+            videolar.append({"video": ad, "mod": beklenen["mod"], "hata": str(e)})
+
+    olculen = [v for v in videolar if "hata" not in v]
+    toplam_kare = sum(v["kare_sayisi"] for v in olculen)
+    toplam_sure = sum(v["kare_sayisi"] / v["uctan_uca_fps"] for v in olculen if v["uctan_uca_fps"] > 0)
+    return {
+        "surum": git_surumu(),
+        "model": MODEL_YOLU,
+        "arka_uc": arka_uc,
+        "parti_boyutu": parti_boyutu,
+        "imgsz": CIKARIM_AYARLARI["imgsz"],
+        "yumusatma": yumusat,
+        "dogruluk": sum(v["dogru"] for v in olculen) / len(olculen) if olculen else 0,
+        "ortalama_mutlak_hata": float(np.mean([v["mutlak_hata"] for v in olculen])) if olculen else 0,
+        "tanima_dogrulugu": sum(v["tanima_dogru"] for v in olculen) / len(olculen) if olculen else 0,
+        "uctan_uca_fps": toplam_kare / toplam_sure if toplam_sure > 0 else 0,
+        "tepe_bellek_mb": tepe_bellek_mb(),
+        "videolar": videolar
+    }
+
+
+def _keypoint_serisi(video_path, model):
+    """Videoyu sırayla çıkarımdan geçirir; (T, 17, 3) keypoint, zaman, tespit, yükseklik ve çıkarım süresi"""
+    from model_deposu import CIKARIM_AYARLARI
+    from spor_gui import ilk_kisi_keypoints
+    from boru_hatti import video_kare_zamani
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    keypoint_listesi, zamanlar, tespit = [], [], []
+    yukseklik = 0
+    cikarim_suresi = 0.0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yukseklik = frame.shape[0]
+        t0 = time.perf_counter()
+        results = model(frame, verbose=False, **CIKARIM_AYARLARI)
+        cikarim_suresi += time.perf_counter() - t0
+        keypoints = ilk_kisi_keypoints(results)
+        keypoint_listesi.append(keypoints[:17] if keypoints is not None else np.zeros((17, 3), np.float32))
+        zamanlar.append(video_kare_zamani(cap, len(zamanlar), video_fps))
+        tespit.append(keypoints is not None)
+    cap.release()
+    if not keypoint_listesi:
+        raise IOError(f"Videodan kare okunamadı: {video_path}")
+    return (np.stack(keypoint_listesi), np.asarray(zamanlar), np.asarray(tespit, dtype=bool),
+            yukseklik, cikarim_suresi)
+
+
+def titreme(keypoints, tespit, yukseklik):
+    """Güvenli noktaların kareden kareye ivmesinin (ikinci fark) medyanı, kare yüksekliğine oranla.
+
+    Gerçek hareket birkaç karede yumuşak değişir; ikinci farkı büyüten çoğunlukla titremedir.
+    """
+    kp = np.asarray(keypoints)
+    if len(kp) < 3:
+        return None
+    tespit = np.asarray(tespit, dtype=bool)
+    guvenli = tespit[:, None] & (kp[:, :, 2] >= SAPMA_GUVEN_ESIGI)
+    uclu = guvenli[:-2] & guvenli[1:-1] & guvenli[2:]
+    if not uclu.any():
+        return None
+    ikinci_fark = kp[2:, :, :2] - 2 * kp[1:-1, :, :2] + kp[:-2, :, :2]
+    return float(np.median(np.linalg.norm(ikinci_fark, axis=-1)[uclu])) / max(yukseklik, 1)
+
+
+def _akista_say(mod, keypoints, zamanlar, tespit, yukseklik, model):
+    from spor_gui import SporHareketAnalizi
+
+    analiz = SporHareketAnalizi(model=model)
+    analiz.mod_degistir(mod)
+    for no in np.flatnonzero(tespit):
+        analiz.hareket_analiz(keypoints[no], yukseklik, float(zamanlar[no]))
+    return analiz.sayaclar.get(mod, 0)
+
+
+def imgsz_tara(manifest, klasor, boyutlar=None, arka_uc="pytorch"):
+    """Her giriş boyutunda videoları bir kez çıkarımdan geçirip ham ve süzülmüş keypoint'lerle sayar.
+
+    Bütün videoların sayısı beklenene eşitse o boyut geçer. Rapordaki en küçük
+    boyut, kendisi ve daha büyük bütün denenen boyutlar geçen boyuttur; tek bir
+    şanslı boyut sonucu belirlemesin diye aradaki başarısızlıklar atlanmaz.
+    """
+    import model_deposu
+    from yumusatma import seriyi_yumusat
+
+    boyutlar = sorted(set(boyutlar or VARSAYILAN_IMGSZ_TARAMASI), reverse=True)
+    onceki_imgsz = model_deposu.CIKARIM_AYARLARI["imgsz"]
+    satirlar = []
+    try:
+        for imgsz in boyutlar:
+            model_deposu.imgsz_sec(imgsz)
+            # Dışa aktarılmış arka uçlarda her boyut ayrı dosya; yükleme ölçüme girmez
+            model = model_deposu.model_al(arka_uc=arka_uc)
+            videolar = []
+            toplam_kare = 0
+            toplam_cikarim = 0.0
+            for ad, beklenen in manifest.items():
+                try:
+                    keypoints, zamanlar, tespit, yukseklik, cikarim_suresi = _keypoint_serisi(
+                        os.path.join(klasor, ad), model)
+                except Exception as e:
+                    videolar.append({"video": ad, "mod": beklenen["mod"], "hata": str(e)})
+                    continue
+                toplam_kare += len(zamanlar)
+                toplam_cikarim += cikarim_suresi
+                yumusak = seriyi_yumusat(keypoints, zamanlar, tespit, yukseklik)
+                ham_sayi = _akista_say(beklenen["mod"], keypoints, zamanlar, tespit, yukseklik, model)
+                yumusak_sayi = _akista_say(beklenen["mod"], yumusak, zamanlar, tespit, yukseklik, model)
+                videolar.append({
+                    "video": ad,
+                    "mod": beklenen["mod"],
+                    "beklenen": beklenen["tekrar"],
+                    "ham_sayi": ham_sayi,
+                    "yumusak_sayi": yumusak_sayi,
+                    "tespit_orani": float(tespit.mean()),
+                    "ham_titreme": titreme(keypoints, tespit, yukseklik),
+                    "yumusak_titreme": titreme(yumusak, tespit, yukseklik)
+                })
+            olculen = [v for v in videolar if "hata" not in v]
+            satirlar.append({
+                "imgsz": imgsz,
+                "cikarim_fps": toplam_kare / toplam_cikarim if toplam_cikarim > 0 else 0,
+                "ham_dogru": sum(v["ham_sayi"] == v["beklenen"] for v in olculen),
+                "yumusak_dogru": sum(v["yumusak_sayi"] == v["beklenen"] for v in olculen),
+                "video_sayisi": len(videolar),
+                "ham_titreme": _ortalama([v["ham_titreme"] for v in olculen]),
+                "yumusak_titreme": _ortalama([v["yumusak_titreme"] for v in olculen]),
+                "videolar": videolar
+            })
+    finally:
+        model_deposu.imgsz_sec(onceki_imgsz)
+
+    return {
+        "surum": git_surumu(),
+        "model": model_deposu.MODEL_YOLU,
+        "arka_uc": arka_uc,
+        "boyutlar": satirlar,
+        "en_kucuk_imgsz": {tur: _en_kucuk_gecen(satirlar, f"{tur}_dogru") for tur in ("ham", "yumusak")}
+    }
+
+
+def _ortalama(degerler):
+    degerler = [d for d in degerler if d is not None]
+    return float(np.mean(degerler)) if degerler else None
+
+
+def _en_kucuk_gecen(satirlar, alan):
+    # Satırlar büyükten küçüğe; ilk başarısızlıkta durulur
+    en_kucuk = None
+    for satir in satirlar:
+        if satir[alan] != satir["video_sayisi"]:
+            break
+        en_kucuk = satir["imgsz"]
+    return en_kucuk
+
+
+def taramayi_yazdir(rapor):
+    print(f"{'imgsz':>6}{'Çıkarım fps':>13}{'Ham doğru':>11}{'Yumuşak doğru':>15}"
+          f"{'Ham titreme':>13}{'Yumuşak titreme':>17}")
+    for satir in rapor["boyutlar"]:
+        # Titreme kare yüksekliğinin binde biri olarak
+        ham = satir["ham_titreme"] * 1000 if satir["ham_titreme"] is not None else None
+        yumusak = satir["yumusak_titreme"] * 1000 if satir["yumusak_titreme"] is not None else None
+        print(f"{satir['imgsz']:>6}{satir['cikarim_fps']:>13.1f}"
+              f"{satir['ham_dogru']:>7}/{satir['video_sayisi']:<3}{satir['yumusak_dogru']:>11}/"
+              f"{satir['video_sayisi']:<3}{_bicimle(ham, '>12.2f')}‰{_bicimle(yumusak, '>16.2f')}‰")
+        for v in satir["videolar"]:
+            if "hata" in v:
+                print(f"{'':>6}  {v['video']}: HATA: {v['hata']}")
+    en_kucuk = rapor["en_kucuk_imgsz"]
+    print(f"Bütün sayıların doğru olduğu en küçük imgsz: ham {en_kucuk['ham'] or '-'}, "
+          f"yumuşatılmış {en_kucuk['yumusak'] or '-'}")
+
+
+def _kareleri_oku(video_path, kare_sayisi):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    kareler = []
+    while len(kareler) < kare_sayisi:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        kareler.append(frame)
+    cap.release()
+    return kareler
+
+
+def arka_uclari_karsilastir(video_path, arka_uclar, kare_sayisi=150):
+    """Aynı karelerde her arka ucun çıkarım hızını ve PyTorch'a göre keypoint sapmasını ölçer.
+
+    Sapma, iki tarafta da kişi bulunan karelerde güveni yeterli keypoint'lerin
+    piksel uzaklığıdır; kare yüksekliğine oranı da verilir.
+    """
+    from model_deposu import CIKARIM_AYARLARI, model_al
+    from spor_gui import ilk_kisi_keypoints
+
+    # Kod çözme ölçüme girmesin diye kareler önceden belleğe alınır
+    kareler = _kareleri_oku(video_path, kare_sayisi)
+    if not kareler:
+        raise IOError(f"Videodan kare okunamadı: {video_path}")
+    yukseklik = kareler[0].shape[0]
+
+    sonuclar = {}
+    for ad in ["pytorch"] + [a for a in arka_uclar if a != "pytorch"]:
+        try:
+            yukleme_baslangic = time.perf_counter()
+            model = model_al(arka_uc=ad)
+            yukleme = time.perf_counter() - yukleme_baslangic
+            keypoint_listesi = []
+            sureler = []
+            for frame in kareler:
+                t0 = time.perf_counter()
+                results = model(frame, verbose=False, **CIKARIM_AYARLARI)
+                sureler.append(time.perf_counter() - t0)
+                keypoint_listesi.append(ilk_kisi_keypoints(results))
+        except Exception as e:
+            sonuclar[ad] = {"arka_uc": ad, "hata": str(e)}
+            continue
+        sureler_ms = np.asarray(sureler) * 1000
+        sonuclar[ad] = {
+            "arka_uc": ad,
+            "yukleme_sn": yukleme,
+            "fps": len(sureler) / sum(sureler),
+            "p50_ms": float(np.percentile(sureler_ms, 50)),
+            "p95_ms": float(np.percentile(sureler_ms, 95)),
+            "tespit_orani": sum(k is not None for k in keypoint_listesi) / len(keypoint_listesi),
+            "_keypoints": keypoint_listesi
+        }
+
+    referans = sonuclar["pytorch"].get("_keypoints")
+    for sonuc in sonuclar.values():
+        keypoint_listesi = sonuc.pop("_keypoints", None)
+        if keypoint_listesi is None or referans is None:
+            continue
+        sonuc.update(keypoint_sapmasi(referans, keypoint_listesi, yukseklik))
+
+    return {
+        "surum": git_surumu(),
+        "video": os.path.basename(video_path),
+        "kare_sayisi": len(kareler),
+        "arka_uclar": [sonuclar[ad] for ad in sonuclar if ad == "pytorch" or ad in arka_uclar]
+    }
+
+
+def keypoint_sapmasi(referans, keypoint_listesi, yukseklik):
+    """İki keypoint serisi arasındaki tespit uyumu, piksel ve güven farkı"""
+    uyumlu = 0
+    mesafeler = []
+    guven_farklari = []
+    for ref, kp in zip(referans, keypoint_listesi):
+        if (ref is None) == (kp is None):
+            uyumlu += 1
+        if ref is None or kp is None:
+            continue
+        guvenli = (ref[:, 2] >= SAPMA_GUVEN_ESIGI) & (kp[:, 2] >= SAPMA_GUVEN_ESIGI)
+        mesafeler.extend(np.linalg.norm(ref[guvenli, :2] - kp[guvenli, :2], axis=1))
+        guven_farklari.extend(np.abs(ref[:, 2] - kp[:, 2]))
+    ortalama_px = float(np.mean(mesafeler)) if mesafeler else None
+    return {
+        "tespit_uyumu": uyumlu / len(referans) if referans else 0,
+        "sapma_px": ortalama_px,
+        "sapma_p95_px": float(np.percentile(mesafeler, 95)) if mesafeler else None,
+        "sapma_yukseklik_orani": ortalama_px / yukseklik if ortalama_px is not None else None,
+        "guven_farki": float(np.mean(guven_farklari)) if guven_farklari else None
+    }
+
+
+def karsilastirmayi_yazdir(rapor):
+    print(f"Video: {rapor['video']} | {rapor['kare_sayisi']} kare")
+    print(f"{'Arka uç':<16}{'Yükleme':>9}{'FPS':>8}{'p50 ms':>8}{'p95 ms':>8}{'Tespit':>8}"
+          f"{'Uyum':>7}{'Sapma px':>10}{'p95 px':>8}{'Güven':>8}")
+    for v in rapor["arka_uclar"]:
+        if "hata" in v:
+            print(f"{v['arka_uc']:<16}  HATA: {v['hata']}")
+            continue
+        uyum = v.get("tespit_uyumu")
+        print(f"{v['arka_uc']:<16}{v['yukleme_sn']:>8.1f}s{v['fps']:>8.1f}{v['p50_ms']:>8.1f}"
+              f"{v['p95_ms']:>8.1f}{v['tespit_orani'] * 100:>7.0f}%"
+              f"{_bicimle(uyum * 100 if uyum is not None else None, '>6.0f')}%"
+              f"{_bicimle(v.get('sapma_px'), '>10.2f')}{_bicimle(v.get('sapma_p95_px'), '>8.2f')}"
+              f"{_bicimle(v.get('guven_farki'), '>8.3f')}")
+
+
+def _cpu_suresi():
+    if resource is None:
+        return None
+    kullanim = resource.getrusage(resource.RUSAGE_SELF)
+    return kullanim.ru_utime + kullanim.ru_stime
+
+
+def arayuz_tepkisi(video_path, surecler, kare_sayisi=150, tik_ms=10, gosterim_boyutu=(960, 540)):
+    """VideoThread'i arayüzdeki gibi çalıştırıp olay döngüsünün gecikmesini ve fps'i ölçer.
+
+    Ana thread'de tik_ms aralıklı bir QTimer çalışır; tikin geç kaldığı süre, arayüzün
+    o an tıklamaya ve boyamaya ne kadar geç cevap verdiğidir. Gelen kareler
+    arayüzdeki gibi QPixmap'e çevrilip QLabel'e konur. Ölçüm ilk kareden başlar,
+    model yüklemesi ilk kare süresinde ayrıca verilir.
+    """
+    # Ölçüm için pencere gerekmez; ekransız makinede de çalışsın
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QEventLoop, Qt, QTimer
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtWidgets import QApplication, QLabel
+    from spor_gui import VideoThread
+
+    app = QApplication.instance() or QApplication([])
+    thread = VideoThread(mode="video", video_path=video_path, surecler=surecler)
+    # İki tasarım da akış hattıyla karşılaştırılır; aranabilir oynatıcı kullanılmaz
+    thread.aranabilir = False
+    thread.gosterim_boyutu = gosterim_boyutu
+    etiket = QLabel()
+    dongu = QEventLoop()
+
+    gecikmeler = []
+    kare_zamanlari = []
+    hatalar = []
+    cpu = {}
+    son_tik = [None]
+
+    def kare_geldi():
+        kare = thread.son_kareyi_al()
+        if kare is None:
+            return
+        etiket.setPixmap(QPixmap.fromImage(kare[0]))
+        kare_zamanlari.append(time.perf_counter())
+        if len(kare_zamanlari) == 1:
+            cpu["ilk"] = _cpu_suresi()
+        if len(kare_zamanlari) >= kare_sayisi:
+            cpu["son"] = _cpu_suresi()
+            dongu.quit()
+
+    def tik():
+        simdi = time.perf_counter()
+        if son_tik[0] is not None and kare_zamanlari:
+            gecikmeler.append(max(0.0, simdi - son_tik[0] - tik_ms / 1000))
+        son_tik[0] = simdi
+
+    def bitti(sonuc):
+        if "error" in sonuc:
+            hatalar.append(sonuc["error"])
+        cpu.setdefault("son", _cpu_suresi())
+        dongu.quit()
+
+    saat = QTimer()
+    saat.setTimerType(Qt.PreciseTimer)
+    saat.timeout.connect(tik)
+    thread.yeni_kare_signal.connect(kare_geldi)
+    thread.finished_signal.connect(bitti)
+
+    baslangic = time.perf_counter()
+    saat.start(tik_ms)
+    thread.start()
+    dongu.exec_()
+    saat.stop()
+    thread.stop()
+    app.processEvents()
+
+    sonuc = {"tasarim": "surec" if surecler else "thread"}
+    if hatalar or len(kare_zamanlari) < 2:
+        sonuc["hata"] = hatalar[0] if hatalar else "Yeterli kare işlenmedi"
+        return sonuc
+
+    sure = kare_zamanlari[-1] - kare_zamanlari[0]
+    gecikme_ms = np.asarray(gecikmeler) * 1000 if gecikmeler else np.zeros(1)
+    cpu_ms = None
+    if cpu.get("ilk") is not None and cpu.get("son") is not None:
+        cpu_ms = (cpu["son"] - cpu["ilk"]) * 1000 / (len(kare_zamanlari) - 1)
+    sonuc.update({
+        "kare_sayisi": len(kare_zamanlari),
+        "ilk_kare_ms": (kare_zamanlari[0] - baslangic) * 1000,
+        "fps": (len(kare_zamanlari) - 1) / sure if sure > 0 else 0,
+        "tik_gecikme_p50_ms": float(np.percentile(gecikme_ms, 50)),
+        "tik_gecikme_p95_ms": float(np.percentile(gecikme_ms, 95)),
+        "tik_gecikme_en_buyuk_ms": float(gecikme_ms.max()),
+        # Süreç tasarımında çözme ve çıkarım CPU'su alt süreçlerde; burada yalnızca arayüz süreci
+        "arayuz_cpu_ms_kare": cpu_ms,
+        "atlanan_gosterim": thread.atlanan_gosterim,
+    })
+    return sonuc
+
+
+def surecleri_karsilastir(video_path, kare_sayisi=150, tik_ms=10):
+    """Tek süreçteki thread boru hattıyla ayrı çözücü/çıkarım süreçli hattı karşılaştırır"""
+    return {
+        "surum": git_surumu(),
+        "video": os.path.basename(video_path),
+        "cekirdek": os.cpu_count(),
+        "tik_ms": tik_ms,
+        "tasarimlar": [arayuz_tepkisi(video_path, surecler, kare_sayisi, tik_ms) for surecler in (False, True)]
+    }
+
+
+def surec_karsilastirmasini_yazdir(rapor):
+    print(f"Video: {rapor['video']} | {rapor['cekirdek']} çekirdek | {rapor['tik_ms']} ms arayüz tiki")
+    print(f"{'Tasarım':<10}{'Kare':>6}{'İlk kare':>10}{'FPS':>7}{'Tik p50':>9}{'Tik p95':>9}"
+          f"{'Tik max':>9}{'CPU/kare':>10}{'Atlanan':>9}")
+    for v in rapor["tasarimlar"]:
+        if "hata" in v:
+            print(f"{v['tasarim']:<10}  HATA: {v['hata']}")
+            continue
+        print(f"{v['tasarim']:<10}{v['kare_sayisi']:>6}{v['ilk_kare_ms'] / 1000:>9.1f}s{v['fps']:>7.1f}"
+              f"{v['tik_gecikme_p50_ms']:>7.1f}ms{v['tik_gecikme_p95_ms']:>7.1f}ms"
+              f"{v['tik_gecikme_en_buyuk_ms']:>7.1f}ms{_bicimle(v['arayuz_cpu_ms_kare'], '>8.1f')}ms"
+              f"{v['atlanan_gosterim']:>9}")
+
+
+def _bicimle(deger, bicim):
+    # Ölçülemeyen (None) değerler tabloda çizgiyle gösterilir
+    if deger is None:
+        return "-".rjust(int(bicim.lstrip(">").split(".")[0]))
+    return format(deger, bicim)
+
+
+def gerilemeleri_bul(rapor, onceki, tolerans=VARSAYILAN_TOLERANS):
+    """Önceki rapora göre doğruluğu düşen veya belirgin yavaşlayan videoları listeler"""
+    onceki_videolar = {v["video"]: v for v in onceki.get("videolar", []) if "hata" not in v}
+    gerilemeler = []
+    for video in rapor["videolar"]:
+        eski = onceki_videolar.get(video["video"])
+        if eski is None:
+            continue
+        ad = video["video"]
+        if "hata" in video:
+            gerilemeler.append(f"{ad}: çalıştırılamadı ({video['hata']})")
+            continue
+        if video["mutlak_hata"] > eski["mutlak_hata"]:
+            gerilemeler.append(f"{ad}: sayı hatası {eski['mutlak_hata']} -> {video['mutlak_hata']}")
+        if eski.get("tanima_dogru") and not video["tanima_dogru"]:
+            gerilemeler.append(f"{ad}: egzersiz {video['taninan_mod']} olarak tanındı")
+        if video["uctan_uca_fps"] < eski["uctan_uca_fps"] * (1 - tolerans):
+            gerilemeler.append(f"{ad}: uçtan uca {eski['uctan_uca_fps']:.1f} -> "
+                               f"{video['uctan_uca_fps']:.1f} fps")
+        if video["gecikme_p95_ms"] > eski["gecikme_p95_ms"] * (1 + tolerans):
+            gerilemeler.append(f"{ad}: p95 gecikme {eski['gecikme_p95_ms']:.0f} -> "
+                               f"{video['gecikme_p95_ms']:.0f} ms")
+    return gerilemeler
+
+
+def raporu_yazdir(rapor):
+    print(f"{'Video':<20}{'Mod':<14}{'Sayı':>6}{'Beklenen':>10}{'Tanınan':>14}{'Çözme':>8}{'Çıkarım':>9}"
+          f"{'Uçtan uca':>11}{'p50 ms':>8}{'p95 ms':>8}")
+    for v in rapor["videolar"]:
+        if "hata" in v:
+            print(f"{v['video']:<20}{v['mod']:<14}  HATA: {v['hata']}")
+            continue
+        print(f"{v['video']:<20}{v['mod']:<14}{v['sayi']:>6}{v['beklenen']:>10}"
+              f"{str(v['taninan_mod'] or '-'):>14}{v['cozme_fps']:>8.0f}"
+              f"{v['cikarim_fps']:>9.1f}{v['uctan_uca_fps']:>11.1f}{v['gecikme_p50_ms']:>8.0f}"
+              f"{v['gecikme_p95_ms']:>8.0f}")
+    bellek = f"{rapor['tepe_bellek_mb']:.0f} MB" if rapor["tepe_bellek_mb"] is not None else "-"
+    print(f"Doğruluk: %{rapor['dogruluk'] * 100:.0f} | Ortalama mutlak hata: "
+          f"{rapor['ortalama_mutlak_hata']:.2f} | Uçtan uca: {rapor['uctan_uca_fps']:.1f} fps | "
+          f"Tepe bellek: {bellek}")
+    olculen = [v for v in rapor["videolar"] if "hata" not in v]
+    if olculen:
+        analiz_us = np.mean([v["analiz_us"] for v in olculen])
+        otomatik_us = np.mean([v["otomatik_analiz_us"] for v in olculen])
+        print(f"Otomatik tanıma: %{rapor['tanima_dogrulugu'] * 100:.0f} doğru | Kare başına analiz: "
+              f"{analiz_us:.0f} us elle, {otomatik_us:.0f} us otomatik")
+
+
+def _raporu_kaydet(rapor, yol):
+    if yol:
+        with open(yol, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"Sonuçlar kaydedildi: {yol}")
+
+
+def benchmark_main(argv):
+    """python spor_gui.py benchmark komutunu çalıştırır"""
+    parser = argparse.ArgumentParser(prog="spor_gui.py benchmark",
+                                     description="Örnek videolarda hız ve sayım doğruluğunu ölçer")
+    parser.add_argument("--manifest", default=VARSAYILAN_MANIFEST,
+                        help="Video başına beklenen mod ve tekrar sayısı (JSON)")
+    parser.add_argument("--klasor", default=None,
+                        help="Videoların bulunduğu klasör (varsayılan: manifestin klasörü)")
+    parser.add_argument("--batch", type=int, default=1, help="Toplu çıkarım parti boyutu")
+    parser.add_argument("--arka-uc", default="pytorch", choices=ARKA_UCLAR, help="Çıkarım arka ucu")
+    parser.add_argument("--arka-uclar", nargs="+", default=None, choices=ARKA_UCLAR, metavar="ARKA_UC",
+                        help="Sayım yerine bu arka uçların hızını ve PyTorch'a göre keypoint sapmasını "
+                             "karşılaştır (örn. onnx onnx-int8 openvino)")
+    parser.add_argument("--surecler", action="store_true",
+                        help="Sayım yerine tek süreçli thread hattıyla ayrı çözücü/çıkarım süreçli hattı "
+                             "arayüz tepkisi ve fps bakımından karşılaştır")
+    parser.add_argument("--video", default=None,
+                        help="Arka uç ve süreç karşılaştırmasında kullanılacak video "
+                             "(varsayılan: manifestteki ilk video)")
+    parser.add_argument("--kare", type=int, default=150,
+                        help="Arka uç ve süreç karşılaştırmasındaki kare sayısı")
+    parser.add_argument("--yumusat", action="store_true",
+                        help="Keypoint'leri analizden önce One-Euro süzgeciyle yumuşat")
+    parser.add_argument("--imgsz-tara", nargs="*", type=int, default=None, metavar="IMGSZ",
+                        help="Sayım yerine her giriş boyutunda ham ve yumuşatılmış keypoint'lerle "
+                             "doğruluğu ölç; boyut verilmezse "
+                             f"{' '.join(map(str, VARSAYILAN_IMGSZ_TARAMASI))}")
+    parser.add_argument("--cikti", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--onceki", default=None,
+                        help="Karşılaştırılacak önceki sonuç dosyası; gerileme varsa çıkış kodu 1")
+    parser.add_argument("--tolerans", type=float, default=VARSAYILAN_TOLERANS,
+                        help="Hız ve gecikmede kabul edilen en fazla kötüleşme oranı (varsayılan: 0.2)")
+    args = parser.parse_args(argv)
+
+    if any(imgsz <= 0 or imgsz % 32 for imgsz in args.imgsz_tara or []):
+        parser.error("--imgsz-tara boyutları 32'nin pozitif katı olmalı")
+
+    manifest = manifest_oku(args.manifest)
+    klasor = args.klasor or os.path.dirname(os.path.abspath(args.manifest))
+    if args.arka_uclar:
+        video = args.video or os.path.join(klasor, next(iter(manifest)))
+        rapor = arka_uclari_karsilastir(video, args.arka_uclar, args.kare)
+        karsilastirmayi_yazdir(rapor)
+        _raporu_kaydet(rapor, args.cikti)
+        return 1 if any("hata" in v for v in rapor["arka_uclar"]) else 0
+
+    if args.surecler:
+        video = args.video or os.path.join(klasor, next(iter(manifest)))
+        from model_deposu import arka_uc_sec
+        # Çıkarım süreci seçimi spawn ile başlarken alır
+        arka_uc_sec(args.arka_uc)
+        rapor = surecleri_karsilastir(video, args.kare)
+        surec_karsilastirmasini_yazdir(rapor)
+        _raporu_kaydet(rapor, args.cikti)
+        return 1 if any("hata" in v for v in rapor["tasarimlar"]) else 0
+
+    if args.imgsz_tara is not None:
+        rapor = imgsz_tara(manifest, klasor, args.imgsz_tara, args.arka_uc)
+        taramayi_yazdir(rapor)
+        _raporu_kaydet(rapor, args.cikti)
+        return 1 if any("hata" in v for satir in rapor["boyutlar"] for v in satir["videolar"]) else 0
+
+    rapor = benchmark_calistir(manifest, klasor, args.batch, args.arka_uc, args.yumusat)
+    raporu_yazdir(rapor)
+    _raporu_kaydet(rapor, args.cikti)
+
+    if any("hata" in v for v in rapor["videolar"]):
+        return 1
+    if args.onceki:
+        with open(args.onceki, encoding="utf-8") as f:
+            onceki = json.load(f)
+        gerilemeler = gerilemeleri_bul(rapor, onceki, args.tolerans)
+        if gerilemeler:
+            print("GERİLEME:")
+            for satir in gerilemeler:
+                print(f"  {satir}")
+            return 1
+        print(f"Gerileme yok (önceki sürüm: {onceki.get('surum')})")
+    return 0
@@ -0,0 +1,292 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from olcum import KAPALI
+
+# Akışın bittiğini bildiren işaret
+AKIS_SONU = object()
+
+
+def video_kare_zamani(cap, kare_no, fps):
+    """Son okunan karenin video içindeki zamanını saniye olarak döndürür"""
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0 or kare_no == 0 or not fps:
+        return msec / 1000.0
+    # Bazı arka uçlar zaman damgası vermez, kare numarasından hesapla
+    return kare_no / fps
+
+
+class KareKuyrugu:
+    """Aşamalar arasındaki sınırlı kuyruk.
+
+    Canlı kaynakta kuyruk dolunca en eski kare atılır ve en yeni kare tutulur,
+    dosya kaynağında ise üretici yer açılana kadar bekletilir (kare atılmaz).
+    """
+
+    def __init__(self, ad, boyut, eskiyi_at):
+        self.ad = ad
+        self.kuyruk = queue.Queue(maxsize=boyut)
+        self.eskiyi_at = eskiyi_at
+        self.atilan = 0
+        self.en_yuksek_derinlik = 0
+        # Öğe konunca çağrılır; birden çok kuyruğu bekleyen tüketici uyandırılır
+        self.bildir = None
+
+    def koy(self, oge, calisiyor):
+        if self.eskiyi_at:
+            while True:
+                try:
+                    self.kuyruk.put_nowait(oge)
+                    break
+                except queue.Full:
+                    # Bayat kareyi at, yerine en yenisini koy
+                    try:
+                        self.kuyruk.get_nowait()
+                        self.atilan += 1
+                    except queue.Empty:
+                        pass
+        else:
+            # Geri basınç: tüketici yetişene kadar bekle
+            while True:
+                try:
+                    self.kuyruk.put(oge, timeout=0.1)
+                    break
+                except queue.Full:
+                    if not calisiyor():
+                        return False
+
+        derinlik = self.kuyruk.qsize()
+        if derinlik > self.en_yuksek_derinlik:
+            self.en_yuksek_derinlik = derinlik
+        if self.bildir is not None:
+            self.bildir()
+        return True
+
+    def al(self, zaman_asimi=0.1):
+        return self.kuyruk.get(timeout=zaman_asimi)
+
+    def hemen_al(self):
+        """Bekleyen öğe varsa döndürür, yoksa None"""
+        try:
+            return self.kuyruk.get_nowait()
+        except queue.Empty:
+            return None
+
+    def bos_yer(self):
+        return self.kuyruk.maxsize - self.kuyruk.qsize()
+
+    def derinlik(self):
+        return self.kuyruk.qsize()
+
+
+class Duraklatma:
+    """Duraklatma bayrağı; duraklatılan thread devam edilene kadar koşul değişkeninde uyur"""
+
+    def __init__(self):
+        self._kosul = threading.Condition()
+        self.duraklatildi = False
+
+    def ayarla(self, duraklat):
+        with self._kosul:
+            self.duraklatildi = duraklat
+            self._kosul.notify_all()
+
+    def uyandir(self):
+        """Bekleyenleri koşullarını yeniden sınamaları için uyandırır (durdurma, arama)"""
+        with self._kosul:
+            self._kosul.notify_all()
+
+    def bekle(self, devam_et):
+        """Duraklatıldıysa devam edilene veya devam_et() False olana kadar bekler"""
+        with self._kosul:
+            while self.duraklatildi and devam_et():
+                self._kosul.wait()
+
+
+class IslenenKare:
+    """Boru hattında aşamadan aşamaya taşınan kare bilgisi"""
+    __slots__ = ("no", "zaman", "kare", "results", "okuma_zamani")
+
+    def __init__(self, no, zaman, kare, okuma_zamani):
+        self.no = no
+        self.zaman = zaman
+        self.kare = kare
+        self.results = None
+        self.okuma_zamani = okuma_zamani
+
+
+class BoruHatti:
+    """Kare okuma ve poz çıkarımını ayrı thread'lerde çalıştırır.
+
+    okuma thread'i -> [okuma kuyruğu] -> çıkarım thread'i -> [çıkarım kuyruğu] -> sonuclar()
+    Çizim ve analiz aşaması sonuclar() üreticisini tüketen thread'dir.
+    """
+
+    def __init__(self, cap, cikarim, canli, zaman_hesapla=None,
+                 kuyruk_boyutu=2, duraklatma=None, parti_boyutu=1, zamanlayici=None):
+        self.cap = cap
+        self.cikarim = cikarim
+        self.canli = canli
+        self.zaman_hesapla = zaman_hesapla
+        # Verilirse okuma thread'i duraklatıldığında uyur
+        self.duraklatma = duraklatma
+        # Okuma ve çıkarım aşamalarının süreleri (verilmezse ölçülmez)
+        self.zamanlayici = zamanlayici or KAPALI
+
+        # Toplu çıkarım yalnızca dosyada anlamlı; canlıda en yeni kare beklenmeden işlenir
+        self.parti_boyutu = 1 if canli else max(1, parti_boyutu)
+
+        # Canlı modda tek kare yeterli; her zaman en yeni kare işlenir.
+        # Dosyada okuma kuyruğu en az bir parti kadar ileriyi çözer
+        boyut = 1 if canli else kuyruk_boyutu
+        okuma_boyutu = 1 if canli else max(kuyruk_boyutu, self.parti_boyutu)
+        self.okuma_kuyrugu = KareKuyrugu("okuma", okuma_boyutu, eskiyi_at=canli)
+        self.cikarim_kuyrugu = KareKuyrugu("cikarim", boyut, eskiyi_at=canli)
+
+        self.calisiyor = False
+        self.hata = None
+        self.okunan_kare = 0
+        self.gecikmeler = deque(maxlen=120)
+        self._threadler = []
+
+    def baslat(self):
+        self.calisiyor = True
+        self._threadler = [
+            threading.Thread(target=self._okuma_dongusu, name="kare-okuma", daemon=True),
+            threading.Thread(target=self._cikarim_dongusu, name="poz-cikarim", daemon=True),
+        ]
+        for thread in self._threadler:
+            thread.start()
+
+    def durdur(self):
+        self.calisiyor = False
+        if self.duraklatma is not None:
+            self.duraklatma.uyandir()
+        for thread in self._threadler:
+            thread.join()
+        self._threadler = []
+
+    def _aktif_mi(self):
+        return self.calisiyor
+
+    def _okuma_dongusu(self):
+        kare_no = 0
+        try:
+            while self.calisiyor:
+                if self.duraklatma is not None:
+                    self.duraklatma.bekle(self._aktif_mi)
+                    if not self.calisiyor:
+                        break
+
+                with self.zamanlayici.olc("okuma"):
+                    success, frame = self.cap.read()
+                if not success:
+                    break
+
+                zaman = self.zaman_hesapla(self.cap, kare_no) if self.zaman_hesapla else None
+                kare = IslenenKare(kare_no, zaman, frame, time.perf_counter())
+                kare_no += 1
+                self.okunan_kare = kare_no
+                if not self.okuma_kuyrugu.koy(kare, self._aktif_mi):
+                    return
+        except Exception as e:
+            self.hata = e
+        self.okuma_kuyrugu.koy(AKIS_SONU, self._aktif_mi)
+
+    def _cikarim_dongusu(self):
+        if self.parti_boyutu > 1:
+            self._toplu_cikarim_dongusu()
+            return
+
+        while self.calisiyor:
+            try:
+                kare = self.okuma_kuyrugu.al()
+            except queue.Empty:
+                continue
+
+            if kare is not AKIS_SONU:
+                try:
+                    with self.zamanlayici.olc("cikarim"):
+                        kare.results = self.cikarim(kare.kare)
+                except Exception as e:
+                    self.hata = e
+                    kare = AKIS_SONU
+
+            if not self.cikarim_kuyrugu.koy(kare, self._aktif_mi):
+                return
+            if kare is AKIS_SONU:
+                return
+
+    def _toplu_cikarim_dongusu(self):
+        # Kareleri parti_boyutu kadar biriktirip modele tek seferde verir
+        akis_bitti = False
+        while self.calisiyor and not akis_bitti:
+            parti = []
+            while len(parti) < self.parti_boyutu and self.calisiyor:
+                try:
+                    kare = self.okuma_kuyrugu.al()
+                except queue.Empty:
+                    continue
+                if kare is AKIS_SONU:
+                    akis_bitti = True
+                    break
+                parti.append(kare)
+
+            if not parti:
+                continue
+
+            try:
+                baslangic = time.perf_counter()
+                results = self.cikarim([kare.kare for kare in parti])
+            except Exception as e:
+                self.hata = e
+                break
+            # Parti süresi kare başına dağıtılır, histogram kare başına kalır
+            kare_basina = (time.perf_counter() - baslangic) / len(parti)
+            for _ in parti:
+                self.zamanlayici.kaydet("cikarim", kare_basina)
+
+            # Her kare kendi tek elemanlı sonuç listesiyle, okunma sırasıyla gider
+            for kare, sonuc in zip(parti, results):
+                kare.results = [sonuc]
+                if not self.cikarim_kuyrugu.koy(kare, self._aktif_mi):
+                    return
+
+        self.cikarim_kuyrugu.koy(AKIS_SONU, self._aktif_mi)
+
+    def sonuclar(self, devam_et=None):
+        """Çıkarımı biten kareleri sırayla döndürür, akış bitince durur"""
+        while self.calisiyor and (devam_et is None or devam_et()):
+            try:
+                kare = self.cikarim_kuyrugu.al()
+            except queue.Empty:
+                continue
+            if kare is AKIS_SONU:
+                return
+            yield kare
+
+    def kare_tamamlandi(self, kare):
+        # Okumadan emit edilene kadar geçen süre
+        self.gecikmeler.append(time.perf_counter() - kare.okuma_zamani)
+
+    def istatistik(self):
+        gecikme = sum(self.gecikmeler) / len(self.gecikmeler) if self.gecikmeler else 0
+        return {
+            "kuyruk_derinlikleri": {
+                "okuma": self.okuma_kuyrugu.derinlik(),
+                "cikarim": self.cikarim_kuyrugu.derinlik()
+            },
+            "en_yuksek_derinlikler": {
+                "okuma": self.okuma_kuyrugu.en_yuksek_derinlik,
+                "cikarim": self.cikarim_kuyrugu.en_yuksek_derinlik
+            },
+            "atilan_kareler": {
+                "okuma": self.okuma_kuyrugu.atilan,
+                "cikarim": self.cikarim_kuyrugu.atilan
+            },
+            "gecikme_ms": gecikme * 1000
+        }
@@ -0,0 +1,207 @@
+import math
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+# Durum başına çizgi rengi (başlangıç, giriş, çıkış); egzersiz tanınmadan önceki kareler gri
+DURUM_RENKLERI = ("#4FC3F7", "#FF9800", "#66BB6A")
+TANINMADI_RENGI = "#9E9E9E"
+
+# Bundan uzun arayla gelen iki örnek birleştirilmez (kişi kayboldu, duraklatıldı)
+BOSLUK_SN = 0.5
+
+
+class CanliGrafik(QWidget):
+    """HareketGecmisi'ndeki aktif egzersiz açısını ve ortalama keypoint güvenini zamana karşı çizer.
+
+    Çizim ekran dışı bir QPixmap'te tutulur. Her güncellemede yalnızca son çizimden
+    beri yazılan örnekler eklenir: tuval geçen süre kadar yerinde sola kaydırılır ve
+    yeni çizgi parçaları sağ kenara çizilir; paintEvent tuvali tek seferde boyar.
+    Geçmişin görünen kısmı yalnızca boyut, egzersiz veya geçmiş değişince yeniden çizilir.
+    """
+
+    def __init__(self, katalog, saniye=10.0, parent=None):
+        super().__init__(parent)
+        self.katalog = katalog
+        # Görünen zaman penceresi
+        self.saniye = saniye
+        self.setMinimumHeight(120)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        self.gecmis = None
+        self._nesil = -1
+        self._aktif = -1
+        # Tuvale çizilmiş son örneğin bir sonrası (geçmişteki sıra numarası)
+        self._okunan = 0
+        self._tuval = None
+        # Tuvalin sağ kenarındaki zaman ve kaydırmadan artan piksel kesri
+        self._sag_zaman = 0.0
+        self._kesir = 0.0
+        # Son çizilen noktanın zamanı ve (x'ten bağımsız) açı ve güven yükseklikleri
+        self._onceki = None
+
+        # Kalem ve renkler bir kez oluşturulur
+        self._arka_plan = QColor("#212121")
+        self._durum_kalemleri = [QPen(QColor(renk), 2) for renk in DURUM_RENKLERI]
+        self._taninmadi_kalemi = QPen(QColor(TANINMADI_RENGI), 2)
+        self._guven_kalemi = QPen(QColor(255, 255, 255, 70), 1)
+        self._esik_kalemi = QPen(QColor("#757575"), 1, Qt.DashLine)
+        self._yazi_kalemi = QPen(QColor("#E0E0E0"))
+
+    @property
+    def _piksel_saniye(self):
+        return max(1, self.width()) / self.saniye
+
+    def _aci_y(self, aci):
+        # 0-180 derece alttan üste
+        return (self.height() - 4) * (1 - aci / 180.0) + 2
+
+    def _guven_y(self, guven):
+        return (self.height() - 4) * (1 - guven) + 2
+
+    def guncelle(self, gecmis):
+        """Geçmişe son çizimden beri eklenen örnekleri tuvale ekler"""
+        if gecmis is None or not self.isVisible():
+            return
+        son = gecmis.yazilan
+        if not son:
+            if self.gecmis is not gecmis or gecmis.nesil != self._nesil:
+                self.gecmis = gecmis
+                self._nesil = gecmis.nesil
+                self._aktif = -1
+                self.yeniden_ciz()
+            return
+        aktif = int(gecmis.aktifler[gecmis.yuva(son - 1)])
+        yeni_zaman = float(gecmis.zamanlar[gecmis.yuva(son - 1)])
+        if (gecmis is not self.gecmis or gecmis.nesil != self._nesil or self._tuval is None
+                or (aktif >= 0 and aktif != self._aktif) or son - self._okunan >= gecmis.kapasite
+                or yeni_zaman < self._sag_zaman):
+            # Yeni geçmiş, yeni egzersiz, geri sarma veya geride kalma: görünen pencere baştan
+            if gecmis is not self.gecmis or gecmis.nesil != self._nesil:
+                self._aktif = -1
+            self.gecmis = gecmis
+            self._nesil = gecmis.nesil
+            if aktif >= 0:
+                self._aktif = aktif
+            self.yeniden_ciz()
+            return
+        if son == self._okunan:
+            return
+
+        piksel = (yeni_zaman - self._sag_zaman) * self._piksel_saniye + self._kesir
+        kayma = int(piksel)
+        if kayma >= self._tuval.width():
+            self.yeniden_ciz()
+            return
+        self._kesir = piksel - kayma
+        self._sag_zaman = yeni_zaman - self._kesir / self._piksel_saniye
+
+        cizici = QPainter(self._tuval)
+        if kayma:
+            # Tuval yerinde kayar; açılan şerit temizlenip eşik çizgileri uzatılır
+            self._tuval.scroll(-kayma, 0, self._tuval.rect())
+            genislik = self._tuval.width()
+            cizici.fillRect(genislik - kayma, 0, kayma, self._tuval.height(), self._arka_plan)
+            self._esikleri_ciz(cizici, genislik - kayma - 1, genislik)
+        self._ornekleri_ciz(cizici, self._okunan, son)
+        cizici.end()
+        self._okunan = son
+        self.update()
+
+    def yeniden_ciz(self):
+        """Tuvali boyutta yeniden oluşturup görünen penceredeki örnekleri çizer"""
+        if self.width() <= 0 or self.height() <= 0:
+            return
+        if self._tuval is None or self._tuval.size() != self.size():
+            self._tuval = QPixmap(self.size())
+        self._tuval.fill(self._arka_plan)
+        self._onceki = None
+        self._kesir = 0.0
+        cizici = QPainter(self._tuval)
+        self._esikleri_ciz(cizici, 0, self._tuval.width())
+
+        gecmis = self.gecmis
+        if gecmis is not None and gecmis.yazilan:
+            son = gecmis.yazilan
+            self._sag_zaman = float(gecmis.zamanlar[gecmis.yuva(son - 1)])
+            # Pencereye giren ilk örnek geriye doğru aranır
+            ilk = son - 1
+            while ilk > gecmis.ilk_sira() and (
+                    self._sag_zaman - gecmis.zamanlar[gecmis.yuva(ilk - 1)] <= self.saniye):
+                ilk -= 1
+            self._ornekleri_ciz(cizici, ilk, son)
+            self._okunan = son
+        else:
+            self._sag_zaman = 0.0
+            self._okunan = 0
+        cizici.end()
+        self.update()
+
+    def _esikleri_ciz(self, cizici, x1, x2):
+        if not 0 <= self._aktif < len(self.katalog):
+            return
+        tanim = self.katalog.tanimlar[self._aktif]
+        cizici.setPen(self._esik_kalemi)
+        for esik in (tanim.giris_esigi, tanim.cikis_esigi):
+            y = int(self._aci_y(esik))
+            cizici.drawLine(x1, y, x2, y)
+
+    def _ornekleri_ciz(self, cizici, ilk, son):
+        gecmis = self.gecmis
+        e = self._aktif
+        sag = self._tuval.width() - 1
+        piksel_saniye = self._piksel_saniye
+        for sira in range(ilk, son):
+            i = gecmis.yuva(sira)
+            zaman = float(gecmis.zamanlar[i])
+            aci = float(gecmis.acilar[i, e]) if e >= 0 else math.nan
+            guven = float(gecmis.guvenler[i].mean())
+            onceki = self._onceki
+            self._onceki = (zaman, self._aci_y(aci) if aci == aci else None, self._guven_y(guven))
+            if onceki is None or not 0 <= zaman - onceki[0] <= BOSLUK_SN:
+                continue
+
+            x0 = int(sag - (self._sag_zaman - onceki[0]) * piksel_saniye)
+            x1 = int(sag - (self._sag_zaman - zaman) * piksel_saniye)
+            cizici.setPen(self._guven_kalemi)
+            cizici.drawLine(x0, int(onceki[2]), x1, int(self._onceki[2]))
+            if onceki[1] is not None and self._onceki[1] is not None:
+                if gecmis.aktifler[i] == e:
+                    cizici.setPen(self._durum_kalemleri[gecmis.durumlar[i]])
+                else:
+                    cizici.setPen(self._taninmadi_kalemi)
+                cizici.drawLine(x0, int(onceki[1]), x1, int(self._onceki[1]))
+
+    def paintEvent(self, event):
+        cizici = QPainter(self)
+        if self._tuval is not None and self._tuval.size() == self.size():
+            cizici.drawPixmap(0, 0, self._tuval)
+        else:
+            cizici.fillRect(self.rect(), self._arka_plan)
+
+        # Yazılar tuvalle kaymasın diye her boyamada üstüne yazılır
+        cizici.setPen(self._yazi_kalemi)
+        if 0 <= self._aktif < len(self.katalog):
+            tanim = self.katalog.tanimlar[self._aktif]
+            baslik = f"{tanim.baslik} açısı | giriş {tanim.giris_esigi:g}°, çıkış {tanim.cikis_esigi:g}°"
+            gecmis = self.gecmis
+            if gecmis is not None and gecmis.yazilan:
+                aci = gecmis.acilar[gecmis.yuva(gecmis.yazilan - 1), self._aktif]
+                if aci == aci:
+                    baslik += f" | şimdi {aci:.0f}°"
+        else:
+            baslik = "Açı grafiği: egzersiz tanınıyor..."
+        cizici.drawText(6, 14, baslik)
+        pencere = f"son {self.saniye:g} sn"
+        cizici.drawText(self.width() - cizici.fontMetrics().horizontalAdvance(pencere) - 6, 14, pencere)
+        cizici.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.yeniden_ciz()
+
+    def showEvent(self, event):
+        # Gizliyken örnek eklenmedi; görünen pencere baştan çizilir
+        super().showEvent(event)
+        self.yeniden_ciz()
@@ -0,0 +1,63 @@
+import numpy as np
+
+from egzersiz_motoru import varsayilan_katalog
+
+
+def tekrarlari_say(mod, keypoints, zamanlar, tespit=None, frame_height=0, katalog=None):
+    """Bütün keypoint serisindeki tekrarları akış analizcisiyle aynı kurallarla sayar.
+
+    Koşullar egzersiz kataloğundan gelir ve tüm seri için tek seferde maskelenir;
+    durum makinesi yalnızca tekrar başına bir kez, aday indeksleri üzerinde ikili
+    arama ile ilerler.
+    """
+    if katalog is None:
+        katalog = varsayilan_katalog()
+    keypoints = np.asarray(keypoints)
+    zamanlar = np.asarray(zamanlar, dtype=np.float64)
+    if tespit is None:
+        tespit = np.ones(len(zamanlar), dtype=bool)
+    tespit = np.asarray(tespit, dtype=bool)
+
+    tekrarlar = []
+    if len(zamanlar) == 0:
+        return tekrarlar
+
+    ozellik = katalog.ozellikleri_hesapla(keypoints)
+    giris_maskesi, cikis_maskesi = katalog.aday_maskeleri(mod, ozellik, frame_height)
+    giris_maskesi &= tespit
+    cikis_maskesi &= tespit
+    girisler = np.flatnonzero(giris_maskesi)
+    cikislar = np.flatnonzero(cikis_maskesi)
+    cikis_zamanlari = zamanlar[cikislar]
+    bekleme = katalog.tanim(mod).bekleme
+
+    i = 0
+    while i < len(girisler):
+        giris = girisler[i]
+        t0 = zamanlar[giris]
+
+        # Girişten sonraki ve bekleme süresini dolduran ilk çıkış adayı
+        alt = np.searchsorted(cikislar, giris, side="right")
+        j = max(alt, np.searchsorted(cikis_zamanlari, t0 + bekleme, side="left"))
+        # t0 + bekleme yuvarlaması ile (t - t0) karşılaştırması farklı olabilir, sınırı düzelt
+        while j > alt and katalog.bekleme_doldu(mod, cikis_zamanlari[j - 1] - t0):
+            j -= 1
+        while j < len(cikislar) and not katalog.bekleme_doldu(mod, cikis_zamanlari[j] - t0):
+            j += 1
+        if j >= len(cikislar):
+            break
+
+        cikis = cikislar[j]
+        tekrarlar.append({
+            "mod": mod,
+            "baslangic": float(t0),
+            "bitis": float(zamanlar[cikis]),
+            "sure": float(zamanlar[cikis] - t0),
+            "baslangic_kare": int(giris),
+            "bitis_kare": int(cikis)
+        })
+
+        # Çıkıştan sonraki ilk giriş adayıyla yeni tekrar başlar
+        i = np.searchsorted(girisler, cikis, side="right")
+
+    return tekrarlar
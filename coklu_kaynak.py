@@ -0,0 +1,447 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+from boru_hatti import AKIS_SONU, BoruHatti, video_kare_zamani
+from olcum import KAPALI
+
+
+def kaynak_coz(tanim):
+    """Kaynak tanımını (cv2 kaynağı, canlı mı, ad) üçlüsüne çevirir.
+
+    Yalnızca rakamlardan oluşan tanım webcam numarasıdır, diğerleri video dosyası.
+    """
+    tanim = str(tanim).strip()
+    if tanim.isdigit():
+        return int(tanim), True, f"Kamera {tanim}"
+    return tanim, False, os.path.basename(tanim)
+
+
+class KaynakHatti(BoruHatti):
+    """Kendi çıkarım thread'i olmayan boru hattı.
+
+    Okuma thread'i kareleri kendi kuyruğuna koyar; çıkarımı OrtakCikarim diğer
+    kaynakların kareleriyle aynı partide yapar ve sonucu bu hattın çıkarım
+    kuyruğuna geri koyar. Tüketici tarafı (sonuclar, istatistik) BoruHatti ile aynıdır.
+    """
+
+    def __init__(self, ortak, ad, cap, canli, zaman_hesapla=None, duraklatma=None, zamanlayici=None):
+        # Dosyada okuma kuyruğu bir partiyi dolduracak kadar ileriyi çözer
+        super().__init__(cap, None, canli, zaman_hesapla=zaman_hesapla, duraklatma=duraklatma,
+                         parti_boyutu=ortak.en_buyuk_parti, zamanlayici=zamanlayici)
+        self.ortak = ortak
+        self.ad = ad
+        self.islenen_kare = 0
+        self.okuma_kuyrugu.bildir = ortak.uyar
+
+    def baslat(self):
+        self.calisiyor = True
+        self._threadler = [
+            threading.Thread(target=self._okuma_dongusu, name=f"kare-okuma-{self.ad}", daemon=True)
+        ]
+        self._threadler[0].start()
+        self.ortak.ekle(self)
+
+    def durdur(self):
+        self.ortak.cikar(self)
+        super().durdur()
+
+
+class OrtakCikarim:
+    """Birden çok kaynağın karelerini tek thread'de ortak partilerle modele verir.
+
+    Kaynaklar sırayla dolaşılır ve her birinden bekleyen en eski kare alınır;
+    parti en_buyuk_parti'ye ulaşana veya bekleyen kare kalmayana kadar tur
+    tekrarlanır. Partiye henüz katılmamış kaynak varsa onun karesi için en fazla
+    bekleme_suresi kadar beklenir. Sonuçlar karenin kendi hattına döner.
+
+    Bir kaynağın çıkarım kuyruğunda yer yoksa (tüketicisi yavaş veya duraklatılmış)
+    o kaynaktan kare alınmaz; sonuç dağıtılırken hiçbir kaynak diğerini bekletmez.
+
+    Kazancı bellektir: kaynak sayısı ne olursa olsun bellekte tek model durur.
+    CPU'da partiler kaynak başına ayrı model ve thread'den hızlı değildir; bu
+    yüzden varsayılan ayrı thread'lerdir (coklu --karsilastir ile ölçülebilir).
+    """
+
+    def __init__(self, cikarim, en_buyuk_parti=8, bekleme_suresi=0.005, zamanlayici=None):
+        self.cikarim = cikarim
+        self.en_buyuk_parti = max(1, en_buyuk_parti)
+        self.bekleme_suresi = bekleme_suresi
+        self.zamanlayici = zamanlayici or KAPALI
+
+        self._hatlar = []
+        self._kilit = threading.Lock()
+        self._uyari = threading.Event()
+        self._sira = 0
+        self.calisiyor = False
+        self._thread = None
+
+        self.parti_sayisi = 0
+        self.kare_sayisi = 0
+        self.cikarim_suresi = 0.0
+        self.hata = None
+
+    def uyar(self):
+        self._uyari.set()
+
+    def ekle(self, hat):
+        with self._kilit:
+            self._hatlar.append(hat)
+        self.uyar()
+
+    def cikar(self, hat):
+        with self._kilit:
+            if hat in self._hatlar:
+                self._hatlar.remove(hat)
+
+    def baslat(self):
+        self.calisiyor = True
+        self._thread = threading.Thread(target=self._dongu, name="ortak-cikarim", daemon=True)
+        self._thread.start()
+
+    def durdur(self):
+        self.calisiyor = False
+        self.uyar()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _dongu(self):
+        while self.calisiyor:
+            self._uyari.clear()
+            parti = []
+            self._topla(parti)
+            if not parti:
+                self._uyari.wait(0.1)
+                continue
+
+            # Henüz katılmayan kaynakların karesi birazdan gelecekse aynı partiye girsin
+            son = time.perf_counter() + self.bekleme_suresi
+            while len(parti) < self.en_buyuk_parti and self.calisiyor and not self._hepsi_katildi(parti):
+                kalan = son - time.perf_counter()
+                if kalan <= 0:
+                    break
+                self._uyari.wait(kalan)
+                self._uyari.clear()
+                self._topla(parti)
+
+            self._isle(parti)
+
+    def _hepsi_katildi(self, parti):
+        katilan = {id(hat) for hat, _ in parti}
+        with self._kilit:
+            return all(id(hat) in katilan for hat in self._hatlar)
+
+    def _topla(self, parti):
+        """Kaynakları sırayla dolaşıp partiye (hat, kare) ekler"""
+        with self._kilit:
+            hatlar = list(self._hatlar)
+        if not hatlar:
+            return
+        # Her partide bir sonraki kaynaktan başlanır, ilk kaynak hep öne geçmesin
+        self._sira = (self._sira + 1) % len(hatlar)
+        hatlar = hatlar[self._sira:] + hatlar[:self._sira]
+
+        ilerledi = True
+        while ilerledi and len(parti) < self.en_buyuk_parti:
+            ilerledi = False
+            for hat in hatlar:
+                if len(parti) >= self.en_buyuk_parti:
+                    break
+                if not hat.calisiyor:
+                    continue
+                # Canlı kuyruk eskiyi atar; dosyada sonucun konacağı yer önceden ayrılır
+                if not hat.canli and hat.cikarim_kuyrugu.bos_yer() <= sum(h is hat for h, _ in parti):
+                    continue
+                kare = hat.okuma_kuyrugu.hemen_al()
+                if kare is None:
+                    continue
+                if kare is AKIS_SONU:
+                    # Akış sonu, kaynağın partideki karelerinden sonra iletilir
+                    self.cikar(hat)
+                    hatlar = [h for h in hatlar if h is not hat]
+                parti.append((hat, kare))
+                ilerledi = True
+
+    def _isle(self, parti):
+        kareler = [(hat, kare) for hat, kare in parti if kare is not AKIS_SONU]
+        if kareler:
+            try:
+                baslangic = time.perf_counter()
+                results = self.cikarim([kare.kare for _, kare in kareler])
+                sure = time.perf_counter() - baslangic
+            except Exception as e:
+                # Partideki kaynaklar hatayı görür ve akışları biter
+                self.hata = e
+                hatlar = {id(hat): hat for hat, _ in parti}.values()
+                for hat in hatlar:
+                    hat.hata = e
+                    self.cikar(hat)
+                    hat.cikarim_kuyrugu.koy(AKIS_SONU, hat._aktif_mi)
+                return
+
+            self.parti_sayisi += 1
+            self.kare_sayisi += len(kareler)
+            self.cikarim_suresi += sure
+            # Parti süresi kare başına dağıtılır, histogram kare başına kalır
+            for _ in kareler:
+                self.zamanlayici.kaydet("cikarim", sure / len(kareler))
+            for (hat, kare), sonuc in zip(kareler, results):
+                kare.results = [sonuc]
+                hat.islenen_kare += 1
+
+        for hat, kare in parti:
+            hat.cikarim_kuyrugu.koy(kare, hat._aktif_mi)
+
+    def istatistik(self):
+        with self._kilit:
+            kaynak_sayisi = len(self._hatlar)
+        return {
+            "kaynak_sayisi": kaynak_sayisi,
+            "parti_sayisi": self.parti_sayisi,
+            "kare_sayisi": self.kare_sayisi,
+            "ortalama_parti": self.kare_sayisi / self.parti_sayisi if self.parti_sayisi else 0,
+            "cikarim_fps": self.kare_sayisi / self.cikarim_suresi if self.cikarim_suresi > 0 else 0
+        }
+
+
+def _kaynagi_ac(tanim):
+    kaynak, canli, ad = kaynak_coz(tanim)
+    cap = cv2.VideoCapture(kaynak)
+    if not cap.isOpened():
+        raise IOError(f"Kaynak açılamadı: {tanim}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    zaman_hesapla = None if canli else (lambda c, no: video_kare_zamani(c, no, video_fps))
+    return cap, canli, ad, zaman_hesapla
+
+
+def _kaynagi_tuket(hat, analiz, yumusatici, sonuc, devam_et):
+    """Bir kaynağın çıkarımı biten karelerini kendi analizcisinden geçirir"""
+    from spor_gui import ilk_kisi_keypoints
+
+    kare_zamani = 0.0
+    frame_height = 0
+    for kare in hat.sonuclar(devam_et):
+        kare_zamani = kare.zaman if kare.zaman is not None else time.time()
+        frame_height = kare.kare.shape[0]
+        keypoints = ilk_kisi_keypoints(kare.results)
+        if keypoints is not None:
+            if yumusatici is not None:
+                keypoints = yumusatici.tek(keypoints, kare_zamani, frame_height)
+            analiz.hareket_analiz(keypoints, frame_height, kare_zamani, kare_no=kare.no)
+        hat.kare_tamamlandi(kare)
+        sonuc["kare_sayisi"] += 1
+    sonuc["video_suresi"] = kare_zamani
+
+
+def _kaynaklari_calistir(kaynaklar, mod, hat_olustur, yumusat, sure):
+    """Her kaynak için hat ve tüketici thread'i açar; bitince kaynak başına sonuç döndürür"""
+    from spor_gui import SporHareketAnalizi, analiz_sayaclari, analiz_sonucu_olustur, sonuc_modu
+    from egzersiz_tanima import OTOMATIK
+    from yumusatma import KeypointYumusatici
+
+    bitis = time.perf_counter() + sure if sure else None
+
+    def devam_et():
+        return bitis is None or time.perf_counter() < bitis
+
+    isler = []
+    try:
+        for tanim in kaynaklar:
+            cap, canli, ad, zaman_hesapla = _kaynagi_ac(tanim)
+            if canli and bitis is None:
+                cap.release()
+                raise ValueError(f"Canlı kaynak için --sure verilmeli: {tanim}")
+            hat = hat_olustur(ad, cap, canli, zaman_hesapla)
+            # Model analizcide kullanılmaz; çıkarım hatta yapılır
+            analiz = SporHareketAnalizi(model=object())
+            analiz.kaynak = ad
+            analiz.mod_degistir(mod)
+            sonuc = {"kare_sayisi": 0, "video_suresi": 0.0}
+            thread = threading.Thread(
+                target=_kaynagi_tuket, name=f"analiz-{ad}",
+                args=(hat, analiz, KeypointYumusatici() if yumusat else None, sonuc, devam_et),
+                daemon=True)
+            isler.append((tanim, cap, hat, analiz, sonuc, thread))
+
+        baslangic = time.perf_counter()
+        for _, _, hat, _, _, thread in isler:
+            hat.baslat()
+            thread.start()
+        for _, _, _, _, _, thread in isler:
+            thread.join()
+        gecen = time.perf_counter() - baslangic
+    finally:
+        for _, cap, hat, _, _, _ in isler:
+            hat.durdur()
+            cap.release()
+
+    sonuclar = []
+    for tanim, _, hat, analiz, sayim, _ in isler:
+        if hat.hata is not None:
+            sonuclar.append({"video": tanim, "mod": mod, "hata": str(hat.hata)})
+            continue
+        sonuc = analiz_sonucu_olustur(tanim, sonuc_modu(analiz, mod), analiz_sayaclari(analiz),
+                                      analiz.tekrar_kayitlari, sayim["kare_sayisi"],
+                                      sayim["video_suresi"], gecen)
+        sonuc["otomatik"] = mod == OTOMATIK
+        sonuc["boru_hatti"] = hat.istatistik()
+        sonuclar.append(sonuc)
+    return sonuclar, gecen
+
+
+def coklu_kaynak_analiz_et(kaynaklar, mod, en_buyuk_parti=None, bekleme_suresi=0.005, model=None,
+                           yumusat=False, sure=None):
+    """Kaynakları tek modelle, kareleri ortak partilerde işleyerek aynı anda analiz eder.
+
+    Her kaynağın kendi okuma thread'i ve SporHareketAnalizi durumu vardır; çıkarımı
+    tek bir thread yapar. Canlı kaynaklar sure saniye sonra durdurulur.
+    """
+    import model_deposu
+    from model_deposu import CIKARIM_AYARLARI
+
+    model = model or model_deposu.model_al()
+    ortak = OrtakCikarim(lambda kareler: model(kareler, verbose=False, **CIKARIM_AYARLARI),
+                         en_buyuk_parti or len(kaynaklar), bekleme_suresi)
+
+    def hat_olustur(ad, cap, canli, zaman_hesapla):
+        return KaynakHatti(ortak, ad, cap, canli, zaman_hesapla)
+
+    ortak.baslat()
+    try:
+        sonuclar, gecen = _kaynaklari_calistir(kaynaklar, mod, hat_olustur, yumusat, sure)
+    finally:
+        ortak.durdur()
+    return _toplu_rapor(sonuclar, gecen, "ortak", ortak.istatistik())
+
+
+def ayri_threadlerle_analiz_et(kaynaklar, mod, modeller=None, yumusat=False, sure=None):
+    """Karşılaştırma için: her kaynak kendi modeli ve boru hattıyla ayrı thread'de işlenir"""
+    import model_deposu
+    from model_deposu import CIKARIM_AYARLARI
+
+    # Paylaşılan model aynı anda tek thread'den çağrılabilir; her kaynağa ayrı model.
+    # Yükleme süresi ölçüme girmez
+    modeller = list(modeller or [])
+    while len(modeller) < len(kaynaklar):
+        modeller.append(model_deposu.ayri_model_yukle())
+    sira = iter(modeller)
+
+    def hat_olustur(ad, cap, canli, zaman_hesapla):
+        model = next(sira)
+        return BoruHatti(cap, lambda frame: model(frame, verbose=False, **CIKARIM_AYARLARI), canli,
+                         zaman_hesapla=zaman_hesapla)
+
+    sonuclar, gecen = _kaynaklari_calistir(kaynaklar, mod, hat_olustur, yumusat, sure)
+    return _toplu_rapor(sonuclar, gecen, "ayri")
+
+
+def _toplu_rapor(sonuclar, gecen, yontem, cikarim=None):
+    toplam_kare = sum(sonuc.get("kare_sayisi", 0) for sonuc in sonuclar)
+    rapor = {
+        "yontem": yontem,
+        "kaynak_sayisi": len(sonuclar),
+        "toplam_kare": toplam_kare,
+        "toplam_sure": gecen,
+        "toplam_fps": toplam_kare / gecen if gecen > 0 else 0,
+        "kaynaklar": sonuclar
+    }
+    if cikarim is not None:
+        rapor["cikarim"] = cikarim
+    return rapor
+
+
+def raporu_yazdir(rapor):
+    print(f"{'Kaynak':<24}{'Mod':<14}{'Tekrar':>7}{'Kare':>7}{'FPS':>8}")
+    for sonuc in rapor["kaynaklar"]:
+        ad = os.path.basename(str(sonuc["video"]))
+        if "hata" in sonuc:
+            print(f"{ad:<24}{str(sonuc['mod']):<14}  HATA: {sonuc['hata']}")
+            continue
+        print(f"{ad:<24}{sonuc['mod'] or 'tanınamadı':<14}{sonuc['sayi']:>7}{sonuc['kare_sayisi']:>7}"
+              f"{sonuc['fps']:>8.1f}")
+    satir = (f"Toplam: {rapor['toplam_kare']} kare, {rapor['toplam_sure']:.2f} sn, "
+             f"{rapor['toplam_fps']:.1f} fps ({rapor['kaynak_sayisi']} kaynak)")
+    if "cikarim" in rapor:
+        satir += (f" | ortalama parti {rapor['cikarim']['ortalama_parti']:.1f}, "
+                  f"{rapor['cikarim']['parti_sayisi']} parti")
+    print(satir)
+
+
+def coklu_main(argv):
+    """python spor_gui.py coklu <kaynak...> komutunu çalıştırır"""
+    import model_deposu
+    from egzersiz_motoru import varsayilan_katalog
+    from egzersiz_tanima import OTOMATIK
+    from olay_gunlugu import gunlugu_kur
+    from spor_gui import (arka_uc_argumanlari_ekle, olay_veritabani_argumani_ekle, olay_veritabanini_kapat,
+                          yumusatma_argumani_ekle)
+
+    parser = argparse.ArgumentParser(prog="spor_gui.py coklu",
+                                     description="Birden çok kamerayı veya videoyu aynı anda analiz eder")
+    parser.add_argument("kaynaklar", nargs="+",
+                        help="Webcam numaraları (0, 1...) veya kamera yerine oynatılacak video dosyaları")
+    parser.add_argument("--mode", default=OTOMATIK, choices=varsayilan_katalog().adlar + [OTOMATIK],
+                        help="Tüm kaynaklar için egzersiz modu (varsayılan: hareketten otomatik tanı)")
+    parser.add_argument("--ortak", action="store_true",
+                        help="Kaynak başına ayrı model yerine tek modelle ortak partilerde işle "
+                             "(kaynak başına ~30 MB bellek tasarrufu; tek çekirdekli CPU'da daha yavaş)")
+    parser.add_argument("--parti", type=int, default=None,
+                        help="--ortak: bir çıkarımdaki en fazla kare sayısı (varsayılan: kaynak sayısı)")
+    parser.add_argument("--bekleme-ms", type=float, default=5.0,
+                        help="--ortak: parti dolmadıysa diğer kaynakların karesini bekleme süresi "
+                             "(varsayılan: 5)")
+    parser.add_argument("--sure", type=float, default=None,
+                        help="Bu kadar saniye sonra dur (canlı kaynaklarda gerekli)")
+    parser.add_argument("--karsilastir", action="store_true",
+                        help="Aynı kaynakları diğer yöntemle de (ayrı thread'ler / ortak parti) işleyip "
+                             "toplam hızı karşılaştır")
+    parser.add_argument("--rapor", default=None, help="Özet raporun yazılacağı JSON dosyası")
+    yumusatma_argumani_ekle(parser)
+    arka_uc_argumanlari_ekle(parser)
+    olay_veritabani_argumani_ekle(parser)
+    args = parser.parse_args(argv)
+    if args.olay_db:
+        gunlugu_kur("WARNING", veritabani_yolu=args.olay_db)
+    model_deposu.arka_uc_sec(args.arka_uc)
+    model_deposu.imgsz_sec(args.imgsz)
+
+    def ortak_calistir():
+        return coklu_kaynak_analiz_et(args.kaynaklar, args.mode, args.parti, args.bekleme_ms / 1000,
+                                      yumusat=args.yumusat, sure=args.sure)
+
+    def ayri_calistir():
+        return ayri_threadlerle_analiz_et(args.kaynaklar, args.mode, yumusat=args.yumusat, sure=args.sure)
+
+    try:
+        rapor = ortak_calistir() if args.ortak else ayri_calistir()
+        raporu_yazdir(rapor)
+        # Karşılaştırma çalıştırmasının olayları oturuma ikinci kez girmesin
+        olay_veritabanini_kapat()
+        if args.karsilastir:
+            diger = ayri_calistir() if args.ortak else ortak_calistir()
+            rapor["ayri_threadler" if args.ortak else "ortak_parti"] = diger
+            ortak, ayri = (rapor, diger) if args.ortak else (diger, rapor)
+            kazanc = ortak["toplam_fps"] / ayri["toplam_fps"] if ayri["toplam_fps"] > 0 else 0
+            print(f"Ayrı thread'ler: {ayri['toplam_fps']:.1f} fps | Ortak parti: "
+                  f"{ortak['toplam_fps']:.1f} fps ({kazanc:.2f}x)")
+            farkli = [os.path.basename(str(a["video"])) for a, b in zip(rapor["kaynaklar"], diger["kaynaklar"])
+                      if a.get("sayi") != b.get("sayi")]
+            if farkli and args.sure is None:
+                print(f"UYARI: sayılar farklı: {', '.join(farkli)}")
+    except (IOError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        olay_veritabanini_kapat()
+
+    if args.rapor:
+        with open(args.rapor, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"Rapor kaydedildi: {args.rapor}")
+    return 1 if any("hata" in sonuc for sonuc in rapor["kaynaklar"]) else 0
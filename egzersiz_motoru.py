@@ -0,0 +1,257 @@
+import json
+import os
+
+import numpy as np
+
+from ozellikler import GUVEN_ESIGI, OzellikPlani, nokta_indeksi
+
+VARSAYILAN_TANIMLAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "egzersizler.json")
+
+KOSULLAR = {"<": 0, ">": 1, "<=": 2, ">=": 3}
+
+# Her egzersizin durumları: 0 başlangıç, 1 giriş pozisyonu, 2 çıkış pozisyonu
+BASLANGIC, GIRIS_DURUMU, CIKIS_DURUMU = 0, 1, 2
+
+# Durum başına sınanan koşul (0 giriş, 1 çıkış), hedef durum, bekleme şartı ve sayma
+_SINANAN = np.array([0, 1, 0])
+_HEDEF = np.array([GIRIS_DURUMU, CIKIS_DURUMU, GIRIS_DURUMU])
+_BEKLEME_SARTI = np.array([False, True, False])
+_SAYAR = np.array([False, True, False])
+
+# Kare başına egzersiz olayları
+GECERSIZ, REDDEDILDI, TUT, GECTI, BEKLENIYOR = range(5)
+
+# Başarılı geçiş ve koşulu bekleme mesajları, durum başına
+_GECIS_MESAJI = ("girdi", "tamamlandi", "girdi")
+_BEKLEME_MESAJI = ("giris_bekleniyor", "cikis_bekleniyor", "giris_bekleniyor")
+
+_VARSAYILAN_MESAJLAR = {
+    "gecersiz": "Vücut noktaları net değil, pozisyonunu düzelt",
+    "reddedildi": "Bu pozisyon {baslik} için uygun değil",
+    "giris_bekleniyor": "{baslik} için pozisyon al",
+    "girdi": "{baslik} pozisyonunda, biraz bekle",
+    "tut": "{baslik} pozisyonunda tut...",
+    "cikis_bekleniyor": "{baslik} pozisyonundan çık",
+    "tamamlandi": "{baslik} tamamlandı! Toplam: {sayi}",
+    "hata": "{baslik} analiz hatası: {hata}",
+}
+
+
+class EgzersizTanimi:
+    """Tek egzersizin derlenmiş tanımı (eşikler, durum adları, mesaj şablonları)"""
+
+    def __init__(self, ad, tanim):
+        self.ad = ad
+        self.baslik = tanim.get("baslik", ad)
+        self.aci = tanim["aci"]
+        self.guven_noktalari = [nokta_indeksi(n) for n in tanim["guven_noktalari"]]
+        durumlar = tanim["durumlar"]
+        self.durumlar = ("baslangic", durumlar["giris"], durumlar["cikis"])
+        self.giris_esigi = float(tanim["giris"]["esik"])
+        self.cikis_esigi = float(tanim["cikis"]["esik"])
+        self.bekleme = float(tanim.get("bekleme", 0.0))
+        # Şınav "süre < bekleme ise bekle" der, diğerleri "süre > bekleme" ister
+        self.bekleme_esit_dahil = bool(tanim.get("bekleme_esit_dahil", False))
+        self.mesajlar = dict(_VARSAYILAN_MESAJLAR, **tanim.get("mesajlar", {}))
+        # Otomatik tanıma ayarları; yoksa egzersiz yalnızca elle seçilebilir
+        self.tanima = tanim.get("tanima")
+
+        # Koşul grupları: her grup kendi içinde VE ile birleşir
+        self.gruplar = {
+            "reddet": list(tanim.get("reddet", [])),
+            "giris": [dict(tanim["giris"], ozellik=self.aci)] + list(tanim.get("giris_kosullari", [])),
+            "cikis": [dict(tanim["cikis"], ozellik=self.aci)] + list(tanim.get("cikis_kosullari", [])),
+        }
+
+    def mesaj(self, tur, **alanlar):
+        sablon = self.mesajlar[tur]
+        # NaN açı int'e çevrilemez; yalnızca şablon açıyı kullanıyorsa çevrilir
+        if "{aci" in sablon:
+            alanlar["aci"] = int(alanlar["aci"])
+        return sablon.format(baslik=self.baslik, **alanlar)
+
+
+class EgzersizKatalogu:
+    """Yüklenen tüm egzersizleri tek özellik hesabı ve tablo güdümlü bir durum makinesine derler.
+
+    Kare başına özellikler bir kez hesaplanır; her egzersizin geçerlilik, reddetme,
+    giriş ve çıkış koşulları tek vektörel karşılaştırmayla bütün egzersizler için
+    birlikte değerlendirilir. Durum geçişleri _SINANAN/_HEDEF tablolarından okunur.
+    """
+
+    def __init__(self, tanimlar):
+        egzersizler = tanimlar["egzersizler"]
+        if not egzersizler:
+            raise ValueError("Tanım dosyasında egzersiz yok")
+        self.tanimlar = [EgzersizTanimi(ad, tanim) for ad, tanim in egzersizler.items()]
+        self.adlar = [tanim.ad for tanim in self.tanimlar]
+        self._indeksler = {ad: i for i, ad in enumerate(self.adlar)}
+
+        # Yalnızca egzersizlerin kullandığı özellikler hesaplanır
+        gerekenler = []
+        for tanim in self.tanimlar:
+            kullanilanlar = [kosul["ozellik"] for kosullar in tanim.gruplar.values() for kosul in kosullar]
+            if tanim.tanima is not None:
+                kullanilanlar.append(tanim.tanima.get("salinim", tanim.aci))
+                kullanilanlar += [kosul["ozellik"] for kosul in tanim.tanima.get("kosullar", [])]
+            for ozellik in kullanilanlar:
+                if ozellik not in gerekenler:
+                    gerekenler.append(ozellik)
+        self.plan = OzellikPlani(tanimlar.get("ozellikler", {}), gerekenler)
+
+        # Koşul tablosu: her satır bir karşılaştırma, sütunları gruplara VE ile bağlanır
+        sutunlar, islemler, esikler, olcekli, degil, gruplar = [], [], [], [], [], []
+        grup_sayisi = 3 * len(self.tanimlar)
+        for e, tanim in enumerate(self.tanimlar):
+            for g, grup in enumerate(("reddet", "giris", "cikis")):
+                for kosul in tanim.gruplar[grup]:
+                    if kosul["kosul"] not in KOSULLAR:
+                        raise ValueError(f"Bilinmeyen koşul: {kosul['kosul']} ({tanim.ad})")
+                    sutunlar.append(self.plan.sutunlar[kosul["ozellik"]])
+                    islemler.append(KOSULLAR[kosul["kosul"]])
+                    esikler.append(float(kosul["esik"]))
+                    olcekli.append(kosul.get("olcek") == "kare_yuksekligi")
+                    degil.append(bool(kosul.get("degil", False)))
+                    gruplar.append(3 * e + g)
+        self._sutunlar = np.array(sutunlar, dtype=np.intp)
+        # "<" ve "<=" işaret çevrilerek ">" ve ">=" olarak değerlendirilir
+        islemler = np.array(islemler, dtype=np.intp)
+        self._isaret = np.where(np.isin(islemler, (0, 2)), -1.0, 1.0)
+        self._esit_dahil = np.flatnonzero(islemler >= 2)
+        self._esikler = np.array(esikler, dtype=np.float64)
+        self._olcekli = np.array(olcekli, dtype=bool)
+        self._degil = np.array(degil, dtype=bool)
+        self._degil_var = bool(self._degil.any())
+        self._olcekli_esikler = (None, None)
+        self._grup_matrisi = np.zeros((len(sutunlar), grup_sayisi), dtype=bool)
+        self._grup_matrisi[np.arange(len(sutunlar)), gruplar] = True
+        # Koşulu olmayan reddetme grubu hiçbir kareyi reddetmez
+        self._reddet_var = np.array([bool(tanim.gruplar["reddet"]) for tanim in self.tanimlar])
+
+        self._guven_maskesi = np.zeros((len(self.tanimlar), 17), dtype=bool)
+        for e, tanim in enumerate(self.tanimlar):
+            self._guven_maskesi[e, tanim.guven_noktalari] = True
+        self._aci_sutunlari = np.array([self.plan.sutunlar[tanim.aci] for tanim in self.tanimlar])
+        self._bekleme = np.array([tanim.bekleme for tanim in self.tanimlar])
+        self._bekleme_esit_dahil = np.array([tanim.bekleme_esit_dahil for tanim in self.tanimlar])
+        self._tekli_maskeler = np.eye(len(self.tanimlar), dtype=bool)
+
+    def __len__(self):
+        return len(self.tanimlar)
+
+    def __contains__(self, ad):
+        return ad in self._indeksler
+
+    def indeks(self, ad):
+        return self._indeksler[ad]
+
+    def tanim(self, ad):
+        return self.tanimlar[self._indeksler[ad]]
+
+    def yalniz(self, e):
+        """Yalnızca e. egzersizin aktif olduğu (E,) maske"""
+        return self._tekli_maskeler[e]
+
+    def ozellikleri_hesapla(self, keypoints):
+        return self.plan.hesapla(keypoints)
+
+    def kosullari_degerlendir(self, ozellik, frame_height):
+        """Tüm egzersizlerin koşullarını tek geçişte değerlendirir.
+
+        Tek karede (E,), dizide (T, E) boyutlu gecerli, reddet, giris, cikis
+        maskeleri ve egzersizlerin izlediği açılar döner.
+        """
+        matris = ozellik["matris"]
+        gecerli = ~((ozellik["guven"] < GUVEN_ESIGI) @ self._guven_maskesi.T)
+
+        # Farkın işareti, yuvarlamadan bağımsız olarak doğrudan karşılaştırmayla aynıdır
+        fark = (matris[..., self._sutunlar] - self._esik(frame_height)) * self._isaret
+        sonuc = fark > 0
+        if len(self._esit_dahil):
+            sonuc[..., self._esit_dahil] |= fark[..., self._esit_dahil] == 0
+        if self._degil_var:
+            sonuc ^= self._degil
+        # Her grup, içindeki bütün karşılaştırmalar doğruysa doğrudur
+        gruplar = ~(~sonuc @ self._grup_matrisi)
+        gruplar = gruplar.reshape(gruplar.shape[:-1] + (len(self.tanimlar), 3))
+        reddet = gruplar[..., 0] & self._reddet_var
+        return {
+            "gecerli": gecerli,
+            "reddet": reddet,
+            "giris": gruplar[..., 1],
+            "cikis": gruplar[..., 2],
+            "aci": matris[..., self._aci_sutunlari],
+        }
+
+    def _esik(self, frame_height):
+        # Kare yüksekliğine oranlı eşikler aynı kaynakta değişmez, son hesap saklanır
+        yukseklik, esikler = self._olcekli_esikler
+        if yukseklik != frame_height:
+            esikler = np.where(self._olcekli, self._esikler * frame_height, self._esikler)
+            self._olcekli_esikler = (frame_height, esikler)
+        return esikler
+
+    def aday_maskeleri(self, ad, ozellik, frame_height):
+        """Dizide her kare için (giriş adayı, çıkış adayı) maskeleri"""
+        kosullar = self.kosullari_degerlendir(ozellik, frame_height)
+        e = self.indeks(ad)
+        islenir = kosullar["gecerli"][:, e] & ~kosullar["reddet"][:, e]
+        return islenir & kosullar["giris"][:, e], islenir & kosullar["cikis"][:, e]
+
+    def bekleme_doldu(self, ad, gecen):
+        tanim = self.tanim(ad)
+        if tanim.bekleme_esit_dahil:
+            return not (gecen < tanim.bekleme)
+        return gecen > tanim.bekleme
+
+    def adim(self, durumlar, durum_zamanlari, kosullar, zaman, aktif):
+        """Durum makinesini aktif egzersizler için bir kare ilerletir.
+
+        (E,) boyutlu olay kodlarını, geçişteki hedef durumları ve geçişin tekrar
+        sayıp saymadığını döndürür; durumlar ve sayaçlar çağıran tarafından güncellenir.
+        """
+        gecen = zaman - durum_zamanlari
+        bekleme_doldu = np.where(self._bekleme_esit_dahil, gecen >= self._bekleme, gecen > self._bekleme)
+        beklemede = _BEKLEME_SARTI[durumlar] & ~bekleme_doldu
+        kosul = np.where(_SINANAN[durumlar] == 0, kosullar["giris"], kosullar["cikis"])
+        # Öncelik sırası: geçersiz, reddedildi, beklemede, koşul sağlandı, bekleniyor
+        olaylar = np.where(kosul, GECTI, BEKLENIYOR)
+        olaylar = np.where(beklemede, TUT, olaylar)
+        olaylar = np.where(kosullar["reddet"], REDDEDILDI, olaylar)
+        olaylar = np.where(kosullar["gecerli"], olaylar, GECERSIZ)
+        olaylar = np.where(aktif, olaylar, -1)
+        return olaylar, _HEDEF[durumlar], _SAYAR[durumlar]
+
+    def olay_mesaji(self, e, olay, durum, aci, sayi):
+        tanim = self.tanimlar[e]
+        if olay == GECERSIZ:
+            return tanim.mesaj("gecersiz")
+        if olay == REDDEDILDI:
+            return tanim.mesaj("reddedildi")
+        if olay == TUT:
+            return tanim.mesaj("tut", aci=aci)
+        if olay == GECTI:
+            return tanim.mesaj(_GECIS_MESAJI[durum], aci=aci, sayi=sayi, durum=tanim.durumlar[durum])
+        return tanim.mesaj(_BEKLEME_MESAJI[durum], aci=aci, durum=tanim.durumlar[durum])
+
+
+def katalog_yukle(yol=VARSAYILAN_TANIMLAR):
+    """Egzersiz tanım dosyasını (JSON) okuyup derler"""
+    with open(yol, encoding="utf-8") as f:
+        return EgzersizKatalogu(json.load(f))
+
+
+_varsayilan = None
+
+
+def varsayilan_katalog():
+    """Süreçte bir kez yüklenen varsayılan egzersiz kataloğu (SPOR_EGZERSIZLER ile değiştirilebilir)"""
+    global _varsayilan
+    if _varsayilan is None:
+        _varsayilan = katalog_yukle(os.environ.get("SPOR_EGZERSIZLER", VARSAYILAN_TANIMLAR))
+    return _varsayilan
+
+
+def ozellikleri_hesapla(keypoints):
+    """Varsayılan katalogdaki egzersizlerin kullandığı tüm özellikleri hesaplar"""
+    return varsayilan_katalog().ozellikleri_hesapla(keypoints)
@@ -0,0 +1,182 @@
+import numpy as np
+
+from egzersiz_motoru import KOSULLAR, varsayilan_katalog
+
+# Mod seçicide ve komut satırında "egzersizi kendin bul" seçeneği
+OTOMATIK = "otomatik"
+
+# Salınım genliği, tanımdaki genliğin bu oranına ulaşmayan egzersiz aday olamaz
+SKOR_ESIGI = 0.5
+
+# Salınım genliği p90 - p10, koşullar medyan üzerinden
+_YUZDELIKLER = np.array([0.1, 0.5, 0.9])
+
+
+class EgzersizTanici:
+    """Kayan bir penceredeki özelliklerden o an yapılan egzersizi tanır.
+
+    Her egzersizin tanımındaki "tanima" bloğu pencere medyanı üzerinde sınanan
+    koşulları (gövde açısı, kare yüksekliğine oranlı bilek yüksekliği...) ve
+    salınması beklenen özelliği verir. Koşulları sağlayan egzersizlerden salınım
+    genliği (p90 - p10) kendi genliğine oranla en büyük olan aday olur; aday
+    onay_suresi boyunca değişmezse kararlı sonuç olarak döner.
+
+    Özellikler analizcinin zaten hesapladığı matristen okunur; pencere ayrıca
+    sabit boyutlu bir halkada tutulur ki tanıma anına kadarki kareler yeni
+    egzersizin durum makinesinden geçirilebilsin.
+    """
+
+    def __init__(self, katalog=None, pencere_suresi=3.0, onay_suresi=1.0, en_az_kare=10, kapasite=256):
+        self.katalog = katalog or varsayilan_katalog()
+        self.pencere_suresi = pencere_suresi
+        self.onay_suresi = onay_suresi
+        self.en_az_kare = en_az_kare
+
+        plan = self.katalog.plan
+        adaylar, sutunlar, salinimlar, genlikler = [], [], [], []
+        terim_sutunlari, islemler, esikler, olcekli, terim_adaylari = [], [], [], [], []
+
+        def sutun(ozellik):
+            if ozellik not in sutunlar:
+                sutunlar.append(ozellik)
+            return sutunlar.index(ozellik)
+
+        for tanim in self.katalog.tanimlar:
+            if tanim.tanima is None:
+                continue
+            a = len(adaylar)
+            adaylar.append(tanim.ad)
+            salinimlar.append(sutun(tanim.tanima.get("salinim", tanim.aci)))
+            genlik = tanim.tanima.get("genlik", abs(tanim.cikis_esigi - tanim.giris_esigi))
+            if not genlik > 0:
+                raise ValueError(f"Tanıma için salınım genliği gerekli: {tanim.ad}")
+            genlikler.append(float(genlik))
+            for kosul in tanim.tanima.get("kosullar", []):
+                if kosul["kosul"] not in KOSULLAR:
+                    raise ValueError(f"Bilinmeyen koşul: {kosul['kosul']} ({tanim.ad})")
+                terim_sutunlari.append(sutun(kosul["ozellik"]))
+                islemler.append(KOSULLAR[kosul["kosul"]])
+                esikler.append(float(kosul["esik"]))
+                olcekli.append(kosul.get("olcek") == "kare_yuksekligi")
+                terim_adaylari.append(a)
+
+        self.adaylar = adaylar
+        self._ozellik_sutunlari = np.array([plan.sutunlar[ad] for ad in sutunlar], dtype=np.intp)
+        self._salinimlar = np.array(salinimlar, dtype=np.intp)
+        self._genlikler = np.array(genlikler, dtype=np.float64)
+        self._terim_sutunlari = np.array(terim_sutunlari, dtype=np.intp)
+        islemler = np.array(islemler, dtype=np.intp)
+        self._isaret = np.where(np.isin(islemler, (0, 2)), -1.0, 1.0)
+        self._esit_dahil = islemler >= 2
+        self._esikler = np.array(esikler, dtype=np.float64)
+        self._olcekli = np.array(olcekli, dtype=bool)
+        # Aday başına koşullar VE ile birleşir (terim x aday)
+        self._terim_matrisi = np.zeros((len(esikler), len(adaylar)), dtype=bool)
+        self._terim_matrisi[np.arange(len(esikler)), terim_adaylari] = True
+
+        # Son kareler: özellik matrisi satırı, nokta güvenleri, zaman, kare no ve geçerlilik
+        self._matris = np.full((kapasite, len(plan.adlar)), np.nan)
+        self._guven = np.zeros((kapasite, 17), dtype=np.float32)
+        self._zamanlar = np.full(kapasite, -np.inf)
+        self._kareler = np.full(kapasite, -1, dtype=np.int64)
+        self._gecerli = np.zeros(kapasite, dtype=bool)
+        self._yazilan = 0
+
+        self.aday = None
+        self._aday_zamani = 0.0
+        self.kararli = None
+        self.skorlar = np.zeros(len(adaylar))
+        # Son egzersiz geçişinin zamanı; ondan önceki kareler yeniden işlenmez
+        self._son_gecis = -np.inf
+
+    def sifirla(self):
+        self._zamanlar[:] = -np.inf
+        self._gecerli[:] = False
+        self._yazilan = 0
+        self.aday = None
+        self.kararli = None
+        self._son_gecis = -np.inf
+
+    def tani(self, matris, frame_height):
+        """(T, özellik) matris satırlarından (en iyi aday veya None, aday skorları) döndürür"""
+        if len(matris) < self.en_az_kare or not len(self.adaylar):
+            return None, np.zeros(len(self.adaylar))
+        # nanpercentile kare başına ~300 us sürüyor; tek sıralama ve indeksleme yeterli.
+        # NaN'ler sona sıralanır, sıra her sütunun ölçülebilen kare sayısından alınır
+        degerler = np.sort(matris[:, self._ozellik_sutunlari], axis=0)
+        olculen = len(degerler) - np.isnan(degerler).sum(axis=0)
+        siralar = (_YUZDELIKLER[:, None] * np.maximum(olculen - 1, 0)).astype(np.intp)
+        alt, orta, ust = np.take_along_axis(degerler, siralar, axis=0)
+        with np.errstate(invalid="ignore"):
+            alt, orta, ust = (np.where(olculen > 0, deger, np.nan) for deger in (alt, orta, ust))
+            skorlar = (ust - alt)[self._salinimlar] / self._genlikler
+
+            esikler = np.where(self._olcekli, self._esikler * frame_height, self._esikler)
+            fark = (orta[self._terim_sutunlari] - esikler) * self._isaret
+            saglanan = (fark > 0) | (self._esit_dahil & (fark == 0))
+        uygun = ~(~saglanan @ self._terim_matrisi)
+        # NaN skor (pencerede hiç ölçülemeyen özellik) aday olamaz
+        skorlar = np.where(uygun & (skorlar >= SKOR_ESIGI), skorlar, 0.0)
+        en_iyi = int(np.argmax(skorlar))
+        if skorlar[en_iyi] <= 0:
+            return None, skorlar
+        return self.adaylar[en_iyi], skorlar
+
+    def ekle(self, ozellik, gecerli, frame_height, zaman, kare_no=-1):
+        """Kareyi pencereye ekler ve o anki kararlı egzersizi (yoksa None) döndürür.
+
+        ozellik katalogun hesapladığı tek karelik özelliklerdir; gecerli, herhangi
+        bir egzersizin güven şartını sağlayıp sağlamadığıdır.
+        """
+        i = self._yazilan % len(self._zamanlar)
+        self._matris[i] = ozellik["matris"]
+        self._guven[i] = ozellik["guven"]
+        self._zamanlar[i] = zaman
+        self._kareler[i] = kare_no
+        self._gecerli[i] = gecerli
+        self._yazilan += 1
+
+        penceredeki = self._gecerli & (self._zamanlar > zaman - self.pencere_suresi)
+        aday, self.skorlar = self.tani(self._matris[penceredeki], frame_height)
+
+        # Kısa süreli yanlış tanımalar modu değiştirmesin
+        if aday != self.aday:
+            self.aday = aday
+            self._aday_zamani = zaman
+        if aday is not None and zaman - self._aday_zamani >= self.onay_suresi:
+            self.kararli = aday
+        return self.kararli
+
+    def gecis_kareleri(self, zaman):
+        """Tanınan egzersize geçerken durum makinesinden geçirilecek önceki kareler.
+
+        Aday ilk göründüğünde pencerede olan karelerden başlar, önceki geçişten
+        eskiye gitmez; (özellik sözlüğü, zamanlar, kare numaraları) döner.
+        """
+        baslangic = max(self._son_gecis, self._aday_zamani - self.pencere_suresi)
+        self._son_gecis = zaman
+        return self.kayitlar(baslangic, zaman)
+
+    def kayitlar(self, baslangic, bitis):
+        """(baslangic, bitis) aralığındaki kareleri zaman sırasıyla döndürür.
+
+        Dönen özellik sözlüğü ("matris", "guven") katalogun koşul değerlendirmesine
+        doğrudan verilebilir.
+        """
+        secili = np.flatnonzero((self._zamanlar > baslangic) & (self._zamanlar < bitis))
+        secili = secili[np.argsort(self._zamanlar[secili], kind="stable")]
+        ozellik = {"matris": self._matris[secili], "guven": self._guven[secili]}
+        return ozellik, self._zamanlar[secili], self._kareler[secili]
+
+
+def seriden_tani(keypoints, tespit=None, frame_height=0, katalog=None):
+    """Bütün keypoint serisinde yapılan egzersizi tek pencere olarak tanır (yoksa None)"""
+    tanici = EgzersizTanici(katalog)
+    keypoints = np.asarray(keypoints)
+    if len(keypoints) == 0:
+        return None
+    ozellik = tanici.katalog.ozellikleri_hesapla(keypoints)
+    gecerli = tanici.katalog.kosullari_degerlendir(ozellik, frame_height)["gecerli"].any(axis=1)
+    if tespit is not None:
+        gecerli &= np.asarray(tespit, dtype=bool)
+    return tanici.tani(ozellik["matris"][gecerli], frame_height)[0]
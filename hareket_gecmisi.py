@@ -0,0 +1,85 @@
+import numpy as np
+
+# 30 fps'te yaklaşık iki dakika
+VARSAYILAN_KAPASITE = 3600
+
+
+class HareketGecmisi:
+    """Analiz edilen karelerin sabit boyutlu halka tampon geçmişi.
+
+    Zaman, kare numarası, keypoint konumları, güvenleri, egzersiz başına açılar,
+    aktif egzersiz ve onun durumu önceden ayrılmış NumPy dizilerinde tutulur;
+    oturum ne kadar uzarsa uzasın bellek sabittir, dolunca en eski kare ezilir.
+    Kişi bulunmayan kareler NaN açı ve sıfır güvenle yazılır, boşluk grafikte görünür.
+
+    Tek yazan (analiz thread'i) ve okuyanlar (grafik) kilitsiz çalışır: örnek önce
+    yuvasına yazılır, yazilan en son artırılır. Okuyan yazilan'dan küçük sıra
+    numaralarını okur; kapasite kadar geride kalmadıkça okuduğu yuva ezilmemiştir.
+    """
+
+    def __init__(self, egzersiz_sayisi, kapasite=VARSAYILAN_KAPASITE):
+        self.kapasite = max(1, int(kapasite))
+        self.zamanlar = np.full(self.kapasite, np.nan)
+        self.kareler = np.full(self.kapasite, -1, dtype=np.int64)
+        self.keypoints = np.full((self.kapasite, 17, 2), np.nan, dtype=np.float32)
+        self.guvenler = np.zeros((self.kapasite, 17), dtype=np.float32)
+        self.acilar = np.full((self.kapasite, egzersiz_sayisi), np.nan, dtype=np.float32)
+        # Aktif egzersizin indeksi (-1: tanınmadı) ve o egzersizin durumu
+        self.aktifler = np.full(self.kapasite, -1, dtype=np.int8)
+        self.durumlar = np.zeros(self.kapasite, dtype=np.int8)
+        # Şimdiye kadar yazılan örnek sayısı; sıradaki yuva yazilan % kapasite
+        self.yazilan = 0
+        # sifirla() her çağrıldığında artar; okuyan geçmişin baştan başladığını anlar
+        self.nesil = 0
+
+    def __len__(self):
+        return min(self.yazilan, self.kapasite)
+
+    @property
+    def bellek_bayt(self):
+        return sum(dizi.nbytes for dizi in (self.zamanlar, self.kareler, self.keypoints, self.guvenler,
+                                            self.acilar, self.aktifler, self.durumlar))
+
+    def ekle(self, zaman, kare_no, keypoints=None, acilar=None, aktif=-1, durum=0):
+        """Bir kareyi sıradaki yuvaya yerinde yazar; keypoints None ise kişi bulunmadı"""
+        i = self.yazilan % self.kapasite
+        self.zamanlar[i] = zaman
+        self.kareler[i] = kare_no
+        if keypoints is None:
+            self.keypoints[i] = np.nan
+            self.guvenler[i] = 0
+        else:
+            self.keypoints[i] = keypoints[:17, :2]
+            self.guvenler[i] = keypoints[:17, 2]
+        if acilar is None:
+            self.acilar[i] = np.nan
+        else:
+            self.acilar[i] = acilar
+        self.aktifler[i] = aktif
+        self.durumlar[i] = durum
+        self.yazilan += 1
+
+    def sifirla(self):
+        self.yazilan = 0
+        self.nesil += 1
+
+    def ilk_sira(self):
+        """Tamponda hâlâ duran en eski örneğin sıra numarası"""
+        return max(0, self.yazilan - self.kapasite)
+
+    def yuva(self, sira):
+        return sira % self.kapasite
+
+    def son(self, n=None):
+        """Son n örneğin (en eskiden yeniye) sıralı kopyaları; kayıt ve inceleme için"""
+        n = len(self) if n is None else min(n, len(self))
+        yuvalar = np.arange(self.yazilan - n, self.yazilan) % self.kapasite
+        return {
+            "zaman": self.zamanlar[yuvalar],
+            "kare": self.kareler[yuvalar],
+            "keypoints": self.keypoints[yuvalar],
+            "guven": self.guvenler[yuvalar],
+            "aci": self.acilar[yuvalar],
+            "aktif": self.aktifler[yuvalar],
+            "durum": self.durumlar[yuvalar],
+        }
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+VARSAYILAN_KLASOR = os.path.join(os.path.expanduser("~"), ".cache", "spor_hareket_analizi", "keypoints")
+VARSAYILAN_BOYUT_MB = 1024
+
+
+class KayitliKeypointler:
+    """Önbellekten okunan bir videonun kare kare keypoint verisi (bellek eşlemeli)"""
+
+    def __init__(self, keypoints, zamanlar, tespit, meta):
+        self.keypoints = keypoints  # (kare, 17, 3)
+        self.zamanlar = zamanlar    # (kare,) saniye
+        self.tespit = tespit        # (kare,) kişi bulundu mu
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.zamanlar)
+
+
+class KeypointOnbellegi:
+    """Video içeriği + model + çıkarım ayarlarına göre anahtarlanan disk önbelleği.
+
+    Her kayıt bir klasördür: keypoints.npy, zamanlar.npy, tespit.npy ve meta.json.
+    .npy dosyaları mmap ile açılır, toplam boyut sınırı aşılınca en uzun süredir
+    kullanılmayan kayıtlar silinir.
+    """
+
+    def __init__(self, klasor=VARSAYILAN_KLASOR, en_fazla_mb=VARSAYILAN_BOYUT_MB):
+        self.klasor = klasor
+        self.en_fazla_bayt = int(en_fazla_mb * 1024 * 1024)
+        os.makedirs(self.klasor, exist_ok=True)
+
+    @staticmethod
+    def video_ozeti(video_path, parca=1 << 20):
+        # Dosya adı değil içerik önemli; aynı video farklı yerde de bulunur
+        ozet = hashlib.sha256()
+        with open(video_path, "rb") as f:
+            while True:
+                veri = f.read(parca)
+                if not veri:
+                    break
+                ozet.update(veri)
+        return ozet.hexdigest()
+
+    def anahtar(self, video_path, model_adi, ayarlar):
+        ozet = hashlib.sha256()
+        ozet.update(self.video_ozeti(video_path).encode())
+        ozet.update(os.path.basename(model_adi).encode())
+        ozet.update(json.dumps(ayarlar, sort_keys=True).encode())
+        return ozet.hexdigest()[:32]
+
+    def _kayit_klasoru(self, anahtar):
+        return os.path.join(self.klasor, anahtar)
+
+    def oku(self, anahtar):
+        klasor = self._kayit_klasoru(anahtar)
+        if not os.path.isdir(klasor):
+            return None
+        try:
+            with open(os.path.join(klasor, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            kayit = KayitliKeypointler(
+                np.load(os.path.join(klasor, "keypoints.npy"), mmap_mode="r"),
+                np.load(os.path.join(klasor, "zamanlar.npy"), mmap_mode="r"),
+                np.load(os.path.join(klasor, "tespit.npy"), mmap_mode="r"),
+                meta
+            )
+        except (OSError, ValueError):
+            # Yarım kalmış veya bozuk kayıt; yeniden üretilsin
+            shutil.rmtree(klasor, ignore_errors=True)
+            return None
+
+        # LRU için son kullanım zamanı
+        os.utime(klasor)
+        return kayit
+
+    def yaz(self, anahtar, keypoints, zamanlar, tespit, meta):
+        hedef = self._kayit_klasoru(anahtar)
+        gecici = f"{hedef}.tmp-{os.getpid()}"
+        shutil.rmtree(gecici, ignore_errors=True)
+        os.makedirs(gecici)
+
+        np.save(os.path.join(gecici, "keypoints.npy"), np.asarray(keypoints, dtype=np.float32))
+        np.save(os.path.join(gecici, "zamanlar.npy"), np.asarray(zamanlar, dtype=np.float64))
+        np.save(os.path.join(gecici, "tespit.npy"), np.asarray(tespit, dtype=bool))
+        with open(os.path.join(gecici, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # Başka bir süreç aynı kaydı yazmışsa onunki kalır
+        try:
+            os.rename(gecici, hedef)
+        except OSError:
+            shutil.rmtree(gecici, ignore_errors=True)
+
+        self.temizle()
+
+    def kayitlar(self):
+        """(son erişim, boyut, klasör) listesini döndürür"""
+        sonuc = []
+        for ad in os.listdir(self.klasor):
+            klasor = os.path.join(self.klasor, ad)
+            if ".tmp-" in ad or not os.path.isdir(klasor):
+                continue
+            boyut = sum(os.path.getsize(os.path.join(klasor, dosya)) for dosya in os.listdir(klasor))
+            sonuc.append((os.path.getmtime(klasor), boyut, klasor))
+        return sonuc
+
+    def temizle(self):
+        # Boyut sınırının altına inene kadar en eski kayıtları sil
+        kayitlar = sorted(self.kayitlar())
+        toplam = sum(boyut for _, boyut, _ in kayitlar)
+        for _, boyut, klasor in kayitlar:
+            if toplam <= self.en_fazla_bayt:
+                break
+            shutil.rmtree(klasor, ignore_errors=True)
+            toplam -= boyut
+
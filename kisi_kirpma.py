@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+
+# Kırpılan bölge, model girişinin en az bu kadar küçük olmasına izin verir
+EN_KUCUK_IMGSZ = 160
+
+
+class KisiKirpici:
+    """Modeli tüm kare yerine bir önceki karedeki kişinin çevresindeki bölgede çalıştırır.
+
+    Kırpılan bölge daha küçük imgsz ile modele verilir; çıkan kutu ve keypoint'ler
+    kare koordinatlarına taşınır, böylece frame_height'a bağlı kontroller değişmez.
+    Kişi kaybolursa veya güven düşerse aynı kare tam çözünürlükte yeniden taranır.
+    """
+
+    def __init__(self, model, kucuk_imgsz=320, kenar_payi=0.25, guven_esigi=0.5):
+        self.model = model
+        self.kucuk_imgsz = kucuk_imgsz
+        # Kutunun her yanına eklenen pay (kutu boyutuna oranla)
+        self.kenar_payi = kenar_payi
+        self.guven_esigi = guven_esigi
+        # Son bilinen kişi kutusu (x1, y1, x2, y2), yoksa tam kare taranır
+        self.kutu = None
+        self.kirpilan_kare = 0
+        self.tam_kare = 0
+
+    def __call__(self, frame, **ayarlar):
+        # Boru hattının toplu çağrısında kutu kareden kareye taşındığı için sırayla işlenir
+        if isinstance(frame, list):
+            return [self._kare_isle(f, ayarlar)[0] for f in frame]
+        return self._kare_isle(frame, ayarlar)
+
+    def _kare_isle(self, frame, ayarlar):
+        if self.kutu is not None:
+            bolge = self._kirpma_bolgesi(frame.shape)
+            x1, y1, x2, y2 = bolge
+            kirpilmis = frame[y1:y2, x1:x2]
+            imgsz = self._dinamik_imgsz(kirpilmis.shape, ayarlar.get("imgsz", 640))
+            results = self.model(kirpilmis, **dict(ayarlar, imgsz=imgsz))
+            if self._kisi_guvenilir(results):
+                self.kirpilan_kare += 1
+                results = [self._kareye_tasi(results[0], frame, x1, y1)]
+                self._kutuyu_guncelle(results)
+                return results
+
+        # Kişi yok, kayboldu ya da güven düştü: tam kare tarama
+        self.tam_kare += 1
+        results = self.model(frame, **ayarlar)
+        self._kutuyu_guncelle(results)
+        return results
+
+    def _kirpma_bolgesi(self, frame_shape):
+        yukseklik, genislik = frame_shape[:2]
+        x1, y1, x2, y2 = self.kutu
+        pay_x = (x2 - x1) * self.kenar_payi
+        pay_y = (y2 - y1) * self.kenar_payi
+        return (max(0, int(x1 - pay_x)), max(0, int(y1 - pay_y)),
+                min(genislik, int(math.ceil(x2 + pay_x))), min(yukseklik, int(math.ceil(y2 + pay_y))))
+
+    def _dinamik_imgsz(self, kirpilmis_shape, tam_imgsz):
+        # Bölgeden büyük bir giriş boyutu seçmek yalnızca büyütme yapar
+        uzun_kenar = 32 * math.ceil(max(kirpilmis_shape[:2]) / 32)
+        return max(EN_KUCUK_IMGSZ, min(self.kucuk_imgsz, tam_imgsz, uzun_kenar))
+
+    def _kisi_guvenilir(self, results):
+        keypoints = results[0].keypoints.data
+        if len(keypoints) == 0:
+            return False
+        return float(keypoints[0, :, 2].mean()) >= self.guven_esigi
+
+    def _kareye_tasi(self, sonuc, frame, x1, y1):
+        """Kırpılmış karedeki sonucu tam kare koordinatlarında yeni bir sonuca çevirir"""
+        kutular = sonuc.boxes.data.clone()
+        kutular[:, :4] += kutular.new_tensor([x1, y1, x1, y1])
+        keypoints = sonuc.keypoints.data.clone()
+        keypoints[..., :2] += keypoints.new_tensor([x1, y1])
+        return type(sonuc)(frame, path=sonuc.path, names=sonuc.names,
+                           boxes=kutular, keypoints=keypoints)
+
+    def _kutuyu_guncelle(self, results):
+        kutular = results[0].boxes.xyxy
+        if len(kutular) == 0:
+            self.kutu = None
+            return
+        self.kutu = np.asarray(kutular[0].cpu().numpy(), dtype=np.float32)
+
+    def istatistik(self):
+        return {"kirpilan_kare": self.kirpilan_kare, "tam_kare": self.tam_kare}
@@ -0,0 +1,409 @@
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+from egzersiz_motoru import BASLANGIC, GECERSIZ, GECTI, varsayilan_katalog
+from egzersiz_tanima import OTOMATIK, EgzersizTanici
+from hareket_gecmisi import VARSAYILAN_KAPASITE, HareketGecmisi
+from olay_gunlugu import log
+
+
+def kutu_iou(a, b):
+    """(M, 4) ve (N, 4) xyxy kutuları arasındaki (M, N) IoU matrisi"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    kesisim = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    alan_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    alan_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    birlesim = alan_a[:, None] + alan_b[None, :] - kesisim
+    return np.where(birlesim > 0, kesisim / np.maximum(birlesim, 1e-9), 0.0)
+
+
+def tum_kisiler(results):
+    """Model çıktısındaki tüm kişilerin (P, 4) kutularını ve (P, 17, 3) keypoint'lerini döndürür"""
+    keypoints = np.asarray(results[0].keypoints.data.cpu().numpy(), dtype=np.float32)
+    kutular = results[0].boxes.xyxy.cpu().numpy()
+    return kutular, keypoints[..., :3]
+
+
+class IouTakipci:
+    """Kareler arası kutu örtüşmesine (IoU) göre kişilere kalıcı kimlik verir.
+
+    İzler paralel NumPy dizilerinde (kimlik, son kutu, son görülme zamanı) tutulur;
+    en_fazla_kayip_sure boyunca görülmeyen izler silinir.
+    """
+
+    def __init__(self, iou_esigi=0.3, en_fazla_kayip_sure=2.0):
+        self.iou_esigi = iou_esigi
+        self.en_fazla_kayip_sure = en_fazla_kayip_sure
+        self.kimlikler = np.zeros(0, dtype=np.int64)
+        self.kutular = np.zeros((0, 4), dtype=np.float32)
+        self.son_gorulme = np.zeros(0, dtype=np.float64)
+        self.sonraki_kimlik = 1
+
+    def guncelle(self, kutular, zaman):
+        """Yeni karedeki kutulara kimlik atar, atanan kimlikleri kutu sırasıyla döndürür"""
+        kutular = np.asarray(kutular, dtype=np.float32).reshape(-1, 4)
+        atanan = np.full(len(kutular), -1, dtype=np.int64)
+
+        # Uzun süredir görülmeyen izleri eşleştirmeden önce düşür
+        canli = (zaman - self.son_gorulme) <= self.en_fazla_kayip_sure
+        if not canli.all():
+            self.kimlikler = self.kimlikler[canli]
+            self.kutular = self.kutular[canli]
+            self.son_gorulme = self.son_gorulme[canli]
+
+        if len(self.kimlikler) and len(kutular):
+            iou = kutu_iou(self.kutular, kutular)
+            # En yüksek örtüşmeden başlayarak açgözlü eşleştirme
+            kullanilan_iz = np.zeros(len(self.kimlikler), dtype=bool)
+            for sira in np.argsort(-iou, axis=None):
+                iz, kutu = divmod(int(sira), len(kutular))
+                if iou[iz, kutu] < self.iou_esigi:
+                    break
+                if kullanilan_iz[iz] or atanan[kutu] >= 0:
+                    continue
+                atanan[kutu] = self.kimlikler[iz]
+                kullanilan_iz[iz] = True
+                self.kutular[iz] = kutular[kutu]
+                self.son_gorulme[iz] = zaman
+
+        # Eşleşmeyen kutular yeni iz açar
+        yeni = np.flatnonzero(atanan < 0)
+        if len(yeni):
+            atanan[yeni] = np.arange(self.sonraki_kimlik, self.sonraki_kimlik + len(yeni))
+            self.sonraki_kimlik += len(yeni)
+            self.kimlikler = np.concatenate([self.kimlikler, atanan[yeni]])
+            self.kutular = np.concatenate([self.kutular, kutular[yeni]])
+            self.son_gorulme = np.concatenate([self.son_gorulme, np.full(len(yeni), zaman)])
+
+        return atanan.tolist()
+
+
+class CokKisiAnalizi:
+    """Her takip kimliği için ayrı sayaç ve durum makinesi tutar.
+
+    Kişi başına durumlar, duruma giriş zamanları/kareleri, açı aralıkları, sayaçlar
+    ve aktif egzersiz yuva numarasıyla indekslenen (kişi, egzersiz) dizilerindedir;
+    karedeki herkesin durum makinesi tek katalog.adim çağrısıyla ilerler, Python'a
+    yalnızca durum geçişlerinde inilir. Açılar tüm kişiler için tek vektörel çağrıda
+    hesaplanır; yumusatici verilirse keypoint'ler de kimlik başına tek çağrıda süzülür.
+
+    Otomatik modda her kişinin egzersizi kendi tanıma penceresinden tanınır. Açı
+    grafiği için yalnızca ana sayaçtaki (en küçük kimlikli görünür) kişinin geçmişi
+    tutulur; ana kişi değişince geçmiş baştan başlar.
+
+    mod_degistir ve sayaci_sifirla arayüz thread'inden çağrılabilir: istekler
+    sıraya alınır ve analiz thread'inde bir sonraki karede uygulanır.
+    """
+
+    def __init__(self, katalog=None, takipci=None, yumusatici=None, kaynak=None,
+                 gecmis_kapasitesi=VARSAYILAN_KAPASITE):
+        self.katalog = katalog or varsayilan_katalog()
+        self.takipci = takipci or IouTakipci()
+        self.yumusatici = yumusatici
+        self.kaynak = kaynak
+        # Seçilen mod; boş veya "otomatik" ise her kişinin egzersizi ayrı tanınır
+        self.mod = ""
+        self.otomatik = True
+        self.kare_no = -1
+        self._istekler = deque()
+
+        # Yuva başına kişi; boş yuvanın kimliği -1. Diziler dolunca iki katına çıkar
+        egzersiz_sayisi = len(self.katalog)
+        self.kimlikler = np.zeros(0, dtype=np.int64)
+        self.aktifler = np.zeros(0, dtype=np.intp)
+        self.durumlar = np.zeros((0, egzersiz_sayisi), dtype=np.intp)
+        self.durum_zamanlari = np.zeros((0, egzersiz_sayisi))
+        self.durum_kareleri = np.zeros((0, egzersiz_sayisi), dtype=np.int64)
+        self.aci_araliklari = np.zeros((0, egzersiz_sayisi, 2))
+        self.sayaclar = np.zeros((0, egzersiz_sayisi), dtype=np.int64)
+        # Son karenin olayı (-1: henüz adım yok), adımdan önceki durum ve açı; mesaj için
+        self.son_olaylar = np.zeros(0, dtype=np.intp)
+        self.son_durumlar = np.zeros(0, dtype=np.intp)
+        self.son_acilar = np.zeros(0)
+        self.tekrarlar = []
+        self._yuvalar = {}
+        self._buyut()
+
+        # Yalnızca otomatik modda, yuva başına tanıma penceresi
+        self.tanicilar = {}
+        # Süresi dolan izlerin son sayaçları (rapor için)
+        self.biten_kisiler = {}
+        self.ana_kimlik = None
+        self.gecmis = HareketGecmisi(egzersiz_sayisi, gecmis_kapasitesi)
+
+    def _buyut(self):
+        eski = len(self.kimlikler)
+        ek = max(4, eski)
+
+        def genislet(dizi, deger):
+            return np.concatenate([dizi, np.full((ek,) + dizi.shape[1:], deger, dtype=dizi.dtype)])
+
+        self.kimlikler = genislet(self.kimlikler, -1)
+        self.aktifler = genislet(self.aktifler, -1)
+        self.durumlar = genislet(self.durumlar, BASLANGIC)
+        self.durum_zamanlari = genislet(self.durum_zamanlari, 0.0)
+        self.durum_kareleri = genislet(self.durum_kareleri, -1)
+        self.aci_araliklari = genislet(self.aci_araliklari, np.nan)
+        self.sayaclar = genislet(self.sayaclar, 0)
+        self.son_olaylar = genislet(self.son_olaylar, -1)
+        self.son_durumlar = genislet(self.son_durumlar, BASLANGIC)
+        self.son_acilar = genislet(self.son_acilar, np.nan)
+        self.tekrarlar += [[] for _ in range(ek)]
+
+    def _mod_indeksi(self):
+        return self.katalog.indeks(self.mod) if self.mod in self.katalog else -1
+
+    def _yuva_ac(self, kimlik, zaman):
+        bos = np.flatnonzero(self.kimlikler < 0)
+        if not len(bos):
+            self._buyut()
+            bos = np.flatnonzero(self.kimlikler < 0)
+        y = int(bos[0])
+        self.kimlikler[y] = kimlik
+        self.aktifler[y] = -1 if self.otomatik else self._mod_indeksi()
+        self.durumlar[y] = BASLANGIC
+        self.durum_zamanlari[y] = zaman
+        self.durum_kareleri[y] = -1
+        self.aci_araliklari[y] = np.nan
+        self.sayaclar[y] = 0
+        self.son_olaylar[y] = -1
+        self.tekrarlar[y] = []
+        self._yuvalar[kimlik] = y
+        return y
+
+    def _yuva_kapat(self, kimlik):
+        y = self._yuvalar[kimlik]
+        self.biten_kisiler[kimlik] = self._ozet(y)
+        del self._yuvalar[kimlik]
+        self.kimlikler[y] = -1
+        self.tekrarlar[y] = []
+        self.tanicilar.pop(y, None)
+
+    def mod_degistir(self, mod, zaman=None):
+        self._istekler.append(("mod", mod, zaman))
+
+    def sayaci_sifirla(self, mod):
+        self._istekler.append(("sifirla", mod, None))
+
+    def _istekleri_uygula(self):
+        while self._istekler:
+            tur, mod, zaman = self._istekler.popleft()
+            if tur == "sifirla":
+                if mod in self.katalog:
+                    self.sayaclar[:, self.katalog.indeks(mod)] = 0
+                continue
+            self.mod = mod
+            # Boş mod veya "otomatik" tanımayı açar; sayım kişilerin mevcut egzersiziyle sürer
+            if not mod or mod == OTOMATIK:
+                self.otomatik = True
+                continue
+            self.otomatik = False
+            # Elle seçimden önceki tanıma sonuçları geçerli değil
+            self.tanicilar.clear()
+            dolu = self.kimlikler >= 0
+            e = self._mod_indeksi()
+            self.aktifler[dolu] = e
+            self.son_olaylar[dolu] = -1
+            if e >= 0:
+                self.durumlar[dolu, e] = BASLANGIC
+                self._durumu_baslat(dolu, e, time.time() if zaman is None else zaman, -1)
+
+    def _durumu_baslat(self, y, e, zaman, kare_no, aci=np.nan):
+        self.durum_zamanlari[y, e] = zaman
+        self.durum_kareleri[y, e] = kare_no
+        self.aci_araliklari[y, e] = aci
+
+    def guncelle(self, kutular, keypoints, frame_height, zaman, kare_no=None):
+        """Karedeki tüm kişileri analiz eder, kutu sırasıyla takip kimliklerini döndürür"""
+        self._istekleri_uygula()
+        kimlikler = self.takipci.guncelle(kutular, zaman)
+
+        # Takipçiden düşen kişilerin durumunu bırak
+        canli = set(self.takipci.kimlikler.tolist())
+        bitenler = [k for k in self._yuvalar if k not in canli]
+        for kimlik in bitenler:
+            self._yuva_kapat(kimlik)
+        if self.yumusatici is not None:
+            self.yumusatici.birak(bitenler)
+        if not kimlikler:
+            return kimlikler
+        if self.yumusatici is not None:
+            keypoints = self.yumusatici.guncelle(kimlikler, keypoints, zaman, frame_height)
+
+        self.kare_no = self.kare_no + 1 if kare_no is None else kare_no
+        yuvalar = np.array([self._yuvalar[k] if k in self._yuvalar else self._yuva_ac(k, zaman)
+                            for k in kimlikler], dtype=np.intp)
+        ozellik = self.katalog.ozellikleri_hesapla(keypoints)
+        kosullar = self.katalog.kosullari_degerlendir(ozellik, frame_height)
+        if self.otomatik:
+            self._tani(yuvalar, ozellik, kosullar, frame_height, zaman)
+
+        # Egzersizi belli olan herkes tek adımda ilerler
+        isleyen = np.flatnonzero(self.aktifler[yuvalar] >= 0)
+        if len(isleyen):
+            self._adim(yuvalar[isleyen], self.aktifler[yuvalar[isleyen]],
+                       {ad: deger[isleyen] for ad, deger in kosullar.items()}, zaman, self.kare_no)
+            # Kare başına açı yalnızca örnekleme açıksa kaydedilir
+            if log.isEnabledFor(logging.DEBUG):
+                self._kare_kaydet(yuvalar[isleyen])
+
+        ana = min(kimlikler)
+        if ana != self.ana_kimlik:
+            self.ana_kimlik = ana
+            self.gecmis.sifirla()
+        i = kimlikler.index(ana)
+        e = self.aktifler[yuvalar[i]]
+        durum = self.durumlar[yuvalar[i], e] if e >= 0 else 0
+        self.gecmis.ekle(zaman, self.kare_no, keypoints[i], kosullar["aci"][i], e, durum)
+        return kimlikler
+
+    def _tani(self, yuvalar, ozellik, kosullar, frame_height, zaman):
+        gecerli = kosullar["gecerli"].any(axis=1)
+        for i, y in enumerate(yuvalar.tolist()):
+            tanici = self.tanicilar.get(y)
+            if tanici is None:
+                tanici = self.tanicilar[y] = EgzersizTanici(self.katalog)
+            taninan = tanici.ekle({ad: deger[i] for ad, deger in ozellik.items()}, gecerli[i],
+                                  frame_height, zaman, self.kare_no)
+            if taninan is not None and self.katalog.indeks(taninan) != self.aktifler[y]:
+                self._otomatik_gec(y, taninan, frame_height, zaman)
+
+    def _otomatik_gec(self, y, mod, frame_height, zaman):
+        """Kişiyi tanınan egzersize geçirir; penceredeki kareleri onun durum makinesinden geçirir"""
+        log.info("Kişi #%d egzersizi tanındı: %s", self.kimlikler[y], mod,
+                 extra={"olay": "tanima", "mod": mod, "onceki": self.kisi_modu(int(self.kimlikler[y])),
+                        "zaman_sn": zaman, "kisi": int(self.kimlikler[y]), "kaynak": self.kaynak})
+        ozellik, zamanlar, kareler = self.tanicilar[y].gecis_kareleri(zaman)
+
+        e = self.katalog.indeks(mod)
+        self.aktifler[y] = e
+        self.durumlar[y, e] = BASLANGIC
+        if not len(zamanlar):
+            self._durumu_baslat(y, e, zaman, self.kare_no)
+            return
+        self._durumu_baslat(y, e, zamanlar[0], kareler[0])
+        kosullar = self.katalog.kosullari_degerlendir(ozellik, frame_height)
+        tek_yuva, tek_egzersiz = np.array([y]), np.array([e])
+        for i, kare_zamani in enumerate(zamanlar):
+            self._adim(tek_yuva, tek_egzersiz, {ad: deger[i:i + 1] for ad, deger in kosullar.items()},
+                       float(kare_zamani), kareler[i])
+
+    def _adim(self, yuvalar, egzersizler, kosullar, zaman, kare_no):
+        """Yuvalardaki kişilerin durum makinelerini kendi egzersizlerinde bir kare ilerletir"""
+        satirlar = np.arange(len(yuvalar))
+        aktif = np.zeros((len(yuvalar), len(self.katalog)), dtype=bool)
+        aktif[satirlar, egzersizler] = True
+        olaylar, hedefler, sayanlar = self.katalog.adim(
+            self.durumlar[yuvalar], self.durum_zamanlari[yuvalar], kosullar, zaman, aktif)
+
+        olay = olaylar[satirlar, egzersizler]
+        durum = self.durumlar[yuvalar, egzersizler]
+        aci = kosullar["aci"][satirlar, egzersizler]
+
+        # Başlangıç durumu, mod seçilirken karenin zamanı bilinmiyor olabileceğinden ilk karesiyle başlar
+        ilk = self.durum_kareleri[yuvalar, egzersizler] < 0
+        if ilk.any():
+            self.durum_kareleri[yuvalar[ilk], egzersizler[ilk]] = kare_no
+            bas = ilk & (durum == BASLANGIC)
+            self.durum_zamanlari[yuvalar[bas], egzersizler[bas]] = zaman
+
+        # Durumdaki açı aralığı; ölçülemeyen (NaN) açı aralığı bozmaz
+        aralik = self.aci_araliklari[yuvalar, egzersizler]
+        aralik[:, 0] = np.fmin(aralik[:, 0], aci)
+        aralik[:, 1] = np.fmax(aralik[:, 1], aci)
+        self.aci_araliklari[yuvalar, egzersizler] = aralik
+
+        self.son_olaylar[yuvalar] = olay
+        self.son_durumlar[yuvalar] = durum
+        self.son_acilar[yuvalar] = aci
+        for i in np.flatnonzero(olay == GECTI).tolist():
+            self._gecis(int(yuvalar[i]), int(egzersizler[i]), int(durum[i]), int(hedefler[i, egzersizler[i]]),
+                        float(aci[i]), bool(sayanlar[i, egzersizler[i]]), zaman, kare_no)
+
+    def _gecis(self, y, e, durum, yeni, aci, sayar, zaman, kare_no):
+        tanim = self.katalog.tanimlar[e]
+        kimlik = int(self.kimlikler[y])
+        # Biten durumun başlangıcı, süresi, kare aralığı ve içindeki açı aralığı
+        baslangic = float(self.durum_zamanlari[y, e])
+        en_kucuk, en_buyuk = self.aci_araliklari[y, e]
+        bolum = {
+            "baslangic": baslangic,
+            "sure": zaman - baslangic,
+            "baslangic_kare": int(self.durum_kareleri[y, e]),
+            "bitis_kare": int(kare_no),
+            "en_kucuk_aci": float(en_kucuk),
+            "en_buyuk_aci": float(en_buyuk),
+        }
+        if sayar:
+            self.sayaclar[y, e] += 1
+            tekrar = {"mod": tanim.ad, "baslangic": baslangic, "bitis": zaman, "sure": bolum["sure"]}
+            tekrar.update(bolum)
+            self.tekrarlar[y].append(tekrar)
+            log.info("%s tekrarı sayıldı: %.2f -> %.2f sn", tanim.ad, baslangic, zaman,
+                     extra=dict(tekrar, olay="tekrar", sayi=int(self.sayaclar[y, e]), kisi=kimlik,
+                                kaynak=self.kaynak))
+        onceki, sonraki = tanim.durumlar[durum], tanim.durumlar[yeni]
+        log.info("%s durumu %s -> %s (açı %.1f°)", tanim.ad, onceki, sonraki, aci,
+                 extra=dict(bolum, olay="gecis", mod=tanim.ad, onceki=onceki, yeni=sonraki, aci=aci,
+                            zaman_sn=zaman, kisi=kimlik, kaynak=self.kaynak))
+        self.durumlar[y, e] = yeni
+        self._durumu_baslat(y, e, zaman, kare_no, aci)
+
+    def _kare_kaydet(self, yuvalar):
+        for y in yuvalar.tolist():
+            olay = self.son_olaylar[y]
+            if olay == GECERSIZ:
+                continue
+            tanim = self.katalog.tanimlar[self.aktifler[y]]
+            durum = tanim.durumlar[self.son_durumlar[y]]
+            log.debug("[%s] Açı: %.1f° [Durum: %s]", tanim.baslik, self.son_acilar[y], durum,
+                      extra={"kare": True, "mod": tanim.ad, "aci": float(self.son_acilar[y]), "durum": durum,
+                             "kisi": int(self.kimlikler[y])})
+
+    def kisi_modu(self, kimlik):
+        """Kişinin sayılan egzersizi; otomatik modda tanınana kadar boş"""
+        e = self.aktifler[self._yuvalar[kimlik]]
+        if e >= 0:
+            return self.katalog.adlar[e]
+        return "" if self.otomatik else self.mod
+
+    def kisi_sayaclari(self, kimlik):
+        return dict(zip(self.katalog.adlar, self.sayaclar[self._yuvalar[kimlik]].tolist()))
+
+    def kisi_sayilari(self):
+        """Takipteki her kişinin kendi egzersizindeki tekrar sayısı"""
+        return {kimlik: int(self.sayaclar[y, self.aktifler[y]]) if self.aktifler[y] >= 0 else 0
+                for kimlik, y in self._yuvalar.items()}
+
+    def mesaj(self, kimlik):
+        """Kişinin son karesi için açıklama mesajı"""
+        y = self._yuvalar[kimlik]
+        e = self.aktifler[y]
+        if e < 0:
+            return "Egzersiz tanınıyor, harekete başla..." if self.otomatik else ""
+        if self.son_olaylar[y] < 0:
+            return ""
+        try:
+            return self.katalog.olay_mesaji(e, self.son_olaylar[y], self.son_durumlar[y], self.son_acilar[y],
+                                            int(self.sayaclar[y, e]))
+        except Exception as hata:
+            return self.katalog.tanimlar[e].mesaj("hata", hata=str(hata))
+
+    def _ozet(self, y):
+        ozet = {f"{ad}_sayisi": int(sayi) for ad, sayi in zip(self.katalog.adlar, self.sayaclar[y])}
+        ozet["mod"] = self.kisi_modu(int(self.kimlikler[y]))
+        ozet["tekrarlar"] = list(self.tekrarlar[y])
+        return ozet
+
+    def kisi_ozetleri(self):
+        """Hem aktif hem süresi dolmuş tüm kişilerin sayaç özetleri"""
+        ozetler = dict(self.biten_kisiler)
+        for kimlik, y in self._yuvalar.items():
+            ozetler[kimlik] = self._ozet(y)
+        return ozetler
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import numpy as np
+
+from arka_uclar import arka_uc_coz, disa_aktar
+
+MODEL_YOLU = "yolov8n-pose.pt"
+
+# Başsız analizde modele verilen ayarlar (keypoint önbelleği anahtarına da girer)
+CIKARIM_AYARLARI = {"imgsz": 640, "conf": 0.25}
+
+# Süreç genelinde yüklenmiş modeller ve yükleme süreleri, (yol, arka uç, imgsz) anahtarıyla
+_modeller = {}
+_yukleme_sureleri = {}
+_kilit = threading.Lock()
+# Ağırlık indirme ve dışa aktarma aynı dosyaya yazar; aynı anda yüklenen ayrı modeller sıraya girer
+_aktarma_kilidi = threading.Lock()
+
+# arka_uc verilmeyen model_al çağrılarının kullandığı arka uç
+_secili_arka_uc = "pytorch"
+
+
+def arka_uc_sec(ad):
+    """Süreçteki varsayılan çıkarım arka ucunu seçer ("pytorch", "onnx-int8", ...)"""
+    global _secili_arka_uc
+    # Bilinmeyen ad burada reddedilsin, ilk çıkarımda değil
+    arka_uc_coz(ad)
+    _secili_arka_uc = ad
+
+
+def secili_arka_uc():
+    return _secili_arka_uc
+
+
+def imgsz_sec(imgsz):
+    """Süreçteki model giriş boyutunu seçer; 32'nin katı olmalı.
+
+    CIKARIM_AYARLARI yerinde değiştirilir, içe aktarılmış kopyalar da yeni değeri görür.
+    """
+    if imgsz <= 0 or imgsz % 32:
+        raise ValueError(f"imgsz 32'nin pozitif katı olmalı: {imgsz}")
+    CIKARIM_AYARLARI["imgsz"] = int(imgsz)
+
+
+def _anahtar(yol, arka_uc):
+    # Dışa aktarılan modellerin giriş boyutu sabit; her imgsz ayrı model
+    return yol, arka_uc or _secili_arka_uc, CIKARIM_AYARLARI["imgsz"]
+
+
+def model_al(yol=MODEL_YOLU, isit=True, arka_uc=None):
+    """Modeli süreçte bir kez yükler ve her çağrıda aynı nesneyi döndürür.
+
+    PyTorch dışındaki arka uçlarda ağırlıklar ilk kullanımda dışa aktarılır ve
+    önbellekteki dosya yüklenir. Yükleme sürerken gelen çağrılar aynı yüklemeyi
+    bekler. Model thread'ler arasında paylaşılır; aynı anda yalnızca bir thread
+    çıkarım yapmalıdır.
+    """
+    arka_uc = arka_uc or _secili_arka_uc
+    anahtar = _anahtar(yol, arka_uc)
+    with _kilit:
+        model = _modeller.get(anahtar)
+        if model is not None:
+            return model
+
+        baslangic = time.perf_counter()
+        model = ayri_model_yukle(yol, isit, arka_uc)
+        _yukleme_sureleri[anahtar] = time.perf_counter() - baslangic
+        _modeller[anahtar] = model
+        return model
+
+
+def ayri_model_yukle(yol=MODEL_YOLU, isit=True, arka_uc=None):
+    """Paylaşılmayan yeni bir model nesnesi yükler.
+
+    Aynı anda çıkarım yapacak her thread kendi modelini almalıdır; süreçteki
+    paylaşılan model için model_al kullanılır.
+    """
+    # ultralytics ve torch yüklemesi saniyeler sürer, ilk ihtiyaçta içe aktarılır
+    from ultralytics import YOLO
+    with _aktarma_kilidi:
+        model = YOLO(disa_aktar(yol, arka_uc or _secili_arka_uc, CIKARIM_AYARLARI["imgsz"]), task="pose")
+    if isit:
+        # İlk çıkarım önişleme ve çekirdek hazırlığını da ödüyor, kullanıcıya yansımasın
+        model(np.zeros((CIKARIM_AYARLARI["imgsz"], CIKARIM_AYARLARI["imgsz"], 3), dtype=np.uint8),
+              verbose=False, **CIKARIM_AYARLARI)
+    return model
+
+
+def arka_planda_yukle(yol=MODEL_YOLU, bitince=None, arka_uc=None):
+    """Modeli arka plan thread'inde yükleyip ısıtır; bitince(model, hata) çağrılır"""
+    def yukle():
+        try:
+            model = model_al(yol, arka_uc=arka_uc)
+        except Exception as e:
+            if bitince is not None:
+                bitince(None, e)
+            return
+        if bitince is not None:
+            bitince(model, None)
+
+    thread = threading.Thread(target=yukle, name="model-yukleme", daemon=True)
+    thread.start()
+    return thread
+
+
+def yuklendi_mi(yol=MODEL_YOLU, arka_uc=None):
+    return _anahtar(yol, arka_uc) in _modeller
+
+
+def yukleme_suresi(yol=MODEL_YOLU, arka_uc=None):
+    """Modelin yükleme (gerekirse dışa aktarma) ve ısıtma süresi (saniye); henüz yüklenmediyse None"""
+    return _yukleme_sureleri.get(_anahtar(yol, arka_uc))
@@ -0,0 +1,132 @@
+import collections
+import json
+import logging
+import threading
+
+# Analizcilerin kaydedicisi; durum geçişleri INFO, kare başına açılar DEBUG
+log = logging.getLogger("spor.analiz")
+
+VARSAYILAN_HALKA_BOYUTU = 2000
+
+# Her LogRecord'da bulunan alanlar; geri kalanlar extra={} ile gelen yapısal alanlardır
+_STANDART_ALANLAR = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def yapisal_alanlar(kayit):
+    return {ad: deger for ad, deger in vars(kayit).items() if ad not in _STANDART_ALANLAR}
+
+
+class HalkaTamponu(logging.Handler):
+    """Son olayları bellekte sabit boyutlu halkada tutar.
+
+    Kayıtlar biçimlendirilmeden saklanır; mesaj yalnızca dökümde oluşturulur.
+    """
+
+    def __init__(self, boyut=VARSAYILAN_HALKA_BOYUTU):
+        super().__init__(logging.DEBUG)
+        self.kayitlar = collections.deque(maxlen=boyut)
+
+    def emit(self, kayit):
+        self.kayitlar.append(kayit)
+
+    def olaylar(self):
+        with self.lock:
+            kayitlar = list(self.kayitlar)
+        return [
+            dict(zaman=kayit.created, seviye=kayit.levelname, mesaj=kayit.getMessage(),
+                 thread=kayit.threadName, **yapisal_alanlar(kayit))
+            for kayit in kayitlar
+        ]
+
+    def dok(self, yol):
+        """Halkadaki olayları satır başına bir JSON nesnesi olarak dosyaya yazar"""
+        olaylar = self.olaylar()
+        with open(yol, "w", encoding="utf-8") as f:
+            for olay in olaylar:
+                f.write(json.dumps(olay, ensure_ascii=False, default=float) + "\n")
+        return len(olaylar)
+
+
+class KareOrnekleyici(logging.Filter):
+    """Kare başına kayıtlardan (extra={"kare": True}) yalnızca her n'incisini geçirir"""
+
+    def __init__(self, oran):
+        super().__init__()
+        self.oran = max(1, oran)
+        self._sayac = 0
+        self._kilit = threading.Lock()
+
+    def filter(self, kayit):
+        if not getattr(kayit, "kare", False):
+            return True
+        with self._kilit:
+            self._sayac += 1
+            return self._sayac % self.oran == 0
+
+
+_halka = None
+_veritabani = None
+
+
+def gunlugu_kur(seviye=logging.INFO, kare_orani=0, halka_boyutu=VARSAYILAN_HALKA_BOYUTU,
+                veritabani_yolu=None):
+    """Konsol çıktısını ve olay halkasını kurar.
+
+    kare_orani=0 iken kare başına DEBUG kayıtları hiç oluşturulmaz; n > 0 ise her
+    n karede bir kayıt halkaya ve (seviye DEBUG ise) konsola düşer. veritabani_yolu
+    verilirse tekrar ve geçiş olayları ayrıca o SQLite veritabanına yazılır.
+    """
+    global _halka, _veritabani
+    if isinstance(seviye, str):
+        seviye = logging.getLevelName(seviye.upper())
+
+    kok = logging.getLogger("spor")
+    for handler in list(kok.handlers):
+        kok.removeHandler(handler)
+        handler.close()
+    for filtre in list(log.filters):
+        log.removeFilter(filtre)
+
+    konsol = logging.StreamHandler()
+    konsol.setLevel(seviye)
+    konsol.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s", "%H:%M:%S"))
+    kok.addHandler(konsol)
+
+    _halka = HalkaTamponu(halka_boyutu)
+    kok.addHandler(_halka)
+    kok.propagate = False
+
+    _veritabani = None
+    if veritabani_yolu:
+        from olay_veritabani import OlayVeritabani
+        _veritabani = OlayVeritabani(veritabani_yolu)
+        kok.addHandler(_veritabani)
+
+    # Halka konsoldan daha ayrıntılı tutabilir; geçişler her zaman halkaya girer
+    kok.setLevel(min(seviye, logging.INFO))
+    if kare_orani > 0:
+        log.setLevel(logging.DEBUG)
+        log.addFilter(KareOrnekleyici(kare_orani))
+    else:
+        log.setLevel(logging.NOTSET)
+    return _halka
+
+
+def halka():
+    """gunlugu_kur ile kurulan olay halkası (kurulmadıysa None)"""
+    return _halka
+
+
+def veritabani():
+    """gunlugu_kur ile kurulan olay veritabanı (kurulmadıysa None)"""
+    return _veritabani
+
+
+def veritabanini_kapat():
+    """Olay veritabanını günlükten çıkarıp kuyruğu boşaltarak kapatır; kapatılanı döndürür"""
+    global _veritabani
+    db, _veritabani = _veritabani, None
+    if db is not None:
+        logging.getLogger("spor").removeHandler(db)
+        db.close()
+    return db
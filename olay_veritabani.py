@@ -0,0 +1,242 @@
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from olay_gunlugu import yapisal_alanlar
+
+VARSAYILAN_VERITABANI = os.path.join(os.path.expanduser("~"), ".local", "share", "spor_hareket_analizi",
+                                     "olaylar.sqlite")
+
+# Veritabanına yazılan analiz olayları; kare başına açılar ve diğer kayıtlar atlanır
+KAYDEDILEN_OLAYLAR = ("tekrar", "gecis", "tanima")
+
+# olaylar tablosunun sütunları; kayıtta bulunmayan alanlar NULL yazılır
+SUTUNLAR = (
+    "olay", "mod", "kisi", "kaynak", "onceki", "yeni", "sayi",
+    "baslangic_kare", "bitis_kare", "baslangic_sn", "bitis_sn", "bekleme_sn",
+    "en_kucuk_aci", "en_buyuk_aci", "aci",
+)
+
+_SEMA = """
+CREATE TABLE IF NOT EXISTS oturumlar (
+    oturum TEXT PRIMARY KEY,
+    baslangic REAL NOT NULL,
+    bitis REAL
+);
+CREATE TABLE IF NOT EXISTS olaylar (
+    id INTEGER PRIMARY KEY,
+    oturum TEXT NOT NULL REFERENCES oturumlar(oturum),
+    zaman REAL NOT NULL,
+    olay TEXT NOT NULL,
+    mod TEXT,
+    kisi INTEGER,
+    kaynak TEXT,
+    onceki TEXT,
+    yeni TEXT,
+    sayi INTEGER,
+    baslangic_kare INTEGER,
+    bitis_kare INTEGER,
+    baslangic_sn REAL,
+    bitis_sn REAL,
+    bekleme_sn REAL,
+    en_kucuk_aci REAL,
+    en_buyuk_aci REAL,
+    aci REAL
+);
+CREATE INDEX IF NOT EXISTS olaylar_oturum ON olaylar(oturum, olay, mod);
+"""
+
+_EKLE = "INSERT INTO olaylar (oturum, zaman, {}) VALUES (?, ?, {})".format(
+    ", ".join(SUTUNLAR), ", ".join("?" * len(SUTUNLAR)))
+
+
+def _satir(oturum, kayit):
+    alanlar = yapisal_alanlar(kayit)
+    # Geçişte biten durumun, tekrarda tekrarın zaman aralığı; bekleme o aralığın süresi
+    alanlar.update(baslangic_sn=alanlar.get("baslangic"),
+                   bitis_sn=alanlar.get("bitis", alanlar.get("zaman_sn")),
+                   bekleme_sn=alanlar.get("sure"))
+    return (oturum, kayit.created) + tuple(_sql_degeri(alanlar.get(ad)) for ad in SUTUNLAR)
+
+
+def _sql_degeri(deger):
+    # NumPy sayıları sqlite'a doğrudan verilemez; NaN açı NULL olur
+    if deger is None or isinstance(deger, str):
+        return deger
+    if hasattr(deger, "item"):
+        deger = deger.item()
+    if isinstance(deger, float) and deger != deger:
+        return None
+    return deger
+
+
+class OlayVeritabani(logging.Handler):
+    """Analiz olaylarını (tekrar, durum geçişi, tanıma) yerel SQLite veritabanına yazar.
+
+    emit yalnızca kaydı kuyruğa koyar; analiz thread'i diske hiç beklemez. Yazıcı
+    thread kuyruktaki kayıtları parti_boyutu'na ya da bekleme_suresi dolana kadar
+    biriktirip tek işlemde executemany ile ekler. Veritabanı WAL kipinde açılır;
+    yazım sürerken başka süreçler (rapor, grafik) tabloyu okuyabilir.
+
+    Her açılış yeni bir oturum satırı açar; olaylar oturum kimliğiyle saklanır.
+    """
+
+    def __init__(self, yol=VARSAYILAN_VERITABANI, parti_boyutu=256, bekleme_suresi=1.0):
+        super().__init__(logging.INFO)
+        self.yol = yol
+        self.parti_boyutu = max(1, parti_boyutu)
+        self.bekleme_suresi = bekleme_suresi
+        self.oturum = uuid.uuid4().hex[:12]
+        self.yazilan = 0
+        self.parti_sayisi = 0
+        self.hata = None
+        self._kuyruk = queue.SimpleQueue()
+
+        klasor = os.path.dirname(os.path.abspath(yol))
+        os.makedirs(klasor, exist_ok=True)
+        # Şema ve oturum satırı açılışta yazılır; yol hatalıysa hemen anlaşılsın
+        baglanti = self._baglan()
+        with baglanti:
+            baglanti.execute("INSERT INTO oturumlar (oturum, baslangic) VALUES (?, ?)",
+                             (self.oturum, time.time()))
+        baglanti.close()
+
+        self._thread = threading.Thread(target=self._yaz, name="olay-veritabani", daemon=True)
+        self._thread.start()
+
+    def _baglan(self):
+        baglanti = sqlite3.connect(self.yol, timeout=10)
+        baglanti.execute("PRAGMA journal_mode=WAL")
+        # WAL'de NORMAL, çökmede yalnızca son işlemleri kaybettirir; her partide fsync yapılmaz
+        baglanti.execute("PRAGMA synchronous=NORMAL")
+        baglanti.executescript(_SEMA)
+        return baglanti
+
+    def filter(self, kayit):
+        return getattr(kayit, "olay", None) in KAYDEDILEN_OLAYLAR and super().filter(kayit)
+
+    def emit(self, kayit):
+        # Yazıcı hata verip durduysa kuyruk boşuna büyümesin
+        if self.hata is None:
+            self._kuyruk.put(kayit)
+
+    def _yaz(self):
+        baglanti = self._baglan()
+        try:
+            bitti = False
+            while not bitti:
+                kayit = self._kuyruk.get()
+                parti = []
+                son_tarih = time.monotonic() + self.bekleme_suresi
+                while True:
+                    if kayit is None:
+                        bitti = True
+                        break
+                    parti.append(_satir(self.oturum, kayit))
+                    if len(parti) >= self.parti_boyutu:
+                        break
+                    kalan = son_tarih - time.monotonic()
+                    if kalan <= 0:
+                        break
+                    try:
+                        kayit = self._kuyruk.get(timeout=kalan)
+                    except queue.Empty:
+                        break
+                if parti:
+                    with baglanti:
+                        baglanti.executemany(_EKLE, parti)
+                    self.yazilan += len(parti)
+                    self.parti_sayisi += 1
+            with baglanti:
+                baglanti.execute("UPDATE oturumlar SET bitis = ? WHERE oturum = ?",
+                                 (time.time(), self.oturum))
+        except Exception as hata:
+            self.hata = hata
+        finally:
+            baglanti.close()
+
+    def close(self):
+        # Kuyrukta kalanlar yazılıp oturum kapanana kadar bekler
+        if self._thread.is_alive():
+            self._kuyruk.put(None)
+            self._thread.join()
+        super().close()
+
+
+def oturum_ozeti(yol, oturum=None):
+    """Oturumdaki (verilmezse son oturumdaki) kaynak, kişi ve mod başına tekrar özeti"""
+    baglanti = sqlite3.connect(yol)
+    try:
+        if oturum is None:
+            satir = baglanti.execute(
+                "SELECT oturum FROM oturumlar ORDER BY baslangic DESC LIMIT 1").fetchone()
+            if satir is None:
+                return None, []
+            oturum = satir[0]
+        satirlar = baglanti.execute(
+            """SELECT kaynak, kisi, mod, COUNT(*), AVG(bekleme_sn), MIN(en_kucuk_aci), MAX(en_buyuk_aci),
+                      MIN(baslangic_sn), MAX(bitis_sn)
+               FROM olaylar WHERE oturum = ? AND olay = 'tekrar'
+               GROUP BY kaynak, kisi, mod ORDER BY kaynak, kisi, mod""", (oturum,)).fetchall()
+    finally:
+        baglanti.close()
+    alanlar = ("kaynak", "kisi", "mod", "tekrar", "ortalama_sure", "en_kucuk_aci", "en_buyuk_aci",
+               "ilk_sn", "son_sn")
+    return oturum, [dict(zip(alanlar, satir)) for satir in satirlar]
+
+
+def oturumlar(yol):
+    """Veritabanındaki oturumlar, en yeniden eskiye; oturum başına tekrar sayısıyla"""
+    baglanti = sqlite3.connect(yol)
+    try:
+        return baglanti.execute(
+            """SELECT o.oturum, o.baslangic, o.bitis, COUNT(t.id)
+               FROM oturumlar o LEFT JOIN olaylar t ON t.oturum = o.oturum AND t.olay = 'tekrar'
+               GROUP BY o.oturum ORDER BY o.baslangic DESC""").fetchall()
+    finally:
+        baglanti.close()
+
+
+def olaylar_main(argv):
+    """python spor_gui.py olaylar [veritabanı] komutunu çalıştırır"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="spor_gui.py olaylar",
+                                     description="Olay veritabanındaki oturumların tekrar özetini yazar")
+    parser.add_argument("veritabani", nargs="?", default=VARSAYILAN_VERITABANI,
+                        help=f"SQLite olay veritabanı (varsayılan: {VARSAYILAN_VERITABANI})")
+    parser.add_argument("--oturum", default=None, help="Özeti yazılacak oturum (varsayılan: son oturum)")
+    parser.add_argument("--liste", action="store_true", help="Yalnızca oturumları listele")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.veritabani):
+        print(f"Veritabanı bulunamadı: {args.veritabani}", file=sys.stderr)
+        return 1
+
+    if args.liste:
+        for oturum, baslangic, bitis, tekrar in oturumlar(args.veritabani):
+            sure = f"{bitis - baslangic:.0f} sn" if bitis else "kapanmadı"
+            print(f"{oturum}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(baslangic))}  "
+                  f"{sure}  {tekrar} tekrar")
+        return 0
+
+    oturum, ozetler = oturum_ozeti(args.veritabani, args.oturum)
+    if oturum is None:
+        print("Veritabanında oturum yok")
+        return 0
+    print(f"Oturum: {oturum}")
+    if not ozetler:
+        print("Bu oturumda sayılan tekrar yok")
+    for ozet in ozetler:
+        kisi = f" kişi #{ozet['kisi']}" if ozet["kisi"] is not None else ""
+        aci = (f" | açı {ozet['en_kucuk_aci']:.0f}°-{ozet['en_buyuk_aci']:.0f}°"
+               if ozet["en_kucuk_aci"] is not None else "")
+        print(f"  {ozet['kaynak'] or '-'}{kisi} | {ozet['mod']}: {ozet['tekrar']} tekrar | "
+              f"ortalama {ozet['ortalama_sure']:.2f} sn{aci} | "
+              f"{ozet['ilk_sn']:.1f} -> {ozet['son_sn']:.1f} sn")
+    return 0
@@ -0,0 +1,134 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Histogram kova üst sınırları (ms); son kova geri kalan her şeyi toplar
+KOVA_SINIRLARI_MS = np.array([0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, np.inf])
+
+# GUI'de ve dışa aktarımda aşamaların sırası
+ASAMALAR = ["okuma", "arama", "cikarim", "cizim", "yumusatma", "analiz", "olcekleme", "gosterim", "bekleme"]
+
+_BOS_BAGLAM = contextlib.nullcontext()
+
+
+class _AsamaOlcumu(contextlib.AbstractContextManager):
+    __slots__ = ("zamanlayici", "asama", "baslangic")
+
+    def __init__(self, zamanlayici, asama):
+        self.zamanlayici = zamanlayici
+        self.asama = asama
+
+    def __enter__(self):
+        self.baslangic = time.perf_counter()
+        return self
+
+    def __exit__(self, *hata):
+        self.zamanlayici.kaydet(self.asama, time.perf_counter() - self.baslangic)
+        return False
+
+
+class AsamaZamanlayici:
+    """Sıcak yoldaki aşamaların sürelerini sabit boyutlu histogramlarda toplar.
+
+    Kapalıyken olc() paylaşılan boş bir bağlam döndürür, saat okunmaz.
+    Farklı thread'lerden (okuma, çıkarım, arayüz) aynı anda kaydedilebilir.
+    """
+
+    def __init__(self, aktif=True):
+        self.aktif = aktif
+        self._kilit = threading.Lock()
+        self.sifirla()
+
+    def sifirla(self):
+        with self._kilit:
+            self.kovalar = {}
+            self.sayilar = {}
+            self.toplamlar = {}
+            self.en_buyukler = {}
+            self.sonlar = {}
+
+    def olc(self, asama):
+        """with zamanlayici.olc("cikarim"): ... bloğunun süresini kaydeder"""
+        if not self.aktif:
+            return _BOS_BAGLAM
+        return _AsamaOlcumu(self, asama)
+
+    def kaydet(self, asama, sure):
+        """Bir aşamanın süresini (saniye) histograma ekler"""
+        if not self.aktif:
+            return
+        ms = sure * 1000
+        kova = int(np.searchsorted(KOVA_SINIRLARI_MS, ms))
+        with self._kilit:
+            if asama not in self.kovalar:
+                self.kovalar[asama] = np.zeros(len(KOVA_SINIRLARI_MS), dtype=np.int64)
+                self.sayilar[asama] = 0
+                self.toplamlar[asama] = 0.0
+                self.en_buyukler[asama] = 0.0
+            self.kovalar[asama][kova] += 1
+            self.sayilar[asama] += 1
+            self.toplamlar[asama] += ms
+            self.en_buyukler[asama] = max(self.en_buyukler[asama], ms)
+            self.sonlar[asama] = ms
+
+    def _yuzdelik(self, kovalar, oran):
+        # Histogramdan tahmin: istenen sıranın düştüğü kovanın üst sınırı
+        sira = np.searchsorted(np.cumsum(kovalar), oran * kovalar.sum())
+        return float(KOVA_SINIRLARI_MS[min(sira, len(KOVA_SINIRLARI_MS) - 1)])
+
+    def ozet(self):
+        """Aşama başına sayı, ortalama, p50/p95 (kova sınırı), en büyük ve son süre (ms)"""
+        with self._kilit:
+            asamalar = sorted(self.kovalar, key=lambda a: ASAMALAR.index(a) if a in ASAMALAR else len(ASAMALAR))
+            return {
+                asama: {
+                    "sayi": self.sayilar[asama],
+                    "ortalama_ms": self.toplamlar[asama] / self.sayilar[asama],
+                    "p50_ms": self._yuzdelik(self.kovalar[asama], 0.5),
+                    "p95_ms": self._yuzdelik(self.kovalar[asama], 0.95),
+                    "en_buyuk_ms": self.en_buyukler[asama],
+                    "son_ms": self.sonlar[asama],
+                    "kovalar": self.kovalar[asama].tolist(),
+                }
+                for asama in asamalar
+            }
+
+    def json_yaz(self, yol):
+        anlik = {
+            "zaman": time.time(),
+            "kova_sinirlari_ms": [None if np.isinf(s) else float(s) for s in KOVA_SINIRLARI_MS],
+            "asamalar": self.ozet(),
+        }
+        _atomik_yaz(yol, json.dumps(anlik, ensure_ascii=False, indent=2))
+
+    def prometheus_yaz(self, yol):
+        """node_exporter textfile toplayıcısının okuyabileceği histogram dosyası yazar"""
+        satirlar = [
+            "# HELP spor_asama_sure_saniye Kare başına aşama süresi",
+            "# TYPE spor_asama_sure_saniye histogram",
+        ]
+        for asama, deger in self.ozet().items():
+            birikimli = np.cumsum(deger["kovalar"])
+            for sinir, sayi in zip(KOVA_SINIRLARI_MS, birikimli):
+                le = "+Inf" if np.isinf(sinir) else repr(float(sinir) / 1000)
+                satirlar.append(f'spor_asama_sure_saniye_bucket{{asama="{asama}",le="{le}"}} {sayi}')
+            satirlar.append(f'spor_asama_sure_saniye_sum{{asama="{asama}"}} '
+                            f'{deger["ortalama_ms"] * deger["sayi"] / 1000}')
+            satirlar.append(f'spor_asama_sure_saniye_count{{asama="{asama}"}} {deger["sayi"]}')
+        _atomik_yaz(yol, "\n".join(satirlar) + "\n")
+
+
+def _atomik_yaz(yol, icerik):
+    # Toplayıcı yarım yazılmış dosyayı okumasın
+    gecici = f"{yol}.{os.getpid()}.tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        f.write(icerik)
+    os.replace(gecici, yol)
+
+
+# Zamanlayıcı verilmeyen bileşenlerin kullandığı kapalı örnek
+KAPALI = AsamaZamanlayici(aktif=False)
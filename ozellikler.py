@@ -0,0 +1,169 @@
+import numpy as np
+
+# COCO keypoint indeksleri
+SOL_OMUZ, SAG_OMUZ = 5, 6
+SOL_DIRSEK, SAG_DIRSEK = 7, 8
+SOL_BILEK, SAG_BILEK = 9, 10
+SOL_KALCA, SAG_KALCA = 11, 12
+SOL_DIZ, SAG_DIZ = 13, 14
+SOL_AYAK, SAG_AYAK = 15, 16
+
+# 17 noktanın arkasına eklenen orta noktalar
+OMUZ_ORTA, KALCA_ORTA, DIZ_ORTA, AYAK_ORTA = 17, 18, 19, 20
+_ORTA_CIFTLERI = np.array([
+    (SOL_OMUZ, SAG_OMUZ),
+    (SOL_KALCA, SAG_KALCA),
+    (SOL_DIZ, SAG_DIZ),
+    (SOL_AYAK, SAG_AYAK),
+])
+
+# Egzersiz tanımlarında kullanılan nokta adları
+NOKTALAR = {
+    "burun": 0, "sol_goz": 1, "sag_goz": 2, "sol_kulak": 3, "sag_kulak": 4,
+    "sol_omuz": SOL_OMUZ, "sag_omuz": SAG_OMUZ,
+    "sol_dirsek": SOL_DIRSEK, "sag_dirsek": SAG_DIRSEK,
+    "sol_bilek": SOL_BILEK, "sag_bilek": SAG_BILEK,
+    "sol_kalca": SOL_KALCA, "sag_kalca": SAG_KALCA,
+    "sol_diz": SOL_DIZ, "sag_diz": SAG_DIZ,
+    "sol_ayak": SOL_AYAK, "sag_ayak": SAG_AYAK,
+    "omuz_orta": OMUZ_ORTA, "kalca_orta": KALCA_ORTA, "diz_orta": DIZ_ORTA, "ayak_orta": AYAK_ORTA,
+}
+
+GUVEN_ESIGI = 0.5
+
+
+def nokta_indeksi(ad):
+    if ad not in NOKTALAR:
+        raise ValueError(f"Bilinmeyen nokta: {ad}")
+    return NOKTALAR[ad]
+
+
+class OzellikPlani:
+    """Egzersiz tanımlarındaki adlandırılmış özellikleri tek vektörel geçişe derler.
+
+    Desteklenen tanımlar:
+      {"aci": [a, b, c]}           b merkezli üç nokta açısı
+      {"dikey": [a, b]}            a'dan b'ye vektörün dikeyle açısı
+      {"ortalama": [ozellik, ...]} başka özelliklerin ortalaması
+      {"en_buyuk_y": [nokta, ...]} / {"en_kucuk_y": [...]}
+                                   noktaların en alttaki / en üstteki y değeri
+    Dikey açılar dahil bütün açılar tek einsum ile hesaplanır; yeni bir egzersiz
+    yalnızca yeni bir açı tanımlıyorsa hesaba bir satır ekler.
+    """
+
+    def __init__(self, tanimlar, gerekenler=None):
+        self.tanimlar = tanimlar
+        sira = self._sirala(gerekenler if gerekenler is not None else list(tanimlar))
+        self.adlar = sira
+        self.sutunlar = {ad: j for j, ad in enumerate(sira)}
+
+        # Üçlü ve dikey açılar aynı diziye toplanır: dikey açı (bitiş, başlangıç, başlangıç)
+        # üçlüsüdür, ikinci kolu sonradan (0, 1) yapılır
+        uclu, aci_sutunlari, dikey_satirlari = [], [], []
+        self._turetilenler = []
+        for ad in sira:
+            tur, noktalar = self._tanim(ad)
+            indeksler = [nokta_indeksi(n) for n in noktalar] if tur != "ortalama" else None
+            if tur == "aci":
+                uclu.append(indeksler)
+                aci_sutunlari.append(self.sutunlar[ad])
+            elif tur == "dikey":
+                dikey_satirlari.append(len(uclu))
+                uclu.append([indeksler[1], indeksler[0], indeksler[0]])
+                aci_sutunlari.append(self.sutunlar[ad])
+            elif tur == "ortalama":
+                self._turetilenler.append((self.sutunlar[ad], tur, [self.sutunlar[b] for b in noktalar]))
+            else:
+                self._turetilenler.append((self.sutunlar[ad], tur, indeksler))
+        self._uclu = np.array(uclu, dtype=np.intp).reshape(-1, 3)
+        self._aci_sutunlari = np.array(aci_sutunlari, dtype=np.intp)
+        self._dikey_satirlari = np.array(dikey_satirlari, dtype=np.intp)
+
+    def _tanim(self, ad):
+        if ad not in self.tanimlar:
+            raise ValueError(f"Bilinmeyen özellik: {ad}")
+        tanim = self.tanimlar[ad]
+        if len(tanim) != 1:
+            raise ValueError(f"Özellik tanımı tek anahtarlı olmalı: {ad}")
+        tur, noktalar = next(iter(tanim.items()))
+        beklenen = {"aci": 3, "dikey": 2}
+        if tur not in ("aci", "dikey", "ortalama", "en_buyuk_y", "en_kucuk_y"):
+            raise ValueError(f"Bilinmeyen özellik türü: {tur} ({ad})")
+        if tur in beklenen and len(noktalar) != beklenen[tur]:
+            raise ValueError(f"'{tur}' özelliği {beklenen[tur]} nokta ister: {ad}")
+        return tur, noktalar
+
+    def _sirala(self, gerekenler):
+        # Ortalamalar bağlı oldukları özelliklerden sonra hesaplanmalı
+        sira, ziyaret = [], set()
+
+        def ekle(ad, yol=()):
+            if ad in ziyaret:
+                return
+            if ad in yol:
+                raise ValueError(f"Özellik tanımında döngü: {' -> '.join(yol + (ad,))}")
+            tur, bagimliliklar = self._tanim(ad)
+            if tur == "ortalama":
+                for bagimli in bagimliliklar:
+                    ekle(bagimli, yol + (ad,))
+            ziyaret.add(ad)
+            sira.append(ad)
+
+        for ad in gerekenler:
+            ekle(ad)
+        return sira
+
+    def hesapla(self, keypoints):
+        """keypoints: tek kare için (17, 3), kare dizisi için (T, 17, 3).
+
+        Her özellik tek karede skaler, dizide (T,) olarak döner. "guven" anahtarı
+        noktaların güven değerleri, "matris" tüm özelliklerin adlar sırasıyla
+        (..., özellik) dizisidir; koşullar sütunları buradan tek seferde okur.
+        """
+        kp = np.asarray(keypoints)
+        tek_kare = kp.ndim == 2
+        if tek_kare:
+            kp = kp[np.newaxis]
+
+        xy = kp[:, :17, :2]
+        guven = kp[:, :17, 2]
+
+        # Orta noktaları ekleyip tüm açıları tek indeksleme ile topla
+        orta = (xy[:, _ORTA_CIFTLERI[:, 0]] + xy[:, _ORTA_CIFTLERI[:, 1]]) / 2
+        noktalar = np.concatenate([xy, orta], axis=1)
+
+        secilen = noktalar[:, self._uclu]
+        ba = secilen[:, :, 0] - secilen[:, :, 1]
+        bc = secilen[:, :, 2] - secilen[:, :, 1]
+        # Dikey açıların ikinci kolu birim dikey vektör
+        bc[:, self._dikey_satirlari] = (0, 1)
+
+        # Kare başına tek kişide NumPy çağrı maliyeti baskın; norm ve clip yerine
+        # aynı sonucu veren daha hafif çağrılar kullanılır
+        with np.errstate(invalid="ignore", divide="ignore"):
+            kosinus = np.einsum("tkd,tkd->tk", ba, bc) / (
+                np.sqrt(np.einsum("tkd,tkd->tk", ba, ba)) * np.sqrt(np.einsum("tkd,tkd->tk", bc, bc)))
+            acilar = np.degrees(np.arccos(np.minimum(np.maximum(kosinus, -1.0), 1.0)))
+
+        matris = np.empty((len(kp), len(self.adlar)), dtype=acilar.dtype)
+        matris[:, self._aci_sutunlari] = acilar
+        for sutun, tur, arg in self._turetilenler:
+            if tur == "ortalama":
+                toplam = matris[:, arg[0]]
+                for diger in arg[1:]:
+                    toplam = toplam + matris[:, diger]
+                matris[:, sutun] = toplam / len(arg)
+            elif tur == "en_buyuk_y":
+                # "herhangi biri eşiği geçti mi" için bilinmeyen (NaN) nokta atlanır,
+                # "hepsi geçti mi" için (en_kucuk_y) sonucu bilinmez yapar
+                matris[:, sutun] = np.fmax.reduce(noktalar[:, arg, 1], axis=1)
+            else:
+                matris[:, sutun] = noktalar[:, arg, 1].min(axis=1)
+
+        if tek_kare:
+            matris = matris[0]
+            guven = guven[0]
+        ozellik = {ad: matris[..., j] for j, ad in enumerate(self.adlar)}
+        ozellik["guven"] = guven
+        ozellik["matris"] = matris
+        return ozellik
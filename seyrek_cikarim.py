@@ -0,0 +1,167 @@
+import cv2
+import numpy as np
+
+from boru_hatti import video_kare_zamani
+from egzersiz_motoru import varsayilan_katalog
+
+
+class UyarlamaliAdim:
+    """Model kaç karede bir çalıştırılacak, ona karar verir.
+
+    Eklemler hızlı hareket ediyorsa veya açı bir eşiğe yakınsa aralık 1'e iner;
+    sakin bölümlerde en_buyuk_adim'e kadar büyür. Mod katalogda yoksa (otomatik
+    tanıma) bütün egzersizlerin açıları ve eşikleri izlenir.
+
+    Adım ayrıca açının son iki anahtar kare arasındaki hızıyla sınırlanır: açı bu
+    hızla en yakın eşiğe varmadan bir sonraki çıkarım yapılır. Hareket aralıkta
+    hızlanıp eşiği geçerse esik_gecildi() bunu iki anahtar kareden yakalar; eşiği
+    geçip aralık bitmeden aynı tarafa dönen açı ise iki uçtan da görülemez.
+    """
+
+    def __init__(self, mod, en_buyuk_adim=4, hiz_esigi=0.5, esik_payi=15.0, katalog=None):
+        self.mod = mod
+        self.katalog = katalog or varsayilan_katalog()
+        tanimlar = [self.katalog.tanim(mod)] if mod in self.katalog else self.katalog.tanimlar
+        # Durum makinelerinin izlediği açılar ve her birinin eşikleri
+        self.aci_adlari = [tanim.aci for tanim in tanimlar]
+        self.en_buyuk_adim = max(1, en_buyuk_adim)
+        # Saniyede kare yüksekliğine oranla eklem hızı
+        self.hiz_esigi = hiz_esigi
+        self.esik_payi = esik_payi
+        self.esikler = np.array([[tanim.giris_esigi, tanim.cikis_esigi] for tanim in tanimlar],
+                                dtype=np.float64)
+        self.adim = 1
+
+    def _acilar(self, keypoints):
+        ozellik = self.katalog.ozellikleri_hesapla(keypoints)
+        return np.array([ozellik[ad] for ad in self.aci_adlari], dtype=np.float64)
+
+    def _esige_uzaklik(self, acilar):
+        return np.min(np.abs(self.esikler - acilar[:, None])) if np.isfinite(acilar).all() else 0.0
+
+    def esik_gecildi(self, onceki, simdiki):
+        """İki anahtar karedeki açılar bir giriş/çıkış eşiğinin iki yanındaysa True"""
+        if onceki is None or simdiki is None:
+            return False
+        fark_once = self.esikler - self._acilar(onceki)[:, None]
+        fark_simdi = self.esikler - self._acilar(simdiki)[:, None]
+        return bool(np.any(fark_once * fark_simdi < 0))
+
+    def guncelle(self, onceki, simdiki, gecen_sure, frame_height):
+        """İki çıkarım arasındaki değişime göre bir sonraki adımı döndürür"""
+        if onceki is None and simdiki is None:
+            # Karede kimse yok; giren kişi en geç en_buyuk_adim karede yakalanır
+            self.adim = self.en_buyuk_adim
+            return self.adim
+        if onceki is None or simdiki is None or gecen_sure <= 0:
+            # Kişi yeni girdi veya kayboldu; sıkı takip et
+            self.adim = 1
+            return self.adim
+
+        guvenli = (onceki[:, 2] >= 0.5) & (simdiki[:, 2] >= 0.5)
+        if guvenli.any():
+            yer_degistirme = np.linalg.norm(simdiki[guvenli, :2] - onceki[guvenli, :2], axis=1)
+            hiz = float(np.median(yer_degistirme)) / gecen_sure / max(frame_height, 1)
+        else:
+            hiz = np.inf
+
+        acilar = self._acilar(simdiki)
+        esige_uzaklik = self._esige_uzaklik(acilar)
+        esige_yakin = esige_uzaklik < self.esik_payi
+
+        onceki_adim = self.adim
+        if hiz > self.hiz_esigi or esige_yakin:
+            self.adim = 1
+        elif hiz > self.hiz_esigi / 2:
+            self.adim = max(1, self.en_buyuk_adim // 2)
+        else:
+            self.adim = self.en_buyuk_adim
+
+        # Açı bu hızla en yakın eşiğe kaç karede varır; adım onu geçmez
+        degisim = np.abs(acilar - self._acilar(onceki)) if self.adim > 1 else np.zeros(0)
+        aci_hizi = degisim.max() / onceki_adim if degisim.size and np.isfinite(degisim).all() else 0.0
+        if aci_hizi > 0:
+            self.adim = max(1, min(self.adim, int(esige_uzaklik / aci_hizi)))
+        return self.adim
+
+
+def seyrek_keypointler(cap, cikarim, kisi_sec, adim_secici):
+    """Modeli yalnızca seçilen karelerde çalıştırır, aradaki kareleri enterpole eder.
+
+    Atlanan kareler cap.grab() ile geçilir (BGR dönüşümü ve kopya yapılmaz).
+    İki anahtar kare bir eşiğin iki yanındaysa geçiş enterpolasyona bırakılmaz:
+    video aralığın başına sarılır, atlanan kareler çözülür ve eşiğin iki yanında
+    kalan alt aralık ortadan bölünerek geçiş karesi modelle bulunur.
+    (kare_no, zaman, frame_height, keypoints veya None, çıkarım yapıldı mı) üretir.
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)
+
+    success, frame = cap.read()
+    if not success:
+        return
+    frame_height = frame.shape[0]
+    kare_no = 0
+    onceki_zaman = video_kare_zamani(cap, kare_no, fps)
+    onceki_kp = kisi_sec(cikarim(frame))
+    yield kare_no, onceki_zaman, frame_height, onceki_kp, True
+
+    while True:
+        adim = adim_secici.adim
+        atlanan_zamanlar = []
+        for _ in range(adim - 1):
+            if not cap.grab():
+                break
+            atlanan_zamanlar.append(video_kare_zamani(cap, kare_no + len(atlanan_zamanlar) + 1, fps))
+
+        success, frame = cap.read() if len(atlanan_zamanlar) == adim - 1 else (False, None)
+        if not success:
+            # Son anahtar kareden sonra model çalışmadı; son pozu koru
+            for i, zaman in enumerate(atlanan_zamanlar, 1):
+                yield kare_no + i, zaman, frame_height, onceki_kp, False
+            return
+
+        kare_no += adim
+        zaman = video_kare_zamani(cap, kare_no, fps)
+        kp = kisi_sec(cikarim(frame))
+
+        bilinen = {0: onceki_kp, adim: kp}
+        if (atlanan_zamanlar and adim_secici.esik_gecildi(onceki_kp, kp)
+                and cap.set(cv2.CAP_PROP_POS_FRAMES, kare_no - adim + 1)):
+            # Eşik aralıkta geçildi; geçiş karesi ikiye bölerek modelle bulunur
+            ara_kareler = [cap.read()[1] for _ in atlanan_zamanlar]
+            # Anahtar kare zaten işlendi; konum bir sonraki kareye geçer
+            cap.grab()
+            bolunecek = [(0, adim)]
+            while bolunecek:
+                sol, sag = bolunecek.pop()
+                if sag - sol < 2 or not adim_secici.esik_gecildi(bilinen[sol], bilinen[sag]):
+                    continue
+                orta = (sol + sag) // 2
+                ara_frame = ara_kareler[orta - 1]
+                bilinen[orta] = kisi_sec(cikarim(ara_frame)) if ara_frame is not None else None
+                bolunecek += [(sol, orta), (orta, sag)]
+
+        # Model çalışmayan ara kareler en yakın iki çıkarım arasında zamana göre doğrusal
+        # enterpole edilir; iki uçta da kişi olmalı
+        sirali = sorted(bilinen)
+        zamanlar = [onceki_zaman] + atlanan_zamanlar + [zaman]
+        for i, ara_zaman in enumerate(atlanan_zamanlar, 1):
+            if i in bilinen:
+                yield kare_no - adim + i, ara_zaman, frame_height, bilinen[i], True
+                continue
+            sol = max(j for j in sirali if j < i)
+            sag = min(j for j in sirali if j > i)
+            sol_kp, sag_kp = bilinen[sol], bilinen[sag]
+            if sol_kp is None or sag_kp is None:
+                ara_kp = None
+            else:
+                aralik = zamanlar[sag] - zamanlar[sol]
+                oran = (ara_zaman - zamanlar[sol]) / aralik if aralik > 0 else (i - sol) / (sag - sol)
+                ara_kp = sol_kp + (sag_kp - sol_kp) * oran
+                ara_kp[:, 2] = np.minimum(sol_kp[:, 2], sag_kp[:, 2])
+            yield kare_no - adim + i, ara_zaman, frame_height, ara_kp, False
+
+        yield kare_no, zaman, frame_height, kp, True
+
+        adim_secici.guncelle(onceki_kp, kp, zaman - onceki_zaman, frame_height)
+        onceki_kp, onceki_zaman = kp, zaman
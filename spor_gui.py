@@ -3,267 +3,294 @@ import os
 import cv2
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel, 
                             QVBoxLayout, QHBoxLayout, QWidget, QFileDialog, 
-                            QComboBox, QMessageBox, QFrame, QSizePolicy)
+                            QComboBox, QMessageBox, QFrame, QSizePolicy, QCheckBox,
+                            QGridLayout, QInputDialog, QSlider)
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
 import numpy as np
-from ultralytics import YOLO
 import time
 import math
+import logging
+import threading
+from boru_hatti import BoruHatti, Duraklatma, video_kare_zamani
+from coklu_kaynak import KaynakHatti, OrtakCikarim, kaynak_coz
+from surec_hatti import SurecHatti
+from seyrek_cikarim import UyarlamaliAdim, seyrek_keypointler
+from egzersiz_motoru import BASLANGIC, GECERSIZ, GECTI, varsayilan_katalog
+from egzersiz_tanima import OTOMATIK, EgzersizTanici, seriden_tani
+from cevrimdisi_sayac import tekrarlari_say
+from kisi_takip import CokKisiAnalizi, tum_kisiler
+from kisi_kirpma import KisiKirpici
+from video_oynatici import VideoOynatici, iskelet_ciz
+from canli_grafik import CanliGrafik
+from hareket_gecmisi import HareketGecmisi, VARSAYILAN_KAPASITE
+from yumusatma import KeypointYumusatici, seriyi_yumusat
+from keypoint_onbellek import KayitliKeypointler, KeypointOnbellegi, VARSAYILAN_KLASOR, VARSAYILAN_BOYUT_MB
+import model_deposu
+from olcum import AsamaZamanlayici
+from olay_gunlugu import log, gunlugu_kur, halka, veritabanini_kapat
+from model_deposu import MODEL_YOLU, CIKARIM_AYARLARI
+from arka_uclar import ARKA_UCLAR, keypoint_duzenle
+
+# Desteklenen egzersiz modları (egzersizler.json'daki sırayla)
+MODLAR = varsayilan_katalog().adlar
+
+
+def mod_basligi(mod):
+    """Arayüzde gösterilecek egzersiz adı"""
+    if mod in varsayilan_katalog():
+        return varsayilan_katalog().tanim(mod).baslik
+    return "Otomatik" if mod == OTOMATIK else mod.capitalize()
 
 # SporHareketAnalizi sınıfı için
 class SporHareketAnalizi:
-    def __init__(self):
-        self.model = YOLO("yolov8n-pose.pt")
-        self.squat_sayaci = 0
-        self.sinav_sayaci = 0
-        self.kol_kaldirma_sayaci = 0
-        self.aktif_mod = ""  # Başlangıçta boş - kullanıcının seçmesi gerekir
-        
-        # Her hareket için ayrı durum takibi
-        self.squat_son_durum = "baslangic"
-        self.sinav_son_durum = "baslangic"
-        self.kol_son_durum = "baslangic"
-        
-        # Durum zamanları
-        self.squat_son_durum_zamani = time.time()
-        self.sinav_son_durum_zamani = time.time()
-        self.kol_son_durum_zamani = time.time()
-    
-    def hareket_analiz(self, keypoints, frame_height):
+    def __init__(self, model=None, katalog=None, gecmis_kapasitesi=VARSAYILAN_KAPASITE):
+        # Verilmezse süreç genelindeki paylaşılan model kullanılır.
+        # Model ilk kullanımda yüklenir; önbellekten oynatmada hiç yüklenmez
+        self._model = model
+        # Egzersizler egzersizler.json'dan derlenir; her birinin kendi sayacı ve durumu var
+        self.katalog = katalog or varsayilan_katalog()
+        self.sayaclar = {mod: 0 for mod in self.katalog.adlar}
+        self.aktif_mod = ""  # Egzersiz tanınana veya seçilene kadar boş
+        
+        # Mod elle seçilmediyse yapılan egzersiz son karelerden tanınır
+        self.otomatik = True
+        self.tanici = EgzersizTanici(self.katalog)
+        # Tanınan egzersizin durum makinesinin işlemeye başladığı kare (tanıma penceresinin başı)
+        self.tanima_karesi = None
+        
+        # Egzersiz başına durum (0 başlangıç, 1 giriş, 2 çıkış) ve duruma giriş zamanı
+        self.durumlar = np.zeros(len(self.katalog), dtype=np.intp)
+        self.durum_zamanlari = np.full(len(self.katalog), time.time())
+        # Duruma girilen kare (-1: henüz kare görülmedi) ve o durumdayken görülen
+        # en küçük / en büyük açı
+        self.durum_kareleri = np.full(len(self.katalog), -1, dtype=np.int64)
+        self.aci_araliklari = np.full((len(self.katalog), 2), np.nan)
+        
+        # Son analiz edilen kare; verilmezse çağrı sayısından ilerler
+        self.kare_no = -1
+        # Olay kayıtlarında analizcinin kime ve hangi kaynağa ait olduğu
+        self.kimlik = None
+        self.kaynak = None
+        
+        # Tamamlanan her tekrarın zaman bilgisi
+        self.tekrar_kayitlari = []
+        
+        # Son karelerin zaman, keypoint, güven ve açıları; bellek oturum boyunca sabit
+        self.gecmis = HareketGecmisi(len(self.katalog), gecmis_kapasitesi)
+        
+        # Geri sarınca yeniden oynatılan kareler olay kaydı üretmez
+        self.sessiz = False
+    
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = model_deposu.model_al()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    def mod_degistir(self, mod, zaman=None):
+        # Boş mod veya "otomatik" tanımayı açar; sayım mevcut modla sürer
+        if not mod or mod == OTOMATIK:
+            if not self.otomatik:
+                # Elle seçimden önceki tanıma sonucu geçerli değil
+                self.tanici.sifirla()
+                self.otomatik = True
+            return
+        self.otomatik = False
+        self.aktif_mod = mod
+        
+        # Mod değiştiğinde ilgili son durumu sıfırla
+        if mod in self.katalog:
+            e = self.katalog.indeks(mod)
+            self.durumlar[e] = BASLANGIC
+            self._durumu_baslat(e, time.time() if zaman is None else zaman, -1)
+    
+    def sayaci_sifirla(self, mod):
+        if mod in self.sayaclar:
+            self.sayaclar[mod] = 0
+    
+    def sifirla(self, zaman=None):
+        """Sayaçları, durumları ve tanımayı seçili moda dokunmadan başa alır"""
+        self.sayaclar = {mod: 0 for mod in self.katalog.adlar}
+        self.tekrar_kayitlari = []
+        self.durumlar[:] = BASLANGIC
+        self._durumu_baslat(slice(None), time.time() if zaman is None else zaman, -1)
+        self.kare_no = -1
+        self.gecmis.sifirla()
+        if self.otomatik:
+            self.aktif_mod = ""
+            self.tanima_karesi = None
+            self.tanici.sifirla()
+    
+    def ozet(self):
+        # Kişi başına rapor için sayaçlar ve tekrar zamanları
+        ozet = {f"{mod}_sayisi": sayi for mod, sayi in self.sayaclar.items()}
+        ozet["mod"] = self.aktif_mod
+        ozet["tekrarlar"] = list(self.tekrar_kayitlari)
+        return ozet
+    
+    def _durumu_baslat(self, e, zaman, kare_no, aci=np.nan):
+        self.durum_zamanlari[e] = zaman
+        self.durum_kareleri[e] = kare_no
+        self.aci_araliklari[e] = aci
+    
+    def hareket_analiz(self, keypoints, frame_height, zaman=None, ozellik=None, kare_no=None):
+        # Kare numarası olay kayıtları içindir; verilmezse her çağrı bir kare sayılır
+        self.kare_no = self.kare_no + 1 if kare_no is None else kare_no
+        
         # Keypoints yoksa erken dön
         if keypoints is None or len(keypoints) < 17:
+            self.gecmis.ekle(time.time() if zaman is None else zaman, self.kare_no)
             return ["Vücut tespiti başarısız", False]
         
-        # Eğer aktif mod seçilmemişse
-        if not self.aktif_mod:
-            return ["Lütfen önce bir egzersiz modu seçin!", False]
-        
-        aciklama = ""
-        hareket_tamamlandi = False
+        # Zaman verilmemişse (webcam) duvar saati kullanılır,
+        # video dosyalarında karenin kendi zaman damgası gelir
+        if zaman is None:
+            zaman = time.time()
         
-        if self.aktif_mod == "squat":
-            return self.squat_analiz(keypoints, frame_height)
-        elif self.aktif_mod == "sinav":
-            return self.sinav_analiz(keypoints, frame_height)
-        elif self.aktif_mod == "kol_kaldirma":
-            return self.kol_kaldirma_analiz(keypoints, frame_height)
+        kosullar = None
+        if self.otomatik:
+            try:
+                if ozellik is None:
+                    ozellik = self.katalog.ozellikleri_hesapla(keypoints)
+                kosullar = self.katalog.kosullari_degerlendir(ozellik, frame_height)
+                taninan = self.tanici.ekle(ozellik, kosullar["gecerli"].any(), frame_height, zaman,
+                                           self.kare_no)
+                if taninan is not None and taninan != self.aktif_mod:
+                    self.otomatik_gec(taninan, frame_height, zaman)
+            except Exception as hata:
+                return [f"Egzersiz tanıma hatası: {hata}", False]
+            if not self.aktif_mod:
+                self.gecmis.ekle(zaman, self.kare_no, keypoints, kosullar["aci"])
+                return ["Egzersiz tanınıyor, harekete başla...", False]
         
-        return [aciklama, hareket_tamamlandi]
+        if self.aktif_mod not in self.katalog:
+            return ["", False]
         
-    def squat_analiz(self, keypoints, frame_height):
+        e = self.katalog.indeks(self.aktif_mod)
+        tanim = self.katalog.tanimlar[e]
         try:
-            # Önemli noktaları al
-            # 11: sol kalça, 12: sağ kalça, 13: sol diz, 14: sağ diz, 15: sol ayak, 16: sağ ayak
-            # 5: sol omuz, 6: sağ omuz (vücut pozisyonunu kontrol etmek için)
-            sol_kalca = keypoints[11][:2]
-            sag_kalca = keypoints[12][:2]
-            sol_diz = keypoints[13][:2]
-            sag_diz = keypoints[14][:2]
-            sol_ayak = keypoints[15][:2]
-            sag_ayak = keypoints[16][:2]
-            sol_omuz = keypoints[5][:2]
-            sag_omuz = keypoints[6][:2]
-            
-            # Güven değerleri kontrolü
-            if (keypoints[11][2] < 0.5 or keypoints[12][2] < 0.5 or
-                keypoints[13][2] < 0.5 or keypoints[14][2] < 0.5 or
-                keypoints[15][2] < 0.5 or keypoints[16][2] < 0.5 or
-                keypoints[5][2] < 0.5 or keypoints[6][2] < 0.5):
-                return ["Vücut noktaları net değil, pozisyonunu düzelt", False]
-            
-            # Orta noktaları hesapla
-            kalca_orta = [(sol_kalca[0] + sag_kalca[0]) / 2, (sol_kalca[1] + sag_kalca[1]) / 2]
-            diz_orta = [(sol_diz[0] + sag_diz[0]) / 2, (sol_diz[1] + sag_diz[1]) / 2]
-            ayak_orta = [(sol_ayak[0] + sag_ayak[0]) / 2, (sol_ayak[1] + sag_ayak[1]) / 2]
-            omuz_orta = [(sol_omuz[0] + sag_omuz[0]) / 2, (sol_omuz[1] + sag_omuz[1]) / 2]
-            
-            # Kalça-diz-ayak açısını hesapla
-            kalca_diz_ayak_acisi = self.aci_hesapla(kalca_orta, diz_orta, ayak_orta)
-            
-            # Debug için log
-            print(f"[Squat] Açı: {kalca_diz_ayak_acisi:.1f}°")
-            
-            # Dikey açıyı hesapla (kalça-diz-y ekseni)
-            dikey_aci = self.dikey_aci_hesapla(kalca_orta, diz_orta)
-            
-            # Vücut dik duruyor mu kontrol et (şınav pozisyonu olmamalı)
-            omuz_kalca_aci = self.dikey_aci_hesapla(omuz_orta, kalca_orta)
-            vucut_dik_mi = omuz_kalca_aci > 45  # Omuz-kalça açısı dikeye yakın olmalı (şınavda yatay olur)
-            
-            # Squat için geçersiz pozisyon kontrolü - eller yerde ise şınav yapıyor olabilir
-            eller_yerde_mi = (keypoints[9][1] > frame_height * 0.7 or keypoints[10][1] > frame_height * 0.7)
-            
-            # Şınav pozisyonunda ise squat sayma
-            if eller_yerde_mi and not vucut_dik_mi:
-                return ["Bu şınav pozisyonu, squat için ayakta durun", False]
-            
-            # Squat için eşik değerleri
-            squat_acisi_esik = 120  # 120 dereceden küçük açılar squat pozisyonu
-            dik_durum_esik = 160  # 160 dereceden büyük açılar dik duruş
+            # Tüm açılar ve güven değerleri kare başına bir kez hesaplanır
+            # (çoklu kişide tüm kişiler için birlikte hesaplanıp buraya verilir)
+            if kosullar is None:
+                if ozellik is None:
+                    ozellik = self.katalog.ozellikleri_hesapla(keypoints)
+                kosullar = self.katalog.kosullari_degerlendir(ozellik, frame_height)
+            olay, durum, aci, sayildi = self._adim(e, kosullar, zaman, self.kare_no)
+            self.gecmis.ekle(zaman, self.kare_no, keypoints, kosullar["aci"], e, self.durumlar[e])
             
-            # Durum takibi
-            suanki_zaman = time.time()
+            # Kare başına açı yalnızca örnekleme açıksa kaydedilir
+            if olay != GECERSIZ and not self.sessiz and log.isEnabledFor(logging.DEBUG):
+                log.debug("[%s] Açı: %.1f° [Durum: %s]", tanim.baslik, aci, tanim.durumlar[durum],
+                          extra={"kare": True, "mod": tanim.ad, "aci": float(aci),
+                                 "durum": tanim.durumlar[durum]})
             
-            # Dik durumdan squat pozisyonuna geçiş
-            if self.squat_son_durum == "baslangic" or self.squat_son_durum == "dik":
-                if kalca_diz_ayak_acisi < squat_acisi_esik:
-                    self.squat_son_durum = "squat"
-                    self.squat_son_durum_zamani = suanki_zaman
-                    return ["Squat pozisyonunda, biraz bekle", False]
-                else:
-                    return ["Dik dur ve squat yapmak için çömel", False]
-            
-            # Squat pozisyonundan dik duruma geçiş
-            elif self.squat_son_durum == "squat":
-                # Squat pozisyonunda en az 0.5 saniye kalmak gerekiyor
-                if suanki_zaman - self.squat_son_durum_zamani > 0.5:
-                    if kalca_diz_ayak_acisi > dik_durum_esik:
-                        self.squat_son_durum = "dik"
-                        self.squat_son_durum_zamani = suanki_zaman
-                        self.squat_sayaci += 1
-                        return [f"Squat tamamlandı! Toplam: {self.squat_sayaci}", True]
-                    else:
-                        return ["Squat pozisyonundan dik duruma geç", False]
-                else:
-                    return ["Squat pozisyonunda tut...", False]
-            
-            return ["Squat için hazır", False]
+            mesaj = self.katalog.olay_mesaji(e, olay, durum, aci, self.sayaclar[tanim.ad])
+            return [mesaj, sayildi]
         
-        except Exception as e:
-            return [f"Squat analiz hatası: {str(e)}", False]
+        except Exception as hata:
+            return [tanim.mesaj("hata", hata=str(hata)), False]
     
-    def sinav_analiz(self, keypoints, frame_height):
-        try:
-            # Gerekli noktaları al
-            sol_omuz = keypoints[5][:2]
-            sag_omuz = keypoints[6][:2]
-            sol_dirsek = keypoints[7][:2]
-            sag_dirsek = keypoints[8][:2]
-            sol_bilek = keypoints[9][:2]
-            sag_bilek = keypoints[10][:2]
-            
-            # Güven değerleri kontrolü (indeks 2 güven değerini içerir)
-            if (keypoints[5][2] < 0.5 or keypoints[6][2] < 0.5 or 
-                keypoints[7][2] < 0.5 or keypoints[8][2] < 0.5 or 
-                keypoints[9][2] < 0.5 or keypoints[10][2] < 0.5):
-                return ["Vücut noktaları net değil, pozisyonunu düzelt", False]
-
-            # Açılar hesapla
-            sol_aci = self.aci_hesapla(sol_omuz, sol_dirsek, sol_bilek)
-            sag_aci = self.aci_hesapla(sag_omuz, sag_dirsek, sag_bilek)
-            omuz_dirsek_bilek_acisi = (sol_aci + sag_aci) / 2
-
-            # Debug için detaylı log
-            print(f"[ŞINAV DEBUG] Açılar → Sol: {sol_aci:.1f}, Sağ: {sag_aci:.1f}, Ortalama: {omuz_dirsek_bilek_acisi:.1f}")
-            print(f"[ŞINAV DEBUG] Sol bilek Y: {sol_bilek[1]:.1f}, Sağ bilek Y: {sag_bilek[1]:.1f}, Frame Yüksekliği: {frame_height}")
-            
-            # Eller yere yakın mı? (daha esnek eşik)
-            eller_yerde_mi = (sol_bilek[1] > frame_height * 0.6 and sag_bilek[1] > frame_height * 0.6)
-            
-            # Eşikler - biraz daha geniş aralık
-            asagi_esik = 130  # 130 derece ve altında aşağıda
-            yukari_esik = 130  # 130 derece ve üstünde yukarıda (eşik değeri daha da düşürüldü)
-            
-            # Hangi durumun kontrol edileceğini debug çıktısında göster
-            print(f"[ŞINAV DEBUG] Eller yerde mi?: {eller_yerde_mi} [Durum: {self.sinav_son_durum}]")
-            
-            # Şu anki zamanı al
-            suanki_zaman = time.time()
-            durum_suresi = suanki_zaman - self.sinav_son_durum_zamani
-            print(f"[ŞINAV DEBUG] Mevcut durumda geçen süre: {durum_suresi:.1f} saniye")
-
-            # Başlangıç veya yukarıdaysa
-            if self.sinav_son_durum == "baslangic" or self.sinav_son_durum == "yukari":
-                if eller_yerde_mi and omuz_dirsek_bilek_acisi < asagi_esik:
-                    self.sinav_son_durum = "asagi"
-                    self.sinav_son_durum_zamani = suanki_zaman
-                    print(f"[ŞINAV DEBUG] DURUM DEĞİŞTİ: yukari -> asagi (Açı: {omuz_dirsek_bilek_acisi:.1f})")
-                    return [f"Aşağı pozisyon algılandı (Açı: {int(omuz_dirsek_bilek_acisi)}°), yukarı çık", False]
-                else:
-                    return [f"Aşağı inmelisin | Açın: {int(omuz_dirsek_bilek_acisi)}° [Durum: {self.sinav_son_durum}]", False]
-
-            # Aşağıdaysa
-            elif self.sinav_son_durum == "asagi":
-                # En az bir saniye aşağıda kalma kontrolü - yanlış algılamaları önlemek için
-                if durum_suresi < 0.5:
-                    return [f"Şınav pozisyonunda tut... | Açı: {int(omuz_dirsek_bilek_acisi)}°", False]
-                
-                if omuz_dirsek_bilek_acisi > yukari_esik:
-                    self.sinav_sayaci += 1
-                    self.sinav_son_durum = "yukari"
-                    self.sinav_son_durum_zamani = suanki_zaman
-                    print(f"[ŞINAV DEBUG] DURUM DEĞİŞTİ: asagi -> yukari (Açı: {omuz_dirsek_bilek_acisi:.1f})")
-                    return [f"Şınav sayıldı! Toplam: {self.sinav_sayaci}", True]
-                else:
-                    return [f"Yukarı çıkmalısın | Açın: {int(omuz_dirsek_bilek_acisi)}° [Durum: {self.sinav_son_durum}]", False]
-
-            return [f"Şınav hareketi hazır - pozisyon al [Durum: {self.sinav_son_durum}]", False]
-
-        except Exception as e:
-            return [f"Hata oluştu: {str(e)}", False]
+    def _adim(self, e, kosullar, zaman, kare_no):
+        """e. egzersizin durum makinesini bir kare ilerletir; (olay, önceki durum, açı, sayıldı mı)"""
+        tanim = self.katalog.tanimlar[e]
+        olaylar, hedefler, sayanlar = self.katalog.adim(
+            self.durumlar, self.durum_zamanlari, kosullar, zaman, self.katalog.yalniz(e))
+        
+        olay = olaylar[e]
+        durum = self.durumlar[e]
+        aci = kosullar["aci"][e]
+        sayildi = bool(olay == GECTI and sayanlar[e])
+        
+        # Mod seçilirken karenin zamanı bilinmiyor olabilir (video saati yerine duvar
+        # saati); başlangıç durumu ilk karesiyle başlar. Bekleme şartı yalnızca giriş
+        # durumunda olduğundan sayımı etkilemez
+        if self.durum_kareleri[e] < 0:
+            self.durum_kareleri[e] = kare_no
+            if durum == BASLANGIC:
+                self.durum_zamanlari[e] = zaman
+        
+        # Durumdaki açı aralığı; ölçülemeyen (NaN) açı aralığı bozmaz
+        aralik = self.aci_araliklari[e]
+        if aci == aci:
+            if not aci >= aralik[0]:
+                aralik[0] = aci
+            if not aci <= aralik[1]:
+                aralik[1] = aci
+        
+        if olay == GECTI:
+            yeni = hedefler[e]
+            bolum = self._durum_bolumu(e, zaman, kare_no)
+            if sayildi:
+                self.sayaclar[tanim.ad] += 1
+                self.tekrar_kaydet(tanim.ad, float(self.durum_zamanlari[e]), zaman, bolum)
+            self.durum_gecisi_kaydet(tanim.ad, tanim.durumlar[durum], tanim.durumlar[yeni], aci, zaman, bolum)
+            self.durumlar[e] = yeni
+            self._durumu_baslat(e, zaman, kare_no, aci)
+        return olay, durum, aci, sayildi
     
-    def kol_kaldirma_analiz(self, keypoints, frame_height):
-        try:
-            # Önemli noktaları al
-            # 5: sol omuz, 6: sağ omuz, 7: sol dirsek, 8: sağ dirsek, 9: sol bilek, 10: sağ bilek
-            sol_omuz = keypoints[5][:2]
-            sag_omuz = keypoints[6][:2]
-            sol_dirsek = keypoints[7][:2]
-            sag_dirsek = keypoints[8][:2]
-            sol_bilek = keypoints[9][:2]
-            sag_bilek = keypoints[10][:2]
-            
-            # Güven değerleri kontrolü
-            if (keypoints[5][2] < 0.5 or keypoints[6][2] < 0.5 or
-                keypoints[7][2] < 0.5 or keypoints[8][2] < 0.5 or
-                keypoints[9][2] < 0.5 or keypoints[10][2] < 0.5):
-                return ["Vücut noktaları net değil, pozisyonunu düzelt", False]
-            
-            # Dirsek-omuz-kalça açılarını hesapla
-            sol_acı = self.aci_hesapla(sol_bilek, sol_dirsek, sol_omuz)
-            sag_acı = self.aci_hesapla(sag_bilek, sag_dirsek, sag_omuz)
-            
-            # Ortalama açı
-            avg_aci = (sol_acı + sag_acı) / 2
-            
-            # Debug için log
-            print(f"[Kol] Açı: {avg_aci:.1f}°")
-            
-            # Kol kaldırma için eşik değerleri
-            asagi_esik = 80   # Kollar aşağıda
-            yukari_esik = 160  # Kollar yukarıda
-            
-            # Durum takibi
-            suanki_zaman = time.time()
-            
-            # Aşağıdan yukarı geçiş
-            if self.kol_son_durum == "baslangic" or self.kol_son_durum == "asagi":
-                if avg_aci > yukari_esik:
-                    self.kol_son_durum = "yukari"
-                    self.kol_son_durum_zamani = suanki_zaman
-                    return ["Yukarı pozisyonda, biraz bekle", False]
-                else:
-                    return ["Kolları yukarı kaldır", False]
-            
-            # Yukarıdan aşağı geçiş
-            elif self.kol_son_durum == "yukari":
-                # Yukarı pozisyonunda en az 0.2 saniye kalmak gerekiyor
-                if suanki_zaman - self.kol_son_durum_zamani > 0.2:
-                    if avg_aci < asagi_esik:
-                        self.kol_son_durum = "asagi"
-                        self.kol_son_durum_zamani = suanki_zaman
-                        self.kol_kaldirma_sayaci += 1
-                        return [f"Kol kaldırma tamamlandı! Toplam: {self.kol_kaldirma_sayaci}", True]
-                    else:
-                        return ["Kolları aşağı indir", False]
-                else:
-                    return ["Yukarı pozisyonda tut...", False]
-            
-            return ["Kol kaldırma için hazır", False]
+    def _durum_bolumu(self, e, zaman, kare_no):
+        # Biten durumun başlangıcı, süresi, kare aralığı ve içindeki açı aralığı
+        baslangic = float(self.durum_zamanlari[e])
+        en_kucuk, en_buyuk = self.aci_araliklari[e]
+        return {
+            "baslangic": baslangic,
+            "sure": zaman - baslangic,
+            "baslangic_kare": int(self.durum_kareleri[e]),
+            "bitis_kare": int(kare_no),
+            "en_kucuk_aci": float(en_kucuk),
+            "en_buyuk_aci": float(en_buyuk),
+        }
+    
+    def otomatik_gec(self, mod, frame_height, zaman):
+        """Tanınan egzersize geçer ve penceredeki kareleri onun durum makinesinden geçirir.
         
-        except Exception as e:
-            return [f"Kol kaldırma analiz hatası: {str(e)}", False]
+        Tanıma birkaç saniyelik hareket ister; o sürede yapılan tekrarlar da sayılır.
+        """
+        if not self.sessiz:
+            log.info("Egzersiz tanındı: %s", mod,
+                     extra={"olay": "tanima", "mod": mod, "onceki": self.aktif_mod, "zaman_sn": zaman})
+        ozellik, zamanlar, kareler = self.tanici.gecis_kareleri(zaman)
+        
+        self.aktif_mod = mod
+        e = self.katalog.indeks(mod)
+        self.durumlar[e] = BASLANGIC
+        self.tanima_karesi = int(kareler[0]) if len(zamanlar) else self.kare_no
+        if len(zamanlar):
+            self._durumu_baslat(e, zamanlar[0], kareler[0])
+            kosullar = self.katalog.kosullari_degerlendir(ozellik, frame_height)
+            for i, kare_zamani in enumerate(zamanlar):
+                self._adim(e, {ad: deger[i] for ad, deger in kosullar.items()}, float(kare_zamani),
+                           kareler[i])
+        else:
+            self._durumu_baslat(e, zaman, self.kare_no)
+    
+    def tekrar_kaydet(self, mod, baslangic, bitis, bolum=None):
+        # Tekrarın başladığı ve bittiği zamanı; varsa kare aralığını ve açı aralığını sakla
+        tekrar = {
+            "mod": mod,
+            "baslangic": baslangic,
+            "bitis": bitis,
+            "sure": bitis - baslangic
+        }
+        if bolum is not None:
+            tekrar.update(bolum)
+        self.tekrar_kayitlari.append(tekrar)
+        if not self.sessiz:
+            log.info("%s tekrarı sayıldı: %.2f -> %.2f sn", mod, baslangic, bitis,
+                     extra=dict(tekrar, olay="tekrar", sayi=self.sayaclar.get(mod, 0),
+                                kisi=self.kimlik, kaynak=self.kaynak))
+    
+    def durum_gecisi_kaydet(self, mod, onceki, yeni, aci, zaman, bolum=None):
+        # Varsayılan olarak kaydedilen tek analiz olayı durum geçişleridir
+        if not self.sessiz:
+            log.info("%s durumu %s -> %s (açı %.1f°)", mod, onceki, yeni, aci,
+                     extra=dict(bolum or {}, olay="gecis", mod=mod, onceki=onceki, yeni=yeni,
+                                aci=float(aci), zaman_sn=zaman, kisi=self.kimlik, kaynak=self.kaynak))
     
     def hareket_rehberlik(self, frame, keypoints, analiz_sonucu):
         # Rehberlik ve açıklamaları ekrandan kaldırıyoruz
@@ -307,63 +334,262 @@ class SporHareketAnalizi:
         
         return angle_deg
 
+def ilk_kisi_keypoints(results):
+    """Model çıktısındaki ilk kişinin (17, 3) keypoint dizisini döndürür"""
+    keypoints_data = results[0].keypoints.data
+    if len(keypoints_data) == 0:
+        return None
+    return keypoint_duzenle(keypoints_data[0].cpu().numpy())
+
+
+def gosterim_icin_olcekle(frame, boyut):
+    """Kareyi en-boy oranını koruyarak (genişlik, yükseklik) alanına sığdırır"""
+    if boyut is None:
+        return frame
+    h, w = frame.shape[:2]
+    oran = min(boyut[0] / w, boyut[1] / h)
+    yeni_w, yeni_h = max(1, int(w * oran)), max(1, int(h * oran))
+    if (yeni_w, yeni_h) == (w, h):
+        return frame
+    # INTER_AREA 1080p'de ~14 ms sürüyor; gösterim için doğrusal yeterli (~0.7 ms)
+    return cv2.resize(frame, (yeni_w, yeni_h), interpolation=cv2.INTER_LINEAR)
+
+
+def bgr_qimage(frame):
+    """BGR numpy dizisini renk dönüşümü ve kopya olmadan saran QImage döndürür.
+    
+    QImage veriyi sahiplenmez; dizi, görüntü kullanıldığı sürece tutulmalıdır.
+    """
+    frame = np.ascontiguousarray(frame)
+    h, w = frame.shape[:2]
+    return QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+
+
 class VideoThread(QThread):
-    change_pixmap_signal = pyqtSignal(np.ndarray, dict)
+    # Yeni kare hazır; arayüz son_kareyi_al ile yalnızca en yenisini alır
+    yeni_kare_signal = pyqtSignal()
     finished_signal = pyqtSignal(dict)
 
-    def __init__(self, mode="webcam", video_path=None):
+    def __init__(self, mode="webcam", video_path=None, parti_boyutu=1, cok_kisi=False, kirp=False,
+                 yumusat=False, zamanlayici=None, kamera_no=0, ortak=None, onbellek=None, surecler=False,
+                 ayri_model=False):
         super().__init__()
         self.mode = mode
         self.video_path = video_path
+        self.kamera_no = kamera_no
+        self.parti_boyutu = parti_boyutu
+        # Verilirse çıkarım diğer kaynaklarla ortak partilerde yapılır, thread yalnızca okur ve analiz eder
+        self.ortak = ortak
+        # Izgaradaki kaynaklar paylaşılan modeli aynı anda çağıramaz; her thread kendi modelini yükler
+        self.ayri_model = ayri_model and ortak is None
+        # Kare çözme ve çıkarım ayrı süreçlerde; thread yalnızca keypoint'leri analiz edip kareyi sunar
+        self.surecler = surecler and ortak is None
+        self.ad = f"Kamera {kamera_no}" if mode == "webcam" else os.path.basename(video_path or "")
+        # Butona basıldığı an; ilk işlenmiş kareye kadar geçen süre ölçülür
+        self.olusturma_zamani = time.perf_counter()
+        # Aşama süreleri; arayüz açıp kapatabilir
+        self.zamanlayici = zamanlayici or AsamaZamanlayici(aktif=False)
+        
+        # Arayüzün gösterim alanı (genişlik, yükseklik); kare bu boyuta küçültülüp verilir
+        self.gosterim_boyutu = None
+        # Henüz boyanmamış en son kare; yenisi gelince eskisi atılır
+        self._kare_kilidi = threading.Lock()
+        self._son_kare = None
+        self.atlanan_gosterim = 0
         self.running = True
-        self.paused = False
-        self.stats = {
-            "squat_sayisi": 0,
-            "sinav_sayisi": 0,
-            "kol_kaldirma_sayisi": 0,
-            "aktif_mod": "",  # Başlangıçta boş mod
-            "aciklamalar": "Lütfen bir egzersiz türü seçin"
-        }
+        # Duraklatılan okuma/oynatma döngüsü koşul değişkeninde uyur
+        self.duraklatma = Duraklatma()
+        self.stats = {f"{mod}_sayisi": 0 for mod in MODLAR}
+        self.stats.update({
+            "aktif_mod": "",  # Egzersiz tanınana kadar boş
+            "otomatik": True,
+            "aciklamalar": "Egzersiz tanınıyor, harekete başla..."
+        })
         
         # SporHareketAnalizi sınıfını başlat
         self.analiz = SporHareketAnalizi()
+        self.analiz.kaynak = self.ad
+        # Açı grafiğinin okuduğu geçmiş; çoklu kişide ana sayaçtaki kişininki
+        self.grafik_gecmisi = self.analiz.gecmis
         
-    def change_mode(self, mod):
-        self.stats["aktif_mod"] = mod
-        self.analiz.aktif_mod = mod
+        # Keypoint titremesi analizden önce süzülür; çoklu kişide her kimlik ayrı izdir
+        self.yumusatici = KeypointYumusatici() if yumusat else None
         
-        # Mod değiştiğinde ilgili son durumu sıfırla
-        if mod == "squat":
-            self.analiz.squat_son_durum = "baslangic"
-            self.analiz.squat_son_durum_zamani = time.time()
-        elif mod == "sinav":
-            self.analiz.sinav_son_durum = "baslangic"
-            self.analiz.sinav_son_durum_zamani = time.time()
-        elif mod == "kol_kaldirma":
-            self.analiz.kol_son_durum = "baslangic"
-            self.analiz.kol_son_durum_zamani = time.time()
+        # Çoklu kişide her takip kimliği kendi sayacını ve durum makinesini alır
+        self.coklu = None
+        if cok_kisi:
+            self.coklu = CokKisiAnalizi(yumusatici=self.yumusatici, kaynak=self.ad)
+            self.grafik_gecmisi = self.coklu.gecmis
+        
+        # Kırpma tek kişiyi izler; çoklu kişide ve ortak partide tüm kare taranmalı
+        self.kirp = kirp and not cok_kisi and ortak is None
+        self.kirpici = None
+        
+        # Tek kişilik video dosyası kare numarasıyla oynatılır: ileri/geri arama,
+        # kare kare adım ve daha önce çıkarılmış keypoint'lerin yeniden kullanımı
+        self.aranabilir = (mode == "video" and not cok_kisi and ortak is None and not self.surecler
+                           and not self.ayri_model)
+        self.onbellek = onbellek
+        self.oynatici = None
+        self.gosterilen = -1
+        self._hedef = None
+        self._hedef_kilidi = threading.Lock()
+        
+    def change_mode(self, mod):
+        self.analiz.mod_degistir(mod)
+        if self.coklu is not None:
+            self.coklu.mod_degistir(mod)
+        self.modu_yaz(self.analiz)
             
-        print(f"Mod değiştirildi: {mod}")
+        log.info("Mod değiştirildi: %s", mod, extra={"olay": "mod", "mod": mod})
+    
+    def modu_yaz(self, analiz):
+        # Otomatik modda egzersiz analizcide değişebilir
+        self.stats["aktif_mod"] = analiz.aktif_mod
+        self.stats["otomatik"] = analiz.otomatik
         
     def reset_counter(self):
-        if self.stats["aktif_mod"] == "squat":
-            self.analiz.squat_sayaci = 0
-        elif self.stats["aktif_mod"] == "sinav":
-            self.analiz.sinav_sayaci = 0
-        elif self.stats["aktif_mod"] == "kol_kaldirma":
-            self.analiz.kol_kaldirma_sayaci = 0
+        self.analiz.sayaci_sifirla(self.stats["aktif_mod"])
+        if self.coklu is not None:
+            self.coklu.sayaci_sifirla(self.stats["aktif_mod"])
             
+    def coklu_analiz(self, kutular, keypoints, annotated_frame, frame_height, zaman, kare_no=None):
+        if zaman is None:
+            zaman = time.time()
+        kimlikler = self.coklu.guncelle(kutular, keypoints, frame_height, zaman, kare_no)
+        
+        # Kimlikleri kutuların üstüne yaz
+        for kutu, kimlik in zip(kutular, kimlikler):
+            cv2.putText(annotated_frame, f"#{kimlik}", (int(kutu[0]), max(int(kutu[1]) - 8, 15)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        
+        # Otomatik modda her kişinin egzersizi ayrı tanınır
+        self.stats["kisiler"] = self.coklu.kisi_sayilari()
+        
+        # Ana sayaçlar en eski (en küçük kimlikli) görünür kişiyi gösterir
+        if kimlikler:
+            ilk = min(kimlikler)
+            for mod, sayi in self.coklu.kisi_sayaclari(ilk).items():
+                self.stats[f"{mod}_sayisi"] = sayi
+            self.stats["aktif_mod"] = self.coklu.kisi_modu(ilk)
+            self.stats["otomatik"] = self.coklu.otomatik
+            self.stats["aciklamalar"] = f"Kişi #{ilk}: {self.coklu.mesaj(ilk)}"
+    
+    def sayaclari_yaz(self, analiz):
+        for mod, sayi in analiz.sayaclar.items():
+            self.stats[f"{mod}_sayisi"] = sayi
+    
+    def tek_kisi_analiz(self, keypoints, annotated_frame, frame_height, zaman, kare_no=None):
+        if keypoints is None:
+            return
+        if self.yumusatici is not None:
+            with self.zamanlayici.olc("yumusatma"):
+                keypoints = self.yumusatici.tek(keypoints, zaman if zaman is not None else time.time(),
+                                                frame_height)
+        # Hareket analizi yap
+        with self.zamanlayici.olc("analiz"):
+            analiz_sonucu = self.analiz.hareket_analiz(keypoints, frame_height, zaman, kare_no=kare_no)
+        
+        # Rehberlik bilgisi ekle
+        self.analiz.hareket_rehberlik(annotated_frame, keypoints, analiz_sonucu)
+        
+        # İstatistikleri güncelle
+        self.sayaclari_yaz(self.analiz)
+        self.modu_yaz(self.analiz)
+        self.stats["aciklamalar"] = analiz_sonucu[0]
+    
+    def kareyi_tamamla(self, annotated_frame):
+        # Kırmızıyla işaretlenen ekran bilgilerini kaldırıyoruz
+        # Mod bilgisi, sayaç, FPS ve ilerleme bilgileri artık görüntülenmeyecek
+        
+        # Duraklatma bilgisi
+        if self.paused:
+            cv2.putText(annotated_frame, "DURAKLATILDI", (annotated_frame.shape[1] - 200, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        
+        if self.kirpici is not None:
+            self.stats["kirpma"] = self.kirpici.istatistik()
+        
+        if "ilk_kare_ms" not in self.stats:
+            self.stats["ilk_kare_ms"] = (time.perf_counter() - self.olusturma_zamani) * 1000
+            log.info("İlk işlenmiş kare: %.0f ms", self.stats["ilk_kare_ms"])
+        
+        # İşlenmiş kareyi arayüze sun
+        self.kareyi_sun(annotated_frame)
+    
+    def kareyi_sun(self, annotated_frame):
+        """Kareyi gösterim boyutuna getirip arayüzün alacağı tek yuvaya koyar"""
+        with self.zamanlayici.olc("olcekleme"):
+            goruntu = gosterim_icin_olcekle(annotated_frame, self.gosterim_boyutu)
+            if self.surecler and goruntu is annotated_frame:
+                # Süreç hattında kare halka yuvasında; yuva geri verilince üzerine yazılır
+                goruntu = goruntu.copy()
+            qt_image = bgr_qimage(goruntu)
+        
+        with self._kare_kilidi:
+            bekleyen_var = self._son_kare is not None
+            if bekleyen_var:
+                # Arayüz önceki kareyi henüz boyamadı, o kare atlanır
+                self.atlanan_gosterim += 1
+            self.stats["atlanan_gosterim"] = self.atlanan_gosterim
+            # Dizi QImage'in verisidir, birlikte tutulur
+            self._son_kare = (qt_image, goruntu, dict(self.stats))
+        
+        # Bekleyen sinyal varsa arayüz zaten en yeni kareyi alacak
+        if not bekleyen_var:
+            self.yeni_kare_signal.emit()
+    
+    def son_kareyi_al(self):
+        """Boyanmamış en son (QImage, dizi, istatistik) üçlüsünü alır; yoksa None"""
+        with self._kare_kilidi:
+            kare, self._son_kare = self._son_kare, None
+        return kare
+    
+    @property
+    def paused(self):
+        return self.duraklatma.duraklatildi
+    
+    @paused.setter
+    def paused(self, duraklat):
+        self.duraklatma.ayarla(duraklat)
+    
     def toggle_pause(self):
         self.paused = not self.paused
+    
+    def git(self, no):
+        """Oynatmayı no. kareye taşır; duraklatılmışsa o kare gösterilip beklenir"""
+        with self._hedef_kilidi:
+            self._hedef = no
+        self.duraklatma.uyandir()
+    
+    def adim_at(self, fark):
+        """Duraklatıp fark kadar kare ileri veya geri gider"""
+        self.paused = True
+        with self._hedef_kilidi:
+            no = self._hedef if self._hedef is not None else self.gosterilen
+        self.git(max(0, no + fark))
+    
+    def _hedefi_al(self):
+        with self._hedef_kilidi:
+            hedef, self._hedef = self._hedef, None
+        return hedef
         
     def stop(self):
         self.running = False
+        self.duraklatma.uyandir()
         self.wait()
     
     def run(self):
+        if self.aranabilir:
+            self.oynat()
+            return
+        if self.surecler:
+            self.surecle_calistir()
+            return
+        
         if self.mode == "webcam":
             # Webcam'i aç
-            cap = cv2.VideoCapture(0)
+            cap = cv2.VideoCapture(self.kamera_no)
         else:
             # Video dosyasını aç
             cap = cv2.VideoCapture(self.video_path)
@@ -375,76 +601,305 @@ class VideoThread(QThread):
         # FPS hesaplama için değişkenler
         prev_time = 0
         total_frames = 0
+        video_fps = 0
         
         if self.mode == "video":
             # Video dosyasının toplam kare sayısını al
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            video_fps = cap.get(cv2.CAP_PROP_FPS)
         
-        while self.running:
-            if not self.paused:
-                # Bir kare al
-                success, frame = cap.read()
-                if not success:
-                    if self.mode == "video":
-                        # Video dosyası sonuna gelindi
-                        self.stats["aciklamalar"] = "Video tamamlandı."
-                        self.finished_signal.emit(self.stats)
-                    else:
-                        self.stats["aciklamalar"] = "Kamera hata verdi."
-                        self.finished_signal.emit(self.stats)
-                    break
-                
-                # FPS hesapla
-                current_time = time.time()
-                fps = 1 / (current_time - prev_time) if (current_time - prev_time) > 0 else 0
-                prev_time = current_time
-                
-                # Modeli kullanarak pozu tespit et
-                results = self.analiz.model(frame)
-                
-                # İşlenmiş kareyi al
+        zaman_hesapla = (lambda c, no: video_kare_zamani(c, no, video_fps)) if self.mode == "video" else None
+        if self.ortak is not None:
+            # Model ortak çıkarım thread'inde; burada yalnızca okuma thread'i açılır
+            hat = KaynakHatti(self.ortak, self.ad, cap, canli=self.mode == "webcam",
+                              zaman_hesapla=zaman_hesapla, duraklatma=self.duraklatma,
+                              zamanlayici=self.zamanlayici)
+        else:
+            # Model ilk kez burada yüklenir
+            if self.ayri_model:
+                self.analiz.model = model_deposu.ayri_model_yukle()
+            if self.kirp:
+                self.kirpici = KisiKirpici(self.analiz.model)
+            
+            # ultralytics'in kare başına konsol çıktısı kapatılır
+            model = self.kirpici or self.analiz.model
+            
+            def cikarim(frame):
+                return model(frame, verbose=False, **CIKARIM_AYARLARI)
+            
+            # Okuma ve çıkarım ayrı thread'lerde; webcam'de bayat kareler atılır,
+            # video dosyasında hiçbir kare atlanmaz
+            hat = BoruHatti(
+                cap,
+                cikarim,
+                canli=self.mode == "webcam",
+                zaman_hesapla=zaman_hesapla,
+                duraklatma=self.duraklatma,
+                parti_boyutu=self.parti_boyutu,
+                zamanlayici=self.zamanlayici
+            )
+        hat.baslat()
+        
+        for kare in hat.sonuclar(lambda: self.running):
+            frame = kare.kare
+            results = kare.results
+            
+            # FPS hesapla
+            current_time = time.time()
+            self.stats["fps"] = 1 / (current_time - prev_time) if (current_time - prev_time) > 0 else 0
+            prev_time = current_time
+            
+            # İşlenmiş kareyi al
+            with self.zamanlayici.olc("cizim"):
                 annotated_frame = results[0].plot()
-                
-                # Keypoints verilerini al
-                try:
-                    keypoints_data = results[0].keypoints.data
-                    if len(keypoints_data) > 0:
-                        keypoints = keypoints_data[0].cpu().numpy()
-                        
-                        # Hareket analizi yap
-                        analiz_sonucu = self.analiz.hareket_analiz(keypoints, frame.shape[0])
-                        
-                        # Rehberlik bilgisi ekle
-                        self.analiz.hareket_rehberlik(annotated_frame, keypoints, analiz_sonucu)
-                        
-                        # İstatistikleri güncelle
-                        self.stats["squat_sayisi"] = self.analiz.squat_sayaci
-                        self.stats["sinav_sayisi"] = self.analiz.sinav_sayaci
-                        self.stats["kol_kaldirma_sayisi"] = self.analiz.kol_kaldirma_sayaci
-                        self.stats["aciklamalar"] = analiz_sonucu[0]
-                        
-                except Exception as e:
-                    print(f"Analiz hatası: {e}")
-                
-                # Kırmızıyla işaretlenen ekran bilgilerini kaldırıyoruz
-                # Mod bilgisi, sayaç, FPS ve ilerleme bilgileri artık görüntülenmeyecek
-                
-                # Duraklatma bilgisi
-                if self.paused:
-                    cv2.putText(annotated_frame, "DURAKLATILDI", (frame.shape[1] - 200, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                
-                # İşlenmiş kareyi sinyal olarak gönder
-                self.change_pixmap_signal.emit(annotated_frame, self.stats)
             
-            # Bekleme süresi
-            time.sleep(0.03)
+            # Keypoints verilerini al
+            try:
+                if self.coklu is not None:
+                    # Karedeki herkes kendi kimliği ve sayacıyla analiz edilir
+                    with self.zamanlayici.olc("analiz"):
+                        self.coklu_analiz(*tum_kisiler(results), annotated_frame, frame.shape[0],
+                                          kare.zaman, kare.no)
+                else:
+                    self.tek_kisi_analiz(ilk_kisi_keypoints(results), annotated_frame, frame.shape[0],
+                                         kare.zaman, kare.no)
+            except Exception as e:
+                log.exception("Analiz hatası: %s", e)
+            
+            # Uçtan uca gecikme ve kuyruk derinlikleri
+            hat.kare_tamamlandi(kare)
+            self.stats["boru_hatti"] = hat.istatistik()
+            if self.ortak is not None:
+                self.stats["ortak_cikarim"] = self.ortak.istatistik()
+            
+            self.kareyi_tamamla(annotated_frame)
+            
+            # Video dosyası gerçek hızda oynatılır; webcam'de bekleme gecikmeyi artırır
+            if self.mode == "video":
+                with self.zamanlayici.olc("bekleme"):
+                    time.sleep(0.03)
+        
+        hat.durdur()
+        
+        if self.running:
+            if hat.hata is not None:
+                self.finished_signal.emit({"error": f"Analiz hatası: {hat.hata}"})
+            elif self.mode == "video":
+                # Video dosyası sonuna gelindi
+                self.stats["aciklamalar"] = "Video tamamlandı."
+                self.finished_signal.emit(self.stats)
+            else:
+                self.stats["aciklamalar"] = "Kamera hata verdi."
+                self.finished_signal.emit(self.stats)
         
         # Kaynakları serbest bırak
         cap.release()
 
+    def surecle_calistir(self):
+        """Kare çözme ve çıkarım ayrı süreçlerde; kareler paylaşımlı bellek halkasından okunur"""
+        kaynak = self.kamera_no if self.mode == "webcam" else self.video_path
+        hat = SurecHatti(kaynak, canli=self.mode == "webcam", cok_kisi=self.coklu is not None,
+                         kirp=self.kirp, parti_boyutu=self.parti_boyutu, duraklatma=self.duraklatma)
+        hat.baslat()
+        prev_time = 0
+
+        for kare in hat.sonuclar(lambda: self.running):
+            # Çözücü ve çıkarım süreçlerinin ölçtüğü aşama süreleri
+            for asama, sure in kare.sureler.items():
+                self.zamanlayici.kaydet(asama, sure)
+
+            current_time = time.time()
+            self.stats["fps"] = 1 / (current_time - prev_time) if (current_time - prev_time) > 0 else 0
+            prev_time = current_time
+
+            # Model çizimi çıkarım sürecinde halka yuvasına yapıldı; yazılar da aynı yuvaya eklenir
+            annotated_frame = kare.kare
+            try:
+                if self.coklu is not None:
+                    with self.zamanlayici.olc("analiz"):
+                        self.coklu_analiz(kare.kutular, kare.keypoints, annotated_frame,
+                                          annotated_frame.shape[0], kare.zaman, kare.no)
+                else:
+                    self.tek_kisi_analiz(kare.keypoints, annotated_frame, annotated_frame.shape[0],
+                                         kare.zaman, kare.no)
+            except Exception as e:
+                log.exception("Analiz hatası: %s", e)
+
+            if "kirpma" in hat.ek:
+                self.stats["kirpma"] = hat.ek["kirpma"]
+            self.kareyi_tamamla(annotated_frame)
+            # Kare sunulduktan sonra yuva çözücüye geri verilir
+            hat.kare_tamamlandi(kare)
+            self.stats["boru_hatti"] = hat.istatistik()
+
+            # Video dosyası gerçek hızda oynatılır; webcam'de bekleme gecikmeyi artırır
+            if self.mode == "video":
+                with self.zamanlayici.olc("bekleme"):
+                    time.sleep(0.03)
+
+        hat.durdur()
+
+        if self.running:
+            if hat.hata is not None:
+                self.finished_signal.emit({"error": f"Analiz hatası: {hat.hata}"})
+            elif self.mode == "video":
+                self.stats["aciklamalar"] = "Video tamamlandı."
+                self.finished_signal.emit(self.stats)
+            else:
+                self.stats["aciklamalar"] = "Kamera hata verdi."
+                self.finished_signal.emit(self.stats)
+
+    def oynat(self):
+        """Video dosyasını kare numarasıyla oynatır; arama ve adım isteklerini kareler arasında uygular"""
+        try:
+            oynatici = VideoOynatici(self.video_path)
+        except IOError:
+            self.finished_signal.emit({"error": "Kamera veya video açılamadı."})
+            return
+        kare_sayisi = len(oynatici)
+        if not kare_sayisi:
+            oynatici.kapat()
+            self.finished_signal.emit({"error": "Videoda okunabilir kare yok."})
+            return
+        self.oynatici = oynatici
+        zamanlar = oynatici.dizin.zamanlar
+        
+        # Aynı video daha önce işlendiyse keypoint'ler diskten gelir, model hiç çağrılmaz
+        anahtar = None
+        if self.onbellek is not None:
+            ayarlar = onbellek_ayarlari(kirp=self.kirp)
+            anahtar = self.onbellek.anahtar(self.video_path, MODEL_YOLU, ayarlar)
+            kayit = self.onbellek.oku(anahtar)
+            if kayit is not None and oynatici.kayittan_yukle(kayit):
+                # Kayıt zaten var; yeniden yazılmaz
+                anahtar = None
+        
+        model = None
+        
+        def cikarim(frame):
+            nonlocal model
+            if model is None:
+                # Model ilk çıkarılmamış karede yüklenir
+                if self.kirp:
+                    self.kirpici = KisiKirpici(self.analiz.model)
+                model = self.kirpici or self.analiz.model
+            with self.zamanlayici.olc("cikarim"):
+                return ilk_kisi_keypoints(model(frame, verbose=False, **CIKARIM_AYARLARI))
+        
+        no = 0
+        prev_time = 0
+        sona_gelindi = False
+        while self.running:
+            hedef = self._hedefi_al()
+            if hedef is not None:
+                no = min(max(hedef, 0), kare_sayisi - 1)
+                sona_gelindi = False
+                with self.zamanlayici.olc("arama"):
+                    self.analizi_yeniden_kur(no)
+            elif no >= kare_sayisi or self.paused:
+                if no >= kare_sayisi:
+                    # Video sonunda thread kapanmaz; son karede durup geri sarılmayı bekler
+                    if not sona_gelindi:
+                        sona_gelindi = True
+                        if self.video_sonu(anahtar):
+                            anahtar = None
+                    self.paused = True
+                self.duraklatma.bekle(lambda: self.running and self._hedef is None)
+                continue
+            
+            with self.zamanlayici.olc("okuma"):
+                frame = oynatici.kare(no)
+            if frame is None:
+                # Kare sayısı başlıktan fazla görünüyorsa okunabilen son karede dur
+                kare_sayisi = no
+                continue
+            
+            current_time = time.time()
+            self.stats["fps"] = 1 / (current_time - prev_time) if (current_time - prev_time) > 0 else 0
+            prev_time = current_time
+            
+            try:
+                keypoints = oynatici.keypoint(no, frame, cikarim)
+                with self.zamanlayici.olc("cizim"):
+                    annotated_frame = iskelet_ciz(frame, keypoints)
+                self.tek_kisi_analiz(keypoints, annotated_frame, frame.shape[0], float(zamanlar[no]), no)
+            except Exception as e:
+                log.exception("Analiz hatası: %s", e)
+                annotated_frame = frame.copy()
+            
+            self.gosterilen = no
+            self.stats["kare_no"] = no
+            self.stats["kare_sayisi"] = kare_sayisi
+            self.stats["zaman_sn"] = float(zamanlar[no])
+            self.stats["video_suresi"] = float(zamanlar[kare_sayisi - 1])
+            self.stats["oynatici"] = oynatici.istatistik()
+            self.kareyi_tamamla(annotated_frame)
+            no += 1
+            
+            # Video dosyası gerçek hızda oynatılır
+            if not self.paused:
+                with self.zamanlayici.olc("bekleme"):
+                    time.sleep(0.03)
+        
+        oynatici.kapat()
+    
+    def video_sonu(self, anahtar):
+        """Video sonunda sonucu bildirir; bütün kareler çıkarıldıysa önbelleğe yazar (yazıldı mı)"""
+        yazildi = False
+        if anahtar is not None:
+            meta = {
+                "video": os.path.basename(self.video_path),
+                "model": MODEL_YOLU,
+                "ayarlar": onbellek_ayarlari(kirp=self.kirp),
+                "frame_height": self.oynatici.frame_height,
+                "fps": self.oynatici.dizin.fps
+            }
+            kayit = self.oynatici.kayit(meta)
+            if kayit is not None:
+                self.onbellek.yaz(anahtar, kayit.keypoints, kayit.zamanlar, kayit.tespit, kayit.meta)
+                yazildi = True
+        self.stats["aciklamalar"] = "Video tamamlandı."
+        self.finished_signal.emit(dict(self.stats))
+        return yazildi
+    
+    def analizi_yeniden_kur(self, no):
+        """Aramadan sonra sayaçları no. kareye kadar saklanan keypoint'lerden yeniden kurar.
+        
+        Model çağrılmaz; henüz hiç oynatılmamış kareler kişi yokmuş gibi atlanır.
+        İleri aramada yalnızca gösterilen kare ile hedef arası, geri aramada baştan
+        itibaren bütün kareler analizciden geçer.
+        """
+        oynatici = self.oynatici
+        frame_height = oynatici.frame_height
+        baslangic = self.gosterilen + 1 if 0 <= self.gosterilen < no else 0
+        if baslangic == 0:
+            self.analiz.sifirla()
+            if self.yumusatici is not None:
+                self.yumusatici.sifirla()
+        
+        secili = baslangic + np.flatnonzero(oynatici.tespit[baslangic:no])
+        keypoints = oynatici.keypoints[secili]
+        zamanlar = oynatici.dizin.zamanlar[secili]
+        if self.yumusatici is not None:
+            for j in range(len(secili)):
+                keypoints[j] = self.yumusatici.tek(keypoints[j], float(zamanlar[j]), frame_height)
+        
+        # Özellikler bütün kareler için tek vektörel çağrıda; durum makinesi kare kare ilerler
+        ozellik = self.analiz.katalog.ozellikleri_hesapla(keypoints)
+        self.analiz.sessiz = True
+        try:
+            for j in range(len(secili)):
+                self.analiz.hareket_analiz(keypoints[j], frame_height, float(zamanlar[j]),
+                                           {ad: deger[j] for ad, deger in ozellik.items()}, int(secili[j]))
+        finally:
+            self.analiz.sessiz = False
+        self.sayaclari_yaz(self.analiz)
+        self.modu_yaz(self.analiz)
+
 
 class SporHareketAnaliziApp(QMainWindow):
+    model_hazir_signal = pyqtSignal(str)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Spor Hareket Analizi")
@@ -454,10 +909,34 @@ class SporHareketAnaliziApp(QMainWindow):
         # Video işleme thread'i
         self.thread = None
         
+        # Çoklu kaynakta her kaynağın thread'i ve ızgaradaki (görüntü, yazı) etiketleri;
+        # çıkarım hepsi için tek ortak thread'de yapılır
+        self.kaynak_threadleri = {}
+        self.ortak = None
+        
+        # Aşama süreleri thread'ler arasında ortak; "Ölçüm" kutusuyla açılır
+        self.zamanlayici = AsamaZamanlayici(aktif=False)
+        self.olcum_guncelleme = 0.0
+        
         # Çalıştıktan sonra yüklenmesini beklemek için timer
         self.timer = QTimer()
         self.timer.singleShot(500, self.show_ready_message)
         
+        # Pencere göründükten sonra model arka planda yüklenip ısıtılır
+        self.model_hazir_signal.connect(self.explanation_label.setText)
+        QTimer.singleShot(0, self.modeli_arka_planda_yukle)
+        
+    def modeli_arka_planda_yukle(self):
+        def bitince(model, hata):
+            if hata is not None:
+                self.model_hazir_signal.emit(f"Model yüklenemedi: {hata}")
+                return
+            sure = model_deposu.yukleme_suresi()
+            log.info("Model yüklendi ve ısıtıldı: %.2f sn", sure)
+            self.model_hazir_signal.emit("Model hazır. Webcam veya video seçebilirsiniz.")
+        
+        model_deposu.arka_planda_yukle(bitince=bitince)
+        
     def show_ready_message(self):
         QMessageBox.information(self, "Hazır", "Spor Hareket Analizi uygulaması başlatıldı. Webcam veya video dosyası seçerek başlayabilirsiniz.")
         
@@ -475,34 +954,77 @@ class SporHareketAnaliziApp(QMainWindow):
         self.video_label.setMinimumSize(640, 480)
         self.main_layout.addWidget(self.video_label)
         
+        # Video dosyasında konum kaydırıcısı ve kare kare adım butonları
+        self.oynatma_widget = QWidget()
+        self.oynatma_layout = QHBoxLayout(self.oynatma_widget)
+        self.oynatma_layout.setContentsMargins(0, 0, 0, 0)
+        self.geri_button = QPushButton("◀ Kare")
+        self.geri_button.setStyleSheet("font-size: 13px; padding: 4px;")
+        self.geri_button.clicked.connect(lambda: self.kare_adimi(-1))
+        self.oynatma_layout.addWidget(self.geri_button)
+        self.konum_slider = QSlider(Qt.Horizontal)
+        self.konum_slider.setMinimum(0)
+        self.konum_slider.valueChanged.connect(self.konuma_git)
+        self.oynatma_layout.addWidget(self.konum_slider, 1)
+        self.ileri_button = QPushButton("Kare ▶")
+        self.ileri_button.setStyleSheet("font-size: 13px; padding: 4px;")
+        self.ileri_button.clicked.connect(lambda: self.kare_adimi(1))
+        self.oynatma_layout.addWidget(self.ileri_button)
+        self.konum_label = QLabel("")
+        self.konum_label.setStyleSheet("font-size: 13px; font-family: monospace;")
+        self.oynatma_layout.addWidget(self.konum_label)
+        self.oynatma_widget.hide()
+        self.main_layout.addWidget(self.oynatma_widget)
+        
+        # Aktif egzersiz açısının son saniyeleri; analizcinin geçmiş tamponundan çizilir
+        self.grafik = CanliGrafik(varsayilan_katalog())
+        self.main_layout.addWidget(self.grafik)
+        
+        # Çoklu kaynak ızgarası (tek video alanının yerine gösterilir)
+        self.izgara_widget = QWidget()
+        self.izgara_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.izgara_widget.setMinimumSize(640, 480)
+        self.izgara_layout = QGridLayout(self.izgara_widget)
+        self.izgara_layout.setContentsMargins(0, 0, 0, 0)
+        self.izgara_layout.setSpacing(4)
+        self.izgara_widget.hide()
+        self.main_layout.addWidget(self.izgara_widget)
+        
         # İstatistik ve bilgi alanı
         self.stats_frame = QFrame()
         self.stats_frame.setFrameShape(QFrame.StyledPanel)
         self.stats_frame.setStyleSheet("background-color: #f0f0f0; padding: 10px;")
         self.stats_layout = QHBoxLayout(self.stats_frame)
         
-        # Squat sayacı
-        self.squat_label = QLabel("Squat Sayısı: 0")
-        self.squat_label.setStyleSheet("font-size: 14px; font-weight: bold;")
-        self.stats_layout.addWidget(self.squat_label)
-        
-        # Şınav sayacı
-        self.sinav_label = QLabel("Şınav Sayısı: 0")
-        self.sinav_label.setStyleSheet("font-size: 14px; font-weight: bold;")
-        self.stats_layout.addWidget(self.sinav_label)
-        
-        # Kol kaldırma sayacı
-        self.kol_label = QLabel("Kol Kaldırma Sayısı: 0")
-        self.kol_label.setStyleSheet("font-size: 14px; font-weight: bold;")
-        self.stats_layout.addWidget(self.kol_label)
+        # Tanım dosyasındaki her egzersiz için bir sayaç
+        self.sayac_etiketleri = {}
+        for mod in MODLAR:
+            etiket = QLabel(f"{mod_basligi(mod)} Sayısı: 0")
+            etiket.setStyleSheet("font-size: 14px; font-weight: bold;")
+            self.stats_layout.addWidget(etiket)
+            self.sayac_etiketleri[mod] = etiket
         
         # Aktif mod bilgisi
-        self.aktif_mod_label = QLabel("Aktif Mod: Seçilmedi")
+        self.aktif_mod_label = QLabel("Aktif Mod: Otomatik")
         self.aktif_mod_label.setStyleSheet("font-size: 14px; font-weight: bold; color: red;")
         self.stats_layout.addWidget(self.aktif_mod_label)
         
         self.main_layout.addWidget(self.stats_frame)
         
+        # Çoklu kişi modunda kişi başına sayaçlar
+        self.kisiler_label = QLabel("")
+        self.kisiler_label.setStyleSheet("font-size: 13px; font-weight: bold;")
+        self.kisiler_label.setAlignment(Qt.AlignCenter)
+        self.kisiler_label.hide()
+        self.main_layout.addWidget(self.kisiler_label)
+        
+        # Aşama süreleri paneli (ölçüm açıkken görünür)
+        self.olcum_label = QLabel("")
+        self.olcum_label.setStyleSheet("font-size: 12px; font-family: monospace; color: #333;")
+        self.olcum_label.setAlignment(Qt.AlignCenter)
+        self.olcum_label.hide()
+        self.main_layout.addWidget(self.olcum_label)
+        
         # Açıklamalar için alan
         self.explanation_label = QLabel("Hareket analizi durumu burada gösterilecek")
         self.explanation_label.setStyleSheet("font-size: 14px; font-weight: bold; color: blue; padding: 5px;")
@@ -524,13 +1046,70 @@ class SporHareketAnaliziApp(QMainWindow):
         self.video_button.clicked.connect(self.select_video)
         self.buttons_layout.addWidget(self.video_button)
         
-        # Mod seçimi için combobox
+        # Birden çok kamera/videoyu aynı anda izle
+        self.coklu_kaynak_button = QPushButton("Çoklu Kaynak")
+        self.coklu_kaynak_button.setStyleSheet("font-size: 14px; padding: 10px; background-color: #009688; color: white;")
+        self.coklu_kaynak_button.clicked.connect(self.start_coklu_kaynak)
+        self.buttons_layout.addWidget(self.coklu_kaynak_button)
+        
+        # Mod seçimi için combobox; ilk seçenek egzersizi hareketten tanır
         self.mode_combo = QComboBox()
-        self.mode_combo.addItems(["Squat", "Şınav", "Kol Kaldırma"])
+        self.mode_combo.addItems([mod_basligi(mod) for mod in [OTOMATIK] + MODLAR])
         self.mode_combo.setStyleSheet("font-size: 14px; padding: 10px;")
         self.mode_combo.currentIndexChanged.connect(self.change_mode)
         self.buttons_layout.addWidget(self.mode_combo)
         
+        # Karedeki her kişiyi ayrı takip et ve say
+        self.cok_kisi_checkbox = QCheckBox("Çoklu Kişi")
+        self.cok_kisi_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.buttons_layout.addWidget(self.cok_kisi_checkbox)
+        
+        # Modeli yalnızca kişinin çevresinde çalıştır (tek kişi)
+        self.kirp_checkbox = QCheckBox("Kişiyi Kırp")
+        self.kirp_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.buttons_layout.addWidget(self.kirp_checkbox)
+        
+        # Kare çözme ve çıkarımı arayüzden ayrı süreçlerde çalıştır
+        self.surec_checkbox = QCheckBox("Ayrı Süreçler")
+        self.surec_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.buttons_layout.addWidget(self.surec_checkbox)
+        
+        # Çoklu kaynakta tek model ve ortak partiler: bellek kazancı, CPU'da daha yavaş
+        self.ortak_checkbox = QCheckBox("Ortak Parti")
+        self.ortak_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.ortak_checkbox.setToolTip("Çoklu kaynakta tek model kullanır: daha az bellek, CPU'da daha yavaş")
+        self.buttons_layout.addWidget(self.ortak_checkbox)
+        
+        # Keypoint titremesini analizden önce süz
+        self.yumusat_checkbox = QCheckBox("Yumuşatma")
+        self.yumusat_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.buttons_layout.addWidget(self.yumusat_checkbox)
+        
+        # Açı grafiğini göster
+        self.grafik_checkbox = QCheckBox("Açı Grafiği")
+        self.grafik_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.grafik_checkbox.setChecked(True)
+        self.grafik_checkbox.toggled.connect(self.grafik_ac_kapa)
+        self.buttons_layout.addWidget(self.grafik_checkbox)
+        
+        # Aşama sürelerini ölç ve göster
+        self.olcum_checkbox = QCheckBox("Ölçüm")
+        self.olcum_checkbox.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.olcum_checkbox.toggled.connect(self.olcum_ac_kapa)
+        self.buttons_layout.addWidget(self.olcum_checkbox)
+        
+        # Ölçümleri JSON veya Prometheus dosyasına kaydet
+        self.olcum_button = QPushButton("Ölçümleri Kaydet")
+        self.olcum_button.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.olcum_button.clicked.connect(self.olcumleri_kaydet)
+        self.buttons_layout.addWidget(self.olcum_button)
+        
+        # Son analiz olaylarını dosyaya dök (sayı yanlış göründüğünde)
+        self.gunluk_button = QPushButton("Günlüğü Kaydet")
+        self.gunluk_button.setStyleSheet("font-size: 14px; padding: 10px;")
+        self.gunluk_button.clicked.connect(self.gunlugu_kaydet)
+        self.buttons_layout.addWidget(self.gunluk_button)
+        
         # Sayaç sıfırlama butonu
         self.reset_button = QPushButton("Sayacı Sıfırla")
         self.reset_button.setStyleSheet("font-size: 14px; padding: 10px; background-color: #FF9800; color: white;")
@@ -562,14 +1141,21 @@ class SporHareketAnaliziApp(QMainWindow):
             self.stop_video()
             
         # Yeni webcam thread'i başlat
-        self.thread = VideoThread(mode="webcam")
-        self.thread.change_pixmap_signal.connect(self.update_image)
+        self.thread = VideoThread(mode="webcam", cok_kisi=self.cok_kisi_checkbox.isChecked(),
+                                  kirp=self.kirp_checkbox.isChecked(),
+                                  yumusat=self.yumusat_checkbox.isChecked(),
+                                  zamanlayici=self.zamanlayici,
+                                  surecler=self.surec_checkbox.isChecked())
+        self.thread.yeni_kare_signal.connect(self.update_image)
+        self.thread.gosterim_boyutu = (self.video_label.width(), self.video_label.height())
         self.thread.finished_signal.connect(self.handle_finished)
+        self.thread.change_mode(self.secili_mod())
         self.thread.start()
         
         # Buton durumlarını güncelle
         self.webcam_button.setEnabled(False)
         self.video_button.setEnabled(False)
+        self.coklu_kaynak_button.setEnabled(False)
         self.reset_button.setEnabled(True)
         self.pause_button.setEnabled(True)
         self.stop_button.setEnabled(True)
@@ -582,63 +1168,252 @@ class SporHareketAnaliziApp(QMainWindow):
         file_path, _ = file_dialog.getOpenFileName(self, "Video Dosyası Seç", "", "Video Dosyaları (*.mp4 *.avi *.mov *.mkv)")
         
         if file_path:
-            # Önce kullanıcıdan egzersiz türünü seçmesini iste
-            QMessageBox.information(self, "Egzersiz Türünü Seçin", 
-                                "Video yüklendikten sonra, lütfen aşağıdaki mod seçiciden analiz etmek istediğiniz egzersiz türünü seçin.")
-            
             # Aktif thread varsa durdur
             if self.thread is not None:
                 self.stop_video()
                 
-            # Yeni video thread'i başlat
-            self.thread = VideoThread(mode="video", video_path=file_path)
-            self.thread.change_pixmap_signal.connect(self.update_image)
+            # Yeni video thread'i başlat; çıkarılan keypoint'ler sonraki açılışta diskten okunur
+            self.thread = VideoThread(mode="video", video_path=file_path,
+                                      cok_kisi=self.cok_kisi_checkbox.isChecked(),
+                                      kirp=self.kirp_checkbox.isChecked(),
+                                      yumusat=self.yumusat_checkbox.isChecked(),
+                                      zamanlayici=self.zamanlayici,
+                                      onbellek=KeypointOnbellegi(),
+                                      surecler=self.surec_checkbox.isChecked())
+            self.thread.yeni_kare_signal.connect(self.update_image)
+            self.thread.gosterim_boyutu = (self.video_label.width(), self.video_label.height())
             self.thread.finished_signal.connect(self.handle_finished)
+            self.thread.change_mode(self.secili_mod())
             self.thread.start()
+            if self.thread.aranabilir:
+                self.konum_slider.blockSignals(True)
+                self.konum_slider.setValue(0)
+                self.konum_slider.blockSignals(False)
+                self.oynatma_widget.show()
             
             # Buton durumlarını güncelle
             self.webcam_button.setEnabled(False)
             self.video_button.setEnabled(False)
+            self.coklu_kaynak_button.setEnabled(False)
             self.reset_button.setEnabled(True)
             self.pause_button.setEnabled(True)
             self.stop_button.setEnabled(True)
             
-            # Mod combobox'ı vurgula
-            self.mode_combo.setStyleSheet("font-size: 14px; padding: 10px; background-color: #FFFF00;")
-            
             # Durum güncelle
             video_name = os.path.basename(file_path)
-            self.explanation_label.setText(f"Video dosyası başlatıldı: {video_name}. Lütfen egzersiz modunu seçin!")
+            if self.secili_mod() == OTOMATIK:
+                self.explanation_label.setText(f"Video dosyası başlatıldı: {video_name}. "
+                                               "Egzersiz hareketten tanınacak.")
+            else:
+                self.explanation_label.setText(f"Video dosyası başlatıldı: {video_name}")
+    
+    def secili_mod(self):
+        index = self.mode_combo.currentIndex()
+        return OTOMATIK if index <= 0 else MODLAR[index - 1]
+    
+    def calisan_threadler(self):
+        """Tek kaynakta aktif thread, çoklu kaynakta hâlâ çalışan bütün kaynak thread'leri"""
+        threadler = [self.thread] if self.thread is not None else list(self.kaynak_threadleri)
+        return [thread for thread in threadler if thread.isRunning()]
     
     def change_mode(self, index):
-        if self.thread is not None and self.thread.isRunning():
-            modes = ["squat", "sinav", "kol_kaldirma"]
-            selected_mode = modes[index]
-            self.thread.change_mode(selected_mode)
-            self.aktif_mod_label.setText(f"Aktif Mod: {selected_mode.capitalize()}")
-            self.explanation_label.setText(f"Mod değiştirildi: {selected_mode.capitalize()}")
+        threadler = self.calisan_threadler()
+        if threadler:
+            selected_mode = self.secili_mod()
+            for thread in threadler:
+                thread.change_mode(selected_mode)
+            self.aktif_mod_label.setText(f"Aktif Mod: {mod_basligi(selected_mode)}")
+            self.explanation_label.setText(f"Mod değiştirildi: {mod_basligi(selected_mode)}")
     
     def reset_counter(self):
-        if self.thread is not None and self.thread.isRunning():
-            self.thread.reset_counter()
+        threadler = self.calisan_threadler()
+        if threadler:
+            for thread in threadler:
+                thread.reset_counter()
             self.explanation_label.setText("Sayaç sıfırlandı.")
     
     def toggle_pause(self):
-        if self.thread is not None and self.thread.isRunning():
-            self.thread.toggle_pause()
-            if self.thread.paused:
+        threadler = self.calisan_threadler()
+        if threadler:
+            # Çoklu kaynakta hepsi birlikte duraklar veya devam eder
+            duraklat = not threadler[0].paused
+            for thread in threadler:
+                thread.paused = duraklat
+            if duraklat:
                 self.explanation_label.setText("Video duraklatıldı. Devam etmek için tekrar basın.")
             else:
                 self.explanation_label.setText("Video devam ediyor.")
     
+    def konuma_git(self, no):
+        if self.thread is not None and self.thread.aranabilir and self.thread.isRunning():
+            self.thread.git(no)
+    
+    def kare_adimi(self, fark):
+        if self.thread is not None and self.thread.aranabilir and self.thread.isRunning():
+            self.thread.adim_at(fark)
+            self.explanation_label.setText("Kare kare ilerleniyor. Devam etmek için Duraklat/Devam Et'e basın.")
+    
+    def konumu_guncelle(self, stats):
+        """Kaydırıcıyı ve zaman etiketini gösterilen kareye getirir (arama tetiklemeden)"""
+        if self.konum_slider.maximum() != stats["kare_sayisi"] - 1:
+            self.konum_slider.setMaximum(stats["kare_sayisi"] - 1)
+        if not self.konum_slider.isSliderDown():
+            self.konum_slider.blockSignals(True)
+            self.konum_slider.setValue(stats["kare_no"])
+            self.konum_slider.blockSignals(False)
+        self.konum_label.setText(f"{stats['zaman_sn']:6.2f} / {stats['video_suresi']:.2f} sn | "
+                                 f"kare {stats['kare_no'] + 1}/{stats['kare_sayisi']}")
+    
+    def start_coklu_kaynak(self):
+        metin, tamam = QInputDialog.getText(
+            self, "Çoklu Kaynak",
+            "Webcam numaraları ve/veya video dosyaları (virgülle ayırın):", text="0")
+        kaynaklar = [k.strip() for k in metin.split(",") if k.strip()] if tamam else []
+        if not kaynaklar:
+            return
+        self.coklu_kaynaklari_baslat(kaynaklar)
+    
+    def coklu_kaynaklari_baslat(self, kaynaklar):
+        """Her kaynak için ızgarada bir karo ve thread açar.
+
+        Varsayılan olarak her thread kendi modelini yükler; "Ortak Parti" seçiliyse
+        çıkarım tek modelle ortak thread'de yapılır (daha az bellek, CPU'da daha yavaş).
+        """
+        if self.thread is not None or self.kaynak_threadleri:
+            self.stop_video()
+        
+        ortak_mi = self.ortak_checkbox.isChecked()
+        if ortak_mi:
+            # Her turda her kaynaktan bir kare; parti kaynak sayısı kadar büyüyebilir
+            def cikarim(kareler):
+                return model_deposu.model_al()(kareler, verbose=False, **CIKARIM_AYARLARI)
+            
+            self.ortak = OrtakCikarim(cikarim, en_buyuk_parti=len(kaynaklar), zamanlayici=self.zamanlayici)
+            self.ortak.baslat()
+        
+        sutun_sayisi = math.ceil(math.sqrt(len(kaynaklar)))
+        satir_sayisi = math.ceil(len(kaynaklar) / sutun_sayisi)
+        karo_boyutu = (max(1, self.video_label.width() // sutun_sayisi),
+                       max(1, self.video_label.height() // satir_sayisi - 24))
+        
+        for i, tanim in enumerate(kaynaklar):
+            kaynak, canli, ad = kaynak_coz(tanim)
+            thread = VideoThread(mode="webcam" if canli else "video",
+                                 video_path=None if canli else kaynak,
+                                 kamera_no=kaynak if canli else 0,
+                                 yumusat=self.yumusat_checkbox.isChecked(),
+                                 zamanlayici=self.zamanlayici,
+                                 ortak=self.ortak,
+                                 ayri_model=not ortak_mi)
+            
+            resim = QLabel()
+            resim.setAlignment(Qt.AlignCenter)
+            resim.setStyleSheet("background-color: black;")
+            resim.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+            yazi = QLabel(f"{ad} | başlatılıyor...")
+            yazi.setStyleSheet("font-size: 13px; font-weight: bold;")
+            yazi.setAlignment(Qt.AlignCenter)
+            karo = QVBoxLayout()
+            karo.addWidget(resim, 1)
+            karo.addWidget(yazi)
+            self.izgara_layout.addLayout(karo, i // sutun_sayisi, i % sutun_sayisi)
+            self.kaynak_threadleri[thread] = (resim, yazi)
+            
+            thread.gosterim_boyutu = karo_boyutu
+            thread.yeni_kare_signal.connect(self.karo_guncelle)
+            thread.finished_signal.connect(self.karo_bitti)
+            thread.change_mode(self.secili_mod())
+        
+        self.video_label.hide()
+        self.grafik.hide()
+        self.izgara_widget.show()
+        for thread in self.kaynak_threadleri:
+            thread.start()
+        
+        self.webcam_button.setEnabled(False)
+        self.video_button.setEnabled(False)
+        self.coklu_kaynak_button.setEnabled(False)
+        self.reset_button.setEnabled(True)
+        self.pause_button.setEnabled(True)
+        self.stop_button.setEnabled(True)
+        isleyis = "Kareler ortak partilerde işleniyor" if ortak_mi else "Her kaynak kendi modeliyle işleniyor"
+        self.explanation_label.setText(f"{len(kaynaklar)} kaynak başlatıldı. {isleyis}...")
+    
+    def karo_guncelle(self):
+        """Kaynağın en son karesini kendi karosuna boyar"""
+        thread = self.sender()
+        if thread not in self.kaynak_threadleri:
+            return
+        kare = thread.son_kareyi_al()
+        if kare is None:
+            return
+        qt_image, _, stats = kare
+        resim, yazi = self.kaynak_threadleri[thread]
+        with self.zamanlayici.olc("gosterim"):
+            resim.setPixmap(QPixmap.fromImage(qt_image))
+        
+        mod = stats["aktif_mod"]
+        baslik = mod_basligi(mod) if mod else "Tanınıyor..."
+        sayi = stats.get(f"{mod}_sayisi", 0) if mod else 0
+        yazi.setText(f"{thread.ad} | {baslik}: {sayi} | {stats.get('fps', 0):.0f} fps")
+        
+        # Toplam çıkarım hızı saniyede iki kez yenilenir
+        if time.perf_counter() - self.olcum_guncelleme > 0.5 and "ortak_cikarim" in stats:
+            self.olcum_guncelleme = time.perf_counter()
+            ortak = stats["ortak_cikarim"]
+            self.explanation_label.setText(
+                f"{ortak['kaynak_sayisi']} kaynak | Çıkarım: {ortak['cikarim_fps']:.1f} kare/sn | "
+                f"Ortalama parti: {ortak['ortalama_parti']:.1f}")
+            if self.zamanlayici.aktif:
+                self.olcum_paneli_guncelle(stats)
+    
+    def karo_bitti(self, stats):
+        thread = self.sender()
+        if thread not in self.kaynak_threadleri:
+            return
+        _, yazi = self.kaynak_threadleri[thread]
+        if "error" in stats:
+            yazi.setText(f"{thread.ad} | HATA: {stats['error']}")
+        else:
+            mod = stats["aktif_mod"]
+            sayi = stats.get(f"{mod}_sayisi", 0) if mod else 0
+            yazi.setText(f"{thread.ad} | {mod_basligi(mod) if mod else 'tanınamadı'}: {sayi} | bitti")
+        
+        # Son kaynak da bitince sonuçlar tek pencerede özetlenir
+        if all(t is thread or t.isFinished() for t in self.kaynak_threadleri):
+            ozet = "\n".join(etiketler[1].text() for etiketler in self.kaynak_threadleri.values())
+            self.stop_video()
+            QMessageBox.information(self, "Tamamlandı", f"Analiz tamamlandı.\n{ozet}")
+    
+    def coklu_durdur(self):
+        for thread in self.kaynak_threadleri:
+            thread.stop()
+        if self.ortak is not None:
+            self.ortak.durdur()
+            self.ortak = None
+        
+        # Karoları ızgaradan kaldır
+        while self.izgara_layout.count():
+            karo = self.izgara_layout.takeAt(0).layout()
+            while karo is not None and karo.count():
+                karo.takeAt(0).widget().deleteLater()
+        self.kaynak_threadleri = {}
+        self.izgara_widget.hide()
+        self.video_label.show()
+        self.grafik.setVisible(self.grafik_checkbox.isChecked())
+    
     def stop_video(self):
-        if self.thread is not None:
-            self.thread.stop()
+        if self.thread is not None or self.kaynak_threadleri:
+            if self.kaynak_threadleri:
+                self.coklu_durdur()
+            if self.thread is not None:
+                self.thread.stop()
             self.thread = None
             
             # Buton durumlarını güncelle
             self.webcam_button.setEnabled(True)
             self.video_button.setEnabled(True)
+            self.coklu_kaynak_button.setEnabled(True)
             self.reset_button.setEnabled(False)
             self.pause_button.setEnabled(False)
             self.stop_button.setEnabled(False)
@@ -649,39 +1424,114 @@ class SporHareketAnaliziApp(QMainWindow):
             # Varsayılan görüntüyü göster
             self.display_default_image()
     
-    def update_image(self, cv_img, stats):
-        """OpenCV görüntüsünü Qt için dönüştür ve göster"""
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.video_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-            self.video_label.width(), self.video_label.height(), 
-            Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    def update_image(self):
+        """Thread'in sunduğu en son kareyi göster; arada kalan kareler hiç boyanmaz"""
+        thread = self.sender()
+        if thread is None or thread is not self.thread:
+            # Durdurulmuş thread'den geç gelen sinyal
+            return
+        kare = thread.son_kareyi_al()
+        if kare is None:
+            return
+        qt_image, _, stats = kare
+        
+        # Kare thread'de etiket boyutuna getirildi ve BGR olarak sarıldı; burada yalnızca boyanır
+        with self.zamanlayici.olc("gosterim"):
+            self.video_label.setPixmap(QPixmap.fromImage(qt_image))
+        
+        # Grafiğe yalnızca son boyamadan beri eklenen örnekler çizilir
+        if self.grafik.isVisible():
+            with self.zamanlayici.olc("grafik"):
+                self.grafik.guncelle(thread.grafik_gecmisi)
+        
+        # Ölçüm paneli saniyede iki kez yenilenir
+        if self.zamanlayici.aktif and time.perf_counter() - self.olcum_guncelleme > 0.5:
+            self.olcum_guncelleme = time.perf_counter()
+            self.olcum_paneli_guncelle(stats)
         
         # İstatistikleri güncelle
-        self.squat_label.setText(f"Squat Sayısı: {stats['squat_sayisi']}")
-        self.sinav_label.setText(f"Şınav Sayısı: {stats['sinav_sayisi']}")
-        self.kol_label.setText(f"Kol Kaldırma Sayısı: {stats['kol_kaldirma_sayisi']}")
-        self.aktif_mod_label.setText(f"Aktif Mod: {stats['aktif_mod'].capitalize()}")
+        for mod, etiket in self.sayac_etiketleri.items():
+            etiket.setText(f"{mod_basligi(mod)} Sayısı: {stats[f'{mod}_sayisi']}")
+        if not stats["aktif_mod"]:
+            self.aktif_mod_label.setText("Aktif Mod: Tanınıyor...")
+        elif stats["otomatik"]:
+            self.aktif_mod_label.setText(f"Aktif Mod: {mod_basligi(stats['aktif_mod'])} (otomatik)")
+        else:
+            self.aktif_mod_label.setText(f"Aktif Mod: {mod_basligi(stats['aktif_mod'])}")
+        
+        # Çoklu kişi sayaçları
+        if "kisiler" in stats:
+            self.kisiler_label.setText(" | ".join(
+                f"Kişi #{kimlik}: {sayi}" for kimlik, sayi in sorted(stats["kisiler"].items())))
+            self.kisiler_label.show()
+        
+        # Video konumu
+        if "kare_no" in stats:
+            self.konumu_guncelle(stats)
         
         # Açıklamaları güncelle
         if stats['aciklamalar']:
             self.explanation_label.setText(stats['aciklamalar'])
     
+    def grafik_ac_kapa(self, acik):
+        # Çoklu kaynak ızgarasında grafik gösterilmez
+        self.grafik.setVisible(acik and not self.kaynak_threadleri)
+    
+    def olcum_ac_kapa(self, acik):
+        self.zamanlayici.aktif = acik
+        if acik:
+            self.zamanlayici.sifirla()
+            self.olcum_label.setText("Ölçüm başladı...")
+            self.olcum_label.show()
+        else:
+            self.olcum_label.hide()
+    
+    def olcum_paneli_guncelle(self, stats):
+        parcalar = [f"FPS: {stats.get('fps', 0):.1f}", f"atlanan: {stats.get('atlanan_gosterim', 0)}"]
+        for asama, deger in self.zamanlayici.ozet().items():
+            parcalar.append(f"{asama}: {deger['ortalama_ms']:.1f} ms (p95 ≤{deger['p95_ms']:g})")
+        self.olcum_label.setText(" | ".join(parcalar))
+    
+    def olcumleri_kaydet(self):
+        dosya_yolu, _ = QFileDialog.getSaveFileName(
+            self, "Ölçümleri Kaydet", "olcumler.json",
+            "JSON (*.json);;Prometheus textfile (*.prom)")
+        if not dosya_yolu:
+            return
+        if dosya_yolu.endswith(".prom"):
+            self.zamanlayici.prometheus_yaz(dosya_yolu)
+        else:
+            self.zamanlayici.json_yaz(dosya_yolu)
+        self.explanation_label.setText(f"Ölçümler kaydedildi: {os.path.basename(dosya_yolu)}")
+    
+    def gunlugu_kaydet(self):
+        if halka() is None:
+            return
+        dosya_yolu, _ = QFileDialog.getSaveFileName(
+            self, "Günlüğü Kaydet", "olaylar.jsonl", "JSON satırları (*.jsonl)")
+        if dosya_yolu:
+            olay_sayisi = halka().dok(dosya_yolu)
+            self.explanation_label.setText(f"{olay_sayisi} olay kaydedildi: {os.path.basename(dosya_yolu)}")
+    
     def handle_finished(self, stats):
         """Video veya webcam bittiğinde çalışır"""
+        if "error" not in stats and self.thread is not None and self.thread.aranabilir:
+            # Oynatıcı son karede bekliyor; geri sarılıp incelenebilir, Durdur ile kapanır
+            sayilar = "\n".join(f"{mod_basligi(mod)}: {stats[f'{mod}_sayisi']}" for mod in MODLAR)
+            self.explanation_label.setText("Video tamamlandı. Tekrarları incelemek için kaydırıcıyla geri dönebilirsiniz.")
+            QMessageBox.information(self, "Tamamlandı", f"Analiz tamamlandı.\n{sayilar}")
+            return
         if "error" in stats:
             QMessageBox.critical(self, "Hata", stats["error"])
         else:
-            QMessageBox.information(self, "Tamamlandı", 
-                                  f"Analiz tamamlandı.\nSquat: {stats['squat_sayisi']}\n"
-                                  f"Şınav: {stats['sinav_sayisi']}\n"
-                                  f"Kol Kaldırma: {stats['kol_kaldirma_sayisi']}")
+            sayilar = "\n".join(f"{mod_basligi(mod)}: {stats[f'{mod}_sayisi']}"
+                                 for mod in MODLAR)
+            QMessageBox.information(self, "Tamamlandı", f"Analiz tamamlandı.\n{sayilar}")
         
         # Buton durumlarını güncelle
         self.webcam_button.setEnabled(True)
         self.video_button.setEnabled(True)
+        self.coklu_kaynak_button.setEnabled(True)
         self.reset_button.setEnabled(False)
         self.pause_button.setEnabled(False)
         self.stop_button.setEnabled(False)
@@ -692,20 +1542,562 @@ class SporHareketAnaliziApp(QMainWindow):
     def display_default_image(self):
         """Varsayılan bir görüntü göster"""
         self.video_label.clear()
+        self.kisiler_label.hide()
+        self.oynatma_widget.hide()
         self.video_label.setText("Webcam veya Video dosyası başlatmak için butonlara tıklayın")
         self.video_label.setStyleSheet("background-color: black; color: white; font-size: 16px;")
     
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.thread is not None:
+            self.thread.gosterim_boyutu = (self.video_label.width(), self.video_label.height())
+        for thread, (resim, _) in self.kaynak_threadleri.items():
+            thread.gosterim_boyutu = (max(1, resim.width()), max(1, resim.height()))
+    
     def closeEvent(self, event):
         """Uygulama kapatılırken çalışan thread'leri durdur"""
         if self.thread is not None:
             self.thread.stop()
+        if self.kaynak_threadleri:
+            self.coklu_durdur()
         event.accept()
 
 
+def video_analiz_et(video_path, mod, analiz=None, parti_boyutu=1, onbellek=None, cevrimdisi=False,
+                    adim=1, kirp=False, yumusat=False, baslangic_kare=0):
+    """Videoyu arayüz olmadan, bekleme ve çizim yapmadan baştan sona analiz eder.
+    
+    cevrimdisi=True ise kareler tek tek analizciden geçmez; bütün keypoint serisi
+    toplandıktan sonra tekrarlar vektörel sayaçla tek seferde sayılır.
+    adim > 1 ise model en fazla adim karede bir çalışır, aradaki kareler enterpole edilir.
+    kirp=True ise model yalnızca kişinin çevresindeki bölgede, daha küçük çözünürlükte çalışır.
+    mod "otomatik" ise egzersiz hareketten tanınır; sonuçtaki mod tanınan egzersizdir.
+    yumusat=True ise keypoint'ler analizden önce süzülür; önbelleğe ham keypoint'ler yazılır.
+    baslangic_kare çevrimdışı sayımda bu kareden önceki kareleri yok sayar.
+    """
+    if analiz is None:
+        analiz = SporHareketAnalizi()
+    if analiz.kaynak is None:
+        analiz.kaynak = os.path.basename(video_path)
+    analiz.mod_degistir(mod)
+    ayarlar = onbellek_ayarlari(adim, kirp)
+    
+    # Aynı video, model ve ayarlar daha önce işlendiyse keypoint'ler diskten oynatılır
+    anahtar = None
+    if onbellek is not None:
+        anahtar = onbellek.anahtar(video_path, MODEL_YOLU, ayarlar)
+        kayit = onbellek.oku(anahtar)
+        if kayit is not None:
+            if cevrimdisi:
+                return cevrimdisi_analiz_et(video_path, mod, kayit, yumusat, baslangic_kare)
+            return keypointlerden_analiz_et(video_path, mod, kayit, analiz, yumusat)
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    kare_no = 0
+    cikarim_sayisi = 0
+    kare_zamani = 0.0
+    frame_height = 0
+    baslangic = time.perf_counter()
+    cpu_baslangic = time.process_time()
+    
+    # Önbelleğe yazılacak veya çevrimdışı sayılacak kare kare veriler
+    keypoints_topla = onbellek is not None or cevrimdisi
+    keypoint_listesi = []
+    zaman_listesi = []
+    tespit_listesi = []
+    bos_keypoints = np.zeros((17, 3), dtype=np.float32)
+    
+    model = KisiKirpici(analiz.model) if kirp else analiz.model
+    yumusatici = KeypointYumusatici() if yumusat and not cevrimdisi else None
+    
+    def cikarim(frame):
+        return model(frame, verbose=False, **CIKARIM_AYARLARI)
+    
+    if adim > 1:
+        kareler = seyrek_keypointler(cap, cikarim, ilk_kisi_keypoints, UyarlamaliAdim(mod, adim))
+    else:
+        kareler = _boru_hatti_keypointleri(cap, cikarim, video_fps, parti_boyutu)
+    
+    try:
+        for no, kare_zamani, frame_height, keypoints, cikarim_yapildi in kareler:
+            kare_no += 1
+            cikarim_sayisi += cikarim_yapildi
+            
+            if keypoints_topla:
+                keypoint_listesi.append(keypoints[:17] if keypoints is not None else bos_keypoints)
+                zaman_listesi.append(kare_zamani)
+                tespit_listesi.append(keypoints is not None)
+            
+            if keypoints is not None and not cevrimdisi:
+                if yumusatici is not None:
+                    keypoints = yumusatici.tek(keypoints, kare_zamani, frame_height)
+                analiz.hareket_analiz(keypoints, frame_height, kare_zamani, kare_no=no)
+    finally:
+        kareler.close()
+        cap.release()
+    
+    gecen_sure = time.perf_counter() - baslangic
+    
+    meta = {
+        "video": os.path.basename(video_path),
+        "model": MODEL_YOLU,
+        "ayarlar": ayarlar,
+        "frame_height": frame_height,
+        "fps": video_fps
+    }
+    if keypoints_topla and kare_no > 0:
+        keypoint_dizisi = np.stack(keypoint_listesi)
+        if onbellek is not None:
+            onbellek.yaz(anahtar, keypoint_dizisi, zaman_listesi, tespit_listesi, meta)
+    
+    if cevrimdisi:
+        kayit = KayitliKeypointler(
+            keypoint_dizisi if kare_no > 0 else np.zeros((0, 17, 3), dtype=np.float32),
+            np.asarray(zaman_listesi, dtype=np.float64),
+            np.asarray(tespit_listesi, dtype=bool),
+            meta
+        )
+        sonuc = cevrimdisi_analiz_et(video_path, mod, kayit, yumusat, baslangic_kare)
+        sonuc["islem_suresi"] = time.perf_counter() - baslangic
+        sonuc["fps"] = kare_no / sonuc["islem_suresi"] if sonuc["islem_suresi"] > 0 else 0
+    else:
+        sonuc = analiz_sonucu_olustur(video_path, sonuc_modu(analiz, mod), analiz_sayaclari(analiz),
+                                      analiz.tekrar_kayitlari, kare_no, kare_zamani, gecen_sure)
+        sonuc["tanima_karesi"] = analiz.tanima_karesi
+    
+    sonuc["otomatik"] = mod == OTOMATIK
+    sonuc["parti_boyutu"] = parti_boyutu
+    sonuc["adim"] = adim
+    sonuc["yumusatma"] = yumusat
+    sonuc["imgsz"] = CIKARIM_AYARLARI["imgsz"]
+    sonuc["cikarim_sayisi"] = cikarim_sayisi
+    sonuc["cpu_suresi"] = time.process_time() - cpu_baslangic
+    if kirp:
+        sonuc["kirpma"] = model.istatistik()
+    return sonuc
+
+
+def onbellek_ayarlari(adim=1, kirp=False):
+    """Keypoint önbelleği anahtarına giren çıkarım ayarları"""
+    # Enterpole edilmiş keypoint'ler tam hızlı çıkarımla aynı kayda yazılmamalı
+    ayarlar = dict(CIKARIM_AYARLARI)
+    if adim > 1:
+        ayarlar["adim"] = adim
+    if kirp:
+        ayarlar["kirp"] = True
+    # Dışa aktarılmış ve nicemlenmiş modellerin keypoint'leri birebir aynı değil
+    arka_uc = model_deposu.secili_arka_uc()
+    if arka_uc != "pytorch":
+        ayarlar["arka_uc"] = arka_uc
+    return ayarlar
+
+
+def _boru_hatti_keypointleri(cap, cikarim, video_fps, parti_boyutu):
+    """Her kareyi boru hattından geçirip (kare_no, zaman, yükseklik, keypoints, True) üretir"""
+    # Okuma bir sonraki kareyi çözerken model mevcut kare üzerinde çalışır
+    hat = BoruHatti(
+        cap,
+        cikarim,
+        canli=False,
+        zaman_hesapla=lambda c, no: video_kare_zamani(c, no, video_fps),
+        parti_boyutu=parti_boyutu
+    )
+    hat.baslat()
+    try:
+        for kare in hat.sonuclar():
+            yield kare.no, kare.zaman, kare.kare.shape[0], ilk_kisi_keypoints(kare.results), True
+    finally:
+        hat.durdur()
+    
+    if hat.hata is not None:
+        raise hat.hata
+
+
+def video_cok_kisi_analiz_et(video_path, mod, parti_boyutu=1, model=None, yumusat=False):
+    """Videodaki her kişiyi takip kimliğiyle ayrı ayrı sayar"""
+    ana_analiz = SporHareketAnalizi(model=model)
+    coklu = CokKisiAnalizi(yumusatici=KeypointYumusatici() if yumusat else None,
+                           kaynak=os.path.basename(video_path))
+    coklu.mod_degistir(mod)
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    kare_no = 0
+    kare_zamani = 0.0
+    baslangic = time.perf_counter()
+    
+    hat = BoruHatti(
+        cap,
+        lambda frame: ana_analiz.model(frame, verbose=False, **CIKARIM_AYARLARI),
+        canli=False,
+        zaman_hesapla=lambda c, no: video_kare_zamani(c, no, video_fps),
+        parti_boyutu=parti_boyutu
+    )
+    hat.baslat()
+    
+    for kare in hat.sonuclar():
+        kare_zamani = kare.zaman
+        kare_no += 1
+        kutular, keypoints = tum_kisiler(kare.results)
+        coklu.guncelle(kutular, keypoints, kare.kare.shape[0], kare_zamani, kare.no)
+    
+    hat.durdur()
+    cap.release()
+    gecen_sure = time.perf_counter() - baslangic
+    
+    if hat.hata is not None:
+        raise hat.hata
+    
+    sonuc = analiz_sonucu_olustur(video_path, mod, analiz_sayaclari(ana_analiz), [],
+                                  kare_no, kare_zamani, gecen_sure, parti_boyutu=parti_boyutu)
+    sonuc["otomatik"] = mod == OTOMATIK
+    sonuc["yumusatma"] = yumusat
+    sonuc["kisiler"] = coklu.kisi_ozetleri()
+    # Otomatik modda her kişi kendi tanınan egzersiziyle sayılır
+    sonuc["sayi"] = sum(ozet.get(f"{ozet['mod'] if sonuc['otomatik'] else mod}_sayisi", 0)
+                        for ozet in sonuc["kisiler"].values())
+    return sonuc
+
+
+def keypointlerden_analiz_et(video_path, mod, kayit, analiz, yumusat=False):
+    """Önbellekteki keypoint'leri çözme ve çıkarım yapmadan analizciden geçirir"""
+    baslangic = time.perf_counter()
+    frame_height = kayit.meta["frame_height"]
+    yumusatici = KeypointYumusatici() if yumusat else None
+    
+    for no in range(len(kayit)):
+        if kayit.tespit[no]:
+            keypoints = kayit.keypoints[no]
+            zaman = float(kayit.zamanlar[no])
+            if yumusatici is not None:
+                keypoints = yumusatici.tek(keypoints, zaman, frame_height)
+            analiz.hareket_analiz(keypoints, frame_height, zaman, kare_no=no)
+    
+    gecen_sure = time.perf_counter() - baslangic
+    video_suresi = float(kayit.zamanlar[-1]) if len(kayit) else 0.0
+    sonuc = analiz_sonucu_olustur(video_path, sonuc_modu(analiz, mod), analiz_sayaclari(analiz),
+                                  analiz.tekrar_kayitlari, len(kayit), video_suresi, gecen_sure)
+    sonuc["onbellekten"] = True
+    sonuc["otomatik"] = mod == OTOMATIK
+    sonuc["tanima_karesi"] = analiz.tanima_karesi
+    sonuc["yumusatma"] = yumusat
+    return sonuc
+
+
+def cevrimdisi_analiz_et(video_path, mod, kayit, yumusat=False, baslangic_kare=0):
+    """Keypoint serisinin tamamındaki (baslangic_kare'den itibaren) tekrarları vektörel sayaçla sayar"""
+    baslangic = time.perf_counter()
+    otomatik = mod == OTOMATIK
+    frame_height = kayit.meta["frame_height"]
+    keypoints = kayit.keypoints
+    if yumusat:
+        # Akıştaki süzgeçle aynı kareler aynı sırada; iki yol aynı keypoint'leri sayar
+        keypoints = seriyi_yumusat(keypoints, kayit.zamanlar, kayit.tespit, frame_height)
+    if otomatik:
+        # Bütün seri elde; egzersiz tek pencere olarak tanınır
+        mod = seriden_tani(keypoints, kayit.tespit, frame_height)
+    tespit = kayit.tespit
+    if baslangic_kare > 0:
+        # Önceki kareler aday olamaz; sayım o karedeki başlangıç durumundan başlar
+        tespit = np.array(tespit, dtype=bool)
+        tespit[:baslangic_kare] = False
+    tekrarlar = []
+    if mod is not None:
+        tekrarlar = tekrarlari_say(mod, keypoints, kayit.zamanlar, tespit, frame_height)
+    gecen_sure = time.perf_counter() - baslangic
+    
+    sayaclar = {m: 0 for m in MODLAR}
+    if mod is not None:
+        sayaclar[mod] = len(tekrarlar)
+    video_suresi = float(kayit.zamanlar[-1]) if len(kayit) else 0.0
+    sonuc = analiz_sonucu_olustur(video_path, mod, sayaclar, tekrarlar,
+                                  len(kayit), video_suresi, gecen_sure)
+    sonuc["onbellekten"] = isinstance(kayit.keypoints, np.memmap)
+    sonuc["cevrimdisi"] = True
+    sonuc["otomatik"] = otomatik
+    sonuc["yumusatma"] = yumusat
+    return sonuc
+
+
+def analiz_sayaclari(analiz):
+    return dict(analiz.sayaclar)
+
+
+def sonuc_modu(analiz, mod):
+    # Otomatik modda rapor tanınan egzersiz üzerinden verilir (tanınmadıysa None)
+    if mod == OTOMATIK:
+        return analiz.aktif_mod or None
+    return mod
+
+
+def analiz_sonucu_olustur(video_path, mod, sayaclar, tekrarlar, kare_sayisi, video_suresi,
+                          gecen_sure, parti_boyutu=1):
+    sonuc = {
+        "video": video_path,
+        "mod": mod,
+        "parti_boyutu": parti_boyutu,
+        "onbellekten": False,
+        "cevrimdisi": False,
+        "kare_sayisi": kare_sayisi,
+        "video_suresi": video_suresi,
+        "islem_suresi": gecen_sure,
+        "fps": kare_sayisi / gecen_sure if gecen_sure > 0 else 0,
+    }
+    sonuc.update({f"{m}_sayisi": sayi for m, sayi in sayaclar.items()})
+    sonuc["sayi"] = sayaclar.get(mod, 0)
+    sonuc["tekrarlar"] = list(tekrarlar)
+    return sonuc
+
+
+def sonucu_yazdir(sonuc):
+    """Başsız analiz sonucunu konsola yazar"""
+    hiz = sonuc["video_suresi"] / sonuc["islem_suresi"] if sonuc["islem_suresi"] > 0 else 0
+    kaynak = " (önbellekten)" if sonuc.get("onbellekten") else ""
+    mod = sonuc["mod"] or "tanınamadı"
+    if sonuc.get("otomatik") and not sonuc.get("kisiler"):
+        mod += " (otomatik)"
+    print(f"Video: {os.path.basename(sonuc['video'])} | Mod: {mod}{kaynak}")
+    print(f"Kare: {sonuc['kare_sayisi']} | İşlem süresi: {sonuc['islem_suresi']:.2f} sn | "
+          f"{sonuc['fps']:.1f} fps ({hiz:.1f}x gerçek zaman)")
+    if "kirpma" in sonuc:
+        print(f"Kırpılan kare: {sonuc['kirpma']['kirpilan_kare']} | "
+              f"Tam kare tarama: {sonuc['kirpma']['tam_kare']}")
+    print(f"Tekrar sayısı: {sonuc['sayi']}")
+    for i, tekrar in enumerate(sonuc["tekrarlar"], 1):
+        print(f"  {i}. tekrar: {tekrar['baslangic']:.2f} sn -> {tekrar['bitis']:.2f} sn "
+              f"({tekrar['sure']:.2f} sn)")
+    for kimlik, ozet in sorted(sonuc.get("kisiler", {}).items()):
+        tekrarlar = ozet["tekrarlar"]
+        if sonuc.get("otomatik"):
+            kisi_modu = ozet["mod"] or "tanınamadı"
+            print(f"  Kişi #{kimlik}: {ozet.get(ozet['mod'] + '_sayisi', 0)} tekrar ({kisi_modu})")
+        else:
+            print(f"  Kişi #{kimlik}: {ozet[sonuc['mod'] + '_sayisi']} tekrar")
+        for i, tekrar in enumerate(tekrarlar, 1):
+            print(f"    {i}. tekrar: {tekrar['baslangic']:.2f} sn -> {tekrar['bitis']:.2f} sn "
+                  f"({tekrar['sure']:.2f} sn)")
+
+
+def onbellek_argumanlari_ekle(parser):
+    parser.add_argument("--onbellek", default=VARSAYILAN_KLASOR,
+                        help="Keypoint önbelleği klasörü")
+    parser.add_argument("--onbellek-mb", type=float, default=VARSAYILAN_BOYUT_MB,
+                        help="Önbelleğin en fazla boyutu (MB); aşılınca en eski kayıtlar silinir")
+    parser.add_argument("--onbellek-yok", action="store_true",
+                        help="Önbelleği kullanma, her seferinde çıkarım yap")
+
+
+def arka_uc_argumanlari_ekle(parser):
+    parser.add_argument("--arka-uc", default="pytorch", choices=ARKA_UCLAR,
+                        help="Çıkarım arka ucu; PyTorch dışındakiler ilk kullanımda dışa aktarılıp "
+                             "önbelleğe alınır (varsayılan: pytorch)")
+    parser.add_argument("--imgsz", type=imgsz_argumani, default=CIKARIM_AYARLARI["imgsz"],
+                        help="Model giriş boyutu, 32'nin katı; küçüldükçe çıkarım hızlanır "
+                             f"(varsayılan: {CIKARIM_AYARLARI['imgsz']})")
+
+
+def imgsz_argumani(deger):
+    import argparse
+    
+    # Geçersiz boyut çıkarımda değil argüman okunurken reddedilsin
+    try:
+        imgsz = int(deger)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"sayı olmalı: {deger}")
+    if imgsz <= 0 or imgsz % 32:
+        raise argparse.ArgumentTypeError(f"32'nin pozitif katı olmalı: {imgsz}")
+    return imgsz
+
+
+def yumusatma_argumani_ekle(parser):
+    parser.add_argument("--yumusat", action="store_true",
+                        help="Keypoint titremesini analizden önce One-Euro süzgeciyle bastır "
+                             "(düşük imgsz'de yanlış sayımları azaltır)")
+
+
+def olay_veritabani_argumani_ekle(parser):
+    parser.add_argument("--olay-db", default=None, metavar="DOSYA",
+                        help="Tekrar ve durum geçişi olaylarını bu SQLite veritabanına yaz "
+                             "(sorgu: spor_gui.py olaylar DOSYA)")
+
+
+def olay_veritabanini_kapat():
+    """Kuyruktaki olayları yazdırıp veritabanını kapatır, özeti konsola yazar"""
+    db = veritabanini_kapat()
+    if db is None:
+        return
+    if db.hata is not None:
+        print(f"Olay veritabanına yazılamadı: {db.hata}", file=sys.stderr)
+        return
+    print(f"{db.yazilan} olay {db.parti_sayisi} partide yazıldı: {db.yol} (oturum {db.oturum})")
+
+
+def onbellek_olustur(args):
+    if args.onbellek_yok:
+        return None
+    return KeypointOnbellegi(args.onbellek, args.onbellek_mb)
+
+
+def analyze_main(argv):
+    """python spor_gui.py analyze <video> --mode <mod> komutunu çalıştırır"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="spor_gui.py analyze",
+                                     description="Videodaki tekrarları arayüz açmadan sayar")
+    parser.add_argument("video", help="Analiz edilecek video dosyası")
+    parser.add_argument("--mode", default=OTOMATIK, choices=MODLAR + [OTOMATIK],
+                        help="Egzersiz modu (varsayılan: hareketten otomatik tanı)")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="Modele tek seferde verilecek kare sayısı (varsayılan: 1)")
+    parser.add_argument("--adim", type=int, default=1,
+                        help="Modeli en fazla kaç karede bir çalıştır; aradakiler enterpole edilir "
+                             "(varsayılan: 1, her kare)")
+    parser.add_argument("--kirp", action="store_true",
+                        help="Modeli kişinin çevresindeki bölgede daha küçük çözünürlükte çalıştır")
+    parser.add_argument("--karsilastir", action="store_true",
+                        help="Her kareyi tek tek işleyen döngüyle hızı ve sayıyı karşılaştır")
+    parser.add_argument("--cevrimdisi", action="store_true",
+                        help="Tekrarları tüm açı serisi üzerinden vektörel sayaçla say")
+    parser.add_argument("--dogrula", action="store_true",
+                        help="Akış analizcisi ile çevrimdışı sayacın aynı sonucu verdiğini kontrol et")
+    parser.add_argument("--cok-kisi", action="store_true",
+                        help="Karedeki her kişiyi takip edip ayrı say (önbellek kullanılmaz)")
+    parser.add_argument("--log-seviye", default="WARNING",
+                        help="Konsola yazılacak en düşük günlük seviyesi (DEBUG, INFO, WARNING)")
+    parser.add_argument("--kare-log", type=int, default=0, metavar="N",
+                        help="Her N karede bir kare başına açıları da günlüğe al (varsayılan: kapalı)")
+    parser.add_argument("--log-dok", default=None, metavar="DOSYA",
+                        help="Bitince son olayları JSON satırları olarak bu dosyaya yaz")
+    yumusatma_argumani_ekle(parser)
+    onbellek_argumanlari_ekle(parser)
+    arka_uc_argumanlari_ekle(parser)
+    olay_veritabani_argumani_ekle(parser)
+    args = parser.parse_args(argv)
+    gunlugu_kur(args.log_seviye, args.kare_log, veritabani_yolu=args.olay_db)
+    model_deposu.arka_uc_sec(args.arka_uc)
+    model_deposu.imgsz_sec(args.imgsz)
+    try:
+        return _analyze_calistir(args)
+    finally:
+        olay_veritabanini_kapat()
+        if args.log_dok:
+            olay_sayisi = halka().dok(args.log_dok)
+            print(f"{olay_sayisi} olay kaydedildi: {args.log_dok}")
+
+
+def _analyze_calistir(args):
+    if args.cok_kisi:
+        try:
+            sonuc = video_cok_kisi_analiz_et(args.video, args.mode, parti_boyutu=args.batch,
+                                             yumusat=args.yumusat)
+        except IOError as e:
+            print(e, file=sys.stderr)
+            return 1
+        sonucu_yazdir(sonuc)
+        return 0
+    
+    try:
+        # Karşılaştırmada iki çalıştırma da gerçekten çıkarım yapmalı
+        onbellek = None if args.karsilastir else onbellek_olustur(args)
+        sonuc = video_analiz_et(args.video, args.mode, parti_boyutu=args.batch, onbellek=onbellek,
+                                cevrimdisi=args.cevrimdisi and not args.dogrula, adim=args.adim,
+                                kirp=args.kirp, yumusat=args.yumusat)
+        if args.karsilastir:
+            tekli = video_analiz_et(args.video, args.mode, parti_boyutu=1, yumusat=args.yumusat)
+        if args.dogrula:
+            # İlk çalıştırma önbelleği doldurdu; ikincisi aynı keypoint'leri kullanır.
+            # Sayaçlar karşılaştırıldığı için otomatik modda akışın tanıdığı egzersiz verilir.
+            # Akış o egzersizi tanıma penceresinin başından saymaya başlar; öncesi karşılaştırılmaz
+            dogrulama_modu = sonuc["mod"] if args.mode == OTOMATIK and sonuc["mod"] else args.mode
+            dogrulama_karesi = (sonuc.get("tanima_karesi") or 0) if args.mode == OTOMATIK else 0
+            cevrimdisi = video_analiz_et(args.video, dogrulama_modu, onbellek=onbellek, cevrimdisi=True,
+                                         adim=args.adim, kirp=args.kirp, yumusat=args.yumusat,
+                                         baslangic_kare=dogrulama_karesi)
+    except IOError as e:
+        print(e, file=sys.stderr)
+        return 1
+    
+    sonucu_yazdir(sonuc)
+    if args.dogrula:
+        akis_zamanlari = [(t["baslangic"], t["bitis"]) for t in sonuc["tekrarlar"]
+                          if t["mod"] == cevrimdisi["mod"]
+                          and t.get("baslangic_kare", 0) >= dogrulama_karesi]
+        cevrimdisi_zamanlari = [(t["baslangic"], t["bitis"]) for t in cevrimdisi["tekrarlar"]]
+        if akis_zamanlari != cevrimdisi_zamanlari:
+            print(f"DOĞRULAMA BAŞARISIZ: akış {sonuc['sayi']} tekrar, "
+                  f"çevrimdışı {cevrimdisi['sayi']} tekrar")
+            return 2
+        print(f"Doğrulama başarılı: {cevrimdisi['sayi']} tekrar, çevrimdışı sayım "
+              f"{cevrimdisi['islem_suresi'] * 1000:.2f} ms")
+    if args.karsilastir:
+        kazanc = sonuc["fps"] / tekli["fps"] if tekli["fps"] > 0 else 0
+        print(f"Tek kare: {tekli['fps']:.1f} fps | Parti {args.batch}, adım {args.adim}: "
+              f"{sonuc['fps']:.1f} fps ({kazanc:.2f}x)")
+        if args.adim > 1:
+            tasarruf = 1 - sonuc["cpu_suresi"] / tekli["cpu_suresi"] if tekli["cpu_suresi"] > 0 else 0
+            print(f"Çıkarım: {sonuc['cikarim_sayisi']}/{tekli['cikarim_sayisi']} kare | "
+                  f"CPU: {sonuc['cpu_suresi']:.2f} sn / {tekli['cpu_suresi']:.2f} sn "
+                  f"(%{tasarruf * 100:.0f} tasarruf)")
+        if tekli["sayi"] != sonuc["sayi"]:
+            print(f"UYARI: sayılar farklı (tek kare: {tekli['sayi']}, "
+                  f"karşılaştırılan: {sonuc['sayi']}, fark: {sonuc['sayi'] - tekli['sayi']:+d})")
+    return 0
+
+
 def main():
+    # Komut satırından başsız analiz
+    if len(sys.argv) > 1 and sys.argv[1] == "analyze":
+        sys.exit(analyze_main(sys.argv[2:]))
+    
+    # Birden çok kamera/videoyu tek süreçte ortak toplu çıkarımla analiz
+    if len(sys.argv) > 1 and sys.argv[1] == "coklu":
+        from coklu_kaynak import coklu_main
+        sys.exit(coklu_main(sys.argv[2:]))
+    
+    # Klasördeki videoları süreç havuzuyla toplu analiz
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from toplu_analiz import batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    
+    # İnce istemciler için WebSocket analiz sunucusu ve yük üretici
+    if len(sys.argv) > 1 and sys.argv[1] == "sunucu":
+        from analiz_sunucusu import sunucu_main
+        sys.exit(sunucu_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "yuk":
+        from yuk_uretici import yuk_main
+        sys.exit(yuk_main(sys.argv[2:]))
+    
+    # Olay veritabanındaki oturumların tekrar özeti
+    if len(sys.argv) > 1 and sys.argv[1] == "olaylar":
+        from olay_veritabani import olaylar_main
+        sys.exit(olaylar_main(sys.argv[2:]))
+    
+    # Örnek videolarda hız ve doğruluk ölçümü
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        from benchmark import benchmark_main
+        sys.exit(benchmark_main(sys.argv[2:]))
+    
+    # Kare başına açı kaydı için SPOR_KARE_LOG=n (her n karede bir).
+    # Tekrar olayları SPOR_OLAY_DB veritabanına yazılır; boş bırakılırsa yazılmaz
+    from olay_veritabani import VARSAYILAN_VERITABANI
+    gunlugu_kur(os.environ.get("SPOR_LOG_SEVIYE", "INFO"), int(os.environ.get("SPOR_KARE_LOG", "0")),
+                veritabani_yolu=os.environ.get("SPOR_OLAY_DB", VARSAYILAN_VERITABANI))
+    # Çıkarım arka ucu için SPOR_ARKA_UC=onnx, onnx-int8, openvino...
+    model_deposu.arka_uc_sec(os.environ.get("SPOR_ARKA_UC", "pytorch"))
+    model_deposu.imgsz_sec(int(os.environ.get("SPOR_IMGSZ", CIKARIM_AYARLARI["imgsz"])))
+    
+    baslangic = time.perf_counter()
     app = QApplication(sys.argv)
     window = SporHareketAnaliziApp()
     window.show()
+    log.info("Arayüz açıldı: %.0f ms", (time.perf_counter() - baslangic) * 1000)
     sys.exit(app.exec_())
 
 
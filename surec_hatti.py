@@ -0,0 +1,475 @@
+import math
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Halkadaki yuva sayısı ve bir yuvaya sığan en büyük kare (genişlik, yükseklik)
+VARSAYILAN_YUVA_SAYISI = 4
+VARSAYILAN_YUVA_BOYUTU = (1920, 1080)
+
+# Kuyruk mesajlarının türleri; karenin kendisi hiçbir mesajda yoktur
+_KARE = "kare"
+_HAZIR = "hazir"
+_HATA = "hata"
+_AKIS_SONU = "son"
+
+# Süreçlerin ortak sayaçları (paylaşımlı dizideki sıra)
+_OKUNAN, _COZUCU_ATILAN, _CIKARIM_ATILAN = range(3)
+
+
+class KareHalkasi:
+    """Süreçler arasında kareleri pickle'lamadan taşıyan paylaşımlı bellek halkası.
+
+    Bellek yuva_sayisi eşit yuvaya bölünür; her yuvanın başlığında sıra numarası,
+    kare numarası ve kare boyutu tutulur. Yazan süreç yuvaya yazarken sıra
+    numarasını tek, bitirince çift yapar. Kuyruklardan yalnızca (yuva, sıra) gibi
+    küçük mesajlar geçer; okuyan kareyi, yuvadaki sıra mesajdakiyle aynı kaldıkça
+    yerinde okur.
+
+    Yuvaların sahipliği serbest yuva kuyruğuyla dolaşır: çözücü boş yuvayı alıp
+    doldurur, son tüketici işi bitince geri verir. Sıra numarası bu akış bozulup
+    bir yuvanın üzerine erken yazıldığında bunu yakalar.
+    """
+
+    def __init__(self, yuva_sayisi=VARSAYILAN_YUVA_SAYISI, genislik=VARSAYILAN_YUVA_BOYUTU[0],
+                 yukseklik=VARSAYILAN_YUVA_BOYUTU[1], ad=None):
+        self.yuva_sayisi = yuva_sayisi
+        self.genislik = genislik
+        self.yukseklik = yukseklik
+        self.yuva_bayt = genislik * yukseklik * 3
+        # Başlık: yuva başına sıra, kare no, yükseklik, genişlik (int64); veri 64 bayta hizalı
+        baslik_bayt = yuva_sayisi * 4 * 8
+        veri_baslangici = -(-baslik_bayt // 64) * 64
+
+        # ad verilmezse halka oluşturulur ve kapatılırken silinir; verilirse var olana bağlanılır
+        self.sahip = ad is None
+        self.bellek = shared_memory.SharedMemory(name=ad, create=self.sahip,
+                                                 size=veri_baslangici + yuva_sayisi * self.yuva_bayt)
+        self._baslik = np.ndarray((yuva_sayisi, 4), dtype=np.int64, buffer=self.bellek.buf)
+        self._veri = np.ndarray((yuva_sayisi, self.yuva_bayt), dtype=np.uint8, buffer=self.bellek.buf,
+                                offset=veri_baslangici)
+        if self.sahip:
+            self._baslik[:] = 0
+
+    @property
+    def tanim(self):
+        """Başka süreçte aynı halkaya bağlanmak için KareHalkasi(*tanim)"""
+        return self.yuva_sayisi, self.genislik, self.yukseklik, self.bellek.name
+
+    def sigar_mi(self, frame):
+        return frame.shape[0] * frame.shape[1] * 3 <= self.yuva_bayt
+
+    def yaz(self, yuva, frame, no):
+        """Kareyi yuvaya kopyalar ve yuvanın yeni sıra numarasını döndürür"""
+        h, w = frame.shape[:2]
+        if not self.sigar_mi(frame):
+            raise ValueError(f"{w}x{h} kare halka yuvasına sığmıyor ({self.genislik}x{self.yukseklik})")
+        baslik = self._baslik[yuva]
+        sira = int(baslik[0]) + 1
+        baslik[0] = sira
+        np.copyto(self._veri[yuva, :h * w * 3].reshape(h, w, 3), frame)
+        baslik[1:] = (no, h, w)
+        baslik[0] = sira + 1
+        return sira + 1
+
+    def gecerli_mi(self, yuva, sira):
+        return int(self._baslik[yuva, 0]) == sira
+
+    def kare(self, yuva, sira):
+        """Yuvadaki karenin (kopyasız) görünümü; yuva o sırada değilse None"""
+        if not self.gecerli_mi(yuva, sira):
+            return None
+        _, h, w = (int(deger) for deger in self._baslik[yuva, 1:])
+        return self._veri[yuva, :h * w * 3].reshape(h, w, 3)
+
+    def kapat(self):
+        self._baslik = self._veri = None
+        try:
+            self.bellek.close()
+        except BufferError:
+            # Dışarıda hâlâ tutulan kare görünümü var; eşleme onunla birlikte bırakılır
+            pass
+        if self.sahip:
+            try:
+                self.bellek.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _yuvaya_sigdir(frame, halka):
+    # Yuvadan büyük kareler (4K kamera) en-boy oranı korunarak küçültülür
+    import cv2
+
+    h, w = frame.shape[:2]
+    oran = min(halka.genislik / w, halka.yukseklik / h)
+    return cv2.resize(frame, (max(1, int(w * oran)), max(1, int(h * oran))), interpolation=cv2.INTER_AREA)
+
+
+def _cozucu_sureci(halka_tanimi, kaynak, canli, bos_yuvalar, cikis, calisiyor, devam, sayaclar):
+    """Kaynaktan kareleri çözüp boş yuvalara yazar, (yuva, sıra) mesajını çıkarım sürecine yollar"""
+    import cv2
+    from boru_hatti import video_kare_zamani
+
+    halka = KareHalkasi(*halka_tanimi)
+    cap = cv2.VideoCapture(kaynak)
+    try:
+        if not cap.isOpened():
+            cikis.put((_HATA, "Kamera veya video açılamadı."))
+            return
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        kare_no = 0
+        while calisiyor.is_set():
+            if not devam.is_set():
+                devam.wait(0.1)
+                continue
+
+            baslangic = time.perf_counter()
+            success, frame = cap.read()
+            if not success:
+                break
+            okuma_suresi = time.perf_counter() - baslangic
+            zaman = None if canli else video_kare_zamani(cap, kare_no, video_fps)
+            kare_no += 1
+            sayaclar[_OKUNAN] = kare_no
+
+            if canli:
+                # Boş yuva yoksa kare atılır; kameranın tamponu bekletilmeden boşaltılır
+                try:
+                    yuva = bos_yuvalar.get_nowait()
+                except queue.Empty:
+                    sayaclar[_COZUCU_ATILAN] += 1
+                    continue
+            else:
+                # Dosyada kare atılmaz; tüketici bir yuvayı geri verene kadar beklenir
+                yuva = None
+                while yuva is None and calisiyor.is_set():
+                    try:
+                        yuva = bos_yuvalar.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                if yuva is None:
+                    break
+
+            if not halka.sigar_mi(frame):
+                frame = _yuvaya_sigdir(frame, halka)
+            sira = halka.yaz(yuva, frame, kare_no - 1)
+            cikis.put((_KARE, yuva, sira, kare_no - 1, zaman, baslangic, okuma_suresi))
+    except Exception as e:
+        cikis.put((_HATA, f"Kare okuma hatası: {e}"))
+    finally:
+        cap.release()
+        cikis.put((_AKIS_SONU,))
+        if not calisiyor.is_set():
+            # Okuyan kalmadıysa kuyruk boşalmayı beklemeden kapansın
+            cikis.cancel_join_thread()
+        halka.kapat()
+
+
+def _modeli_hazirla(ayarlar):
+    # Thread sınırı torch/OpenCV yüklenmeden önce ayarlanmalı
+    thread_sayisi = ayarlar.get("thread_sayisi")
+    if thread_sayisi:
+        for degisken in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[degisken] = str(thread_sayisi)
+
+    import model_deposu
+
+    # spawn ile başlayan süreç ana sürecin seçimini görmez
+    model_deposu.arka_uc_sec(ayarlar["arka_uc"])
+    model_deposu.imgsz_sec(ayarlar["imgsz"])
+    if ayarlar.get("model_yukleyici") is not None:
+        model = ayarlar["model_yukleyici"]()
+    else:
+        model = model_deposu.model_al()
+    if thread_sayisi:
+        import torch
+        torch.set_num_threads(thread_sayisi)
+    return model
+
+
+def _sonuc_keypointleri(sonuc, cok_kisi):
+    """Tek kare sonucundan (kutular, keypoints); tek kişide kutu yok, kişi yoksa keypoints None"""
+    from arka_uclar import keypoint_duzenle
+    from kisi_takip import tum_kisiler
+
+    if cok_kisi:
+        return tum_kisiler([sonuc])
+    if len(sonuc.keypoints.data) == 0:
+        return None, None
+    return None, keypoint_duzenle(sonuc.keypoints.data[0].cpu().numpy())
+
+
+def _cikarim_sureci(halka_tanimi, giris, cikis, bos_yuvalar, calisiyor, sayaclar, ayarlar):
+    """Yuvadaki kareye modeli uygular, çizimi aynı yuvaya yazar, keypoint mesajını arayüze yollar"""
+    from model_deposu import CIKARIM_AYARLARI
+
+    halka = KareHalkasi(*halka_tanimi)
+    try:
+        baslangic = time.perf_counter()
+        model = _modeli_hazirla(ayarlar)
+        kirpici = None
+        if ayarlar["kirp"]:
+            from kisi_kirpma import KisiKirpici
+            kirpici = model = KisiKirpici(model)
+        cikis.put((_HAZIR, time.perf_counter() - baslangic))
+
+        canli = ayarlar["canli"]
+        parti_boyutu = 1 if canli else max(1, ayarlar["parti_boyutu"])
+        akis_bitti = False
+        islenen = 0
+        while calisiyor.is_set() and not akis_bitti:
+            parti = []
+            while len(parti) < parti_boyutu and calisiyor.is_set():
+                try:
+                    mesaj = giris.get(timeout=0.1)
+                except queue.Empty:
+                    if parti:
+                        # Dosyada bekleyen kare yoksa eldeki parti beklemeden işlenir
+                        break
+                    continue
+                if mesaj[0] != _KARE:
+                    if mesaj[0] == _HATA:
+                        cikis.put(mesaj)
+                    akis_bitti = mesaj[0] == _AKIS_SONU
+                    break
+                parti.append(mesaj)
+                if canli:
+                    # Canlıda yalnızca en yeni kare işlenir, bayat karelerin yuvaları geri verilir
+                    while True:
+                        try:
+                            mesaj = giris.get_nowait()
+                        except queue.Empty:
+                            break
+                        if mesaj[0] != _KARE:
+                            if mesaj[0] == _HATA:
+                                cikis.put(mesaj)
+                            akis_bitti = mesaj[0] == _AKIS_SONU
+                            break
+                        bos_yuvalar.put(parti.pop()[1])
+                        sayaclar[_CIKARIM_ATILAN] += 1
+                        parti.append(mesaj)
+                    break
+
+            if not parti:
+                continue
+
+            kareler = [halka.kare(mesaj[1], mesaj[2]) for mesaj in parti]
+            baslangic = time.perf_counter()
+            if len(parti) == 1:
+                results = model(kareler[0], verbose=False, **CIKARIM_AYARLARI)
+            else:
+                results = model(kareler, verbose=False, **CIKARIM_AYARLARI)
+            # Parti süresi kare başına dağıtılır
+            cikarim_suresi = (time.perf_counter() - baslangic) / len(parti)
+
+            for mesaj, kare, sonuc in zip(parti, kareler, results):
+                _, yuva, sira, no, zaman, okuma_zamani, okuma_suresi = mesaj
+                baslangic = time.perf_counter()
+                # Çizim yerinde; arayüz süreci kareyi yalnızca yazıyla tamamlar
+                kare[...] = sonuc.plot()
+                cizim_suresi = time.perf_counter() - baslangic
+                kutular, keypoints = _sonuc_keypointleri(sonuc, ayarlar["cok_kisi"])
+                sureler = {"okuma": okuma_suresi, "cikarim": cikarim_suresi, "cizim": cizim_suresi}
+                # Kırpma istatistiği her karede değil, arada bir gönderilir
+                ek = {"kirpma": kirpici.istatistik()} if kirpici is not None and islenen % 30 == 0 else None
+                islenen += 1
+                cikis.put((_KARE, yuva, sira, no, zaman, okuma_zamani, kutular, keypoints, sureler, ek))
+    except Exception as e:
+        cikis.put((_HATA, f"Çıkarım hatası: {e}"))
+    finally:
+        cikis.put((_AKIS_SONU,))
+        if not calisiyor.is_set():
+            cikis.cancel_join_thread()
+            bos_yuvalar.cancel_join_thread()
+        halka.kapat()
+
+
+class SurecKaresi:
+    """Çıkarım süreci bitirdiği, halkadaki yuvasında duran kare ve keypoint'leri"""
+    __slots__ = ("yuva", "sira", "no", "zaman", "kare", "kutular", "keypoints", "sureler", "okuma_zamani")
+
+    def __init__(self, yuva, sira, no, zaman, kare, kutular, keypoints, sureler, okuma_zamani):
+        self.yuva = yuva
+        self.sira = sira
+        self.no = no
+        self.zaman = zaman
+        self.kare = kare
+        self.kutular = kutular
+        self.keypoints = keypoints
+        self.sureler = sureler
+        self.okuma_zamani = okuma_zamani
+
+
+class SurecHatti:
+    """Kare çözmeyi ve poz çıkarımını arayüzden ayrı iki süreçte çalıştırır.
+
+    çözücü süreç -> [halka + kuyruk] -> çıkarım süreci -> [halka + kuyruk] -> sonuclar()
+
+    Kareler KareHalkasi'nda durur; süreçler arasında yalnızca yuva numarası,
+    sıra, zaman ve keypoint'ler gider. Çizim de çıkarım sürecinde yapılır,
+    arayüz sürecinde GIL için yarışan yalnızca analiz, yazı ve ölçekleme kalır.
+    Tüketici her kareyi kare_tamamlandi ile geri verir; yuva ancak o zaman
+    yeniden yazılır.
+
+    BoruHatti ile aynı arayüzü sunar (baslat, sonuclar, kare_tamamlandi, istatistik, durdur).
+    """
+
+    def __init__(self, kaynak, canli, cok_kisi=False, kirp=False, parti_boyutu=1, duraklatma=None,
+                 yuva_sayisi=VARSAYILAN_YUVA_SAYISI, yuva_boyutu=VARSAYILAN_YUVA_BOYUTU,
+                 thread_sayisi=None, model_yukleyici=None):
+        import model_deposu
+
+        self.kaynak = kaynak
+        self.canli = canli
+        self.duraklatma = duraklatma
+        # Bir parti ve arayüzdeki kare kadar yuva yoksa dosyada çıkarım beklemede kalır
+        self.yuva_sayisi = max(yuva_sayisi, 1 if canli else parti_boyutu + 2, 2)
+        self.yuva_boyutu = yuva_boyutu
+        self.ayarlar = {
+            "canli": canli,
+            "cok_kisi": cok_kisi,
+            "kirp": kirp and not cok_kisi,
+            "parti_boyutu": parti_boyutu,
+            "arka_uc": model_deposu.secili_arka_uc(),
+            "imgsz": model_deposu.CIKARIM_AYARLARI["imgsz"],
+            "thread_sayisi": thread_sayisi,
+            # Verilirse çıkarım süreci modeli bununla yükler; modül düzeyinde bir fonksiyon olmalı
+            "model_yukleyici": model_yukleyici,
+        }
+
+        self.calisiyor = False
+        self.hata = None
+        self.halka = None
+        self.yukleme_suresi = None
+        self.ek = {}
+        self.bozuk_kare = 0
+        self.gecikmeler = deque(maxlen=120)
+        self._surecler = []
+
+    def baslat(self):
+        # Qt ve torch ile güvenli olması için fork yerine spawn
+        baglam = multiprocessing.get_context("spawn")
+        self.halka = KareHalkasi(self.yuva_sayisi, *self.yuva_boyutu)
+        self._bos_yuvalar = baglam.Queue()
+        for yuva in range(self.yuva_sayisi):
+            self._bos_yuvalar.put(yuva)
+        self._cozulen = baglam.Queue()
+        self._cikis = baglam.Queue()
+        self._calisiyor = baglam.Event()
+        self._calisiyor.set()
+        self._devam = baglam.Event()
+        self._devam.set()
+        self._sayaclar = baglam.Array("q", 3, lock=False)
+
+        self.calisiyor = True
+        self._surecler = [
+            baglam.Process(target=_cozucu_sureci, name="kare-cozucu", daemon=True,
+                           args=(self.halka.tanim, self.kaynak, self.canli, self._bos_yuvalar,
+                                 self._cozulen, self._calisiyor, self._devam, self._sayaclar)),
+            baglam.Process(target=_cikarim_sureci, name="poz-cikarim", daemon=True,
+                           args=(self.halka.tanim, self._cozulen, self._cikis, self._bos_yuvalar,
+                                 self._calisiyor, self._sayaclar, self.ayarlar)),
+        ]
+        for surec in self._surecler:
+            surec.start()
+
+    def durdur(self):
+        if not self._surecler:
+            return
+        self.calisiyor = False
+        self._calisiyor.clear()
+        self._devam.set()
+        for surec in self._surecler:
+            surec.join(timeout=5)
+            if surec.is_alive():
+                surec.terminate()
+                surec.join()
+        self._surecler = []
+        # Arayüzün geri verdiği yuvalar okunmadan kalabilir; kapanışta beklenmesin
+        for kuyruk in (self._bos_yuvalar, self._cozulen, self._cikis):
+            kuyruk.cancel_join_thread()
+            kuyruk.close()
+        self.halka.kapat()
+
+    def _duraklatmayi_yansit(self):
+        # Duraklatma thread bayrağı; çözücü süreç onu paylaşılan olaydan görür
+        if self.duraklatma is None:
+            return
+        if self.duraklatma.duraklatildi == self._devam.is_set():
+            if self.duraklatma.duraklatildi:
+                self._devam.clear()
+            else:
+                self._devam.set()
+
+    def _beklenmedik_kapanis(self):
+        for surec in self._surecler:
+            if not surec.is_alive() and surec.exitcode:
+                return RuntimeError(f"{surec.name} süreci beklenmedik şekilde kapandı "
+                                    f"(çıkış kodu {surec.exitcode})")
+        return None
+
+    def sonuclar(self, devam_et=None):
+        """Çıkarımı biten kareleri sırayla döndürür, akış bitince durur"""
+        while self.calisiyor and (devam_et is None or devam_et()):
+            self._duraklatmayi_yansit()
+            try:
+                mesaj = self._cikis.get(timeout=0.1)
+            except queue.Empty:
+                self.hata = self._beklenmedik_kapanis()
+                if self.hata is not None:
+                    return
+                continue
+
+            if mesaj[0] == _HAZIR:
+                self.yukleme_suresi = mesaj[1]
+                continue
+            if mesaj[0] == _HATA:
+                self.hata = RuntimeError(mesaj[1])
+                return
+            if mesaj[0] == _AKIS_SONU:
+                return
+
+            _, yuva, sira, no, zaman, okuma_zamani, kutular, keypoints, sureler, ek = mesaj
+            if ek:
+                self.ek.update(ek)
+            kare = self.halka.kare(yuva, sira)
+            if kare is None:
+                # Yuvanın üzerine erken yazılmış; kare gösterilmez, yuva sahibine dönmüş sayılır
+                self.bozuk_kare += 1
+                continue
+            yield SurecKaresi(yuva, sira, no, zaman, kare, kutular, keypoints, sureler, okuma_zamani)
+
+    def kare_tamamlandi(self, kare):
+        # Yuva çözücüye geri verilir; okumadan emit edilene kadar geçen süre
+        self._bos_yuvalar.put(kare.yuva)
+        self.gecikmeler.append(time.perf_counter() - kare.okuma_zamani)
+
+    def istatistik(self):
+        gecikme = sum(self.gecikmeler) / len(self.gecikmeler) if self.gecikmeler else 0
+        return {
+            "kuyruk_derinlikleri": {
+                "okuma": _derinlik(self._cozulen),
+                "cikarim": _derinlik(self._cikis)
+            },
+            "atilan_kareler": {
+                "okuma": self._sayaclar[_COZUCU_ATILAN],
+                "cikarim": self._sayaclar[_CIKARIM_ATILAN]
+            },
+            "okunan_kare": self._sayaclar[_OKUNAN],
+            "bozuk_kare": self.bozuk_kare,
+            "yuva_sayisi": self.yuva_sayisi,
+            "gecikme_ms": gecikme * 1000
+        }
+
+
+def _derinlik(kuyruk):
+    try:
+        return kuyruk.qsize()
+    except NotImplementedError:
+        # macOS'ta sem_getvalue yok
+        return math.nan
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import struct
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from analiz_sunucusu import AnalizSunucusu  # noqa: E402
+from web_soket import KAPAT, METIN, baglan  # noqa: E402
+
+
+def _sunucuyla(senaryo):
+    """Yerel bir portta modelsiz sunucu açar, senaryoyu adresiyle çalıştırır"""
+    async def calistir():
+        # Testlerde JPEG gönderilmez; çıkarım çağrılırsa test hata versin
+        sunucu = AnalizSunucusu(lambda kareler: pytest.fail("çıkarım beklenmiyordu"), "squat")
+        port = await sunucu.baslat(port=0)
+        try:
+            return await asyncio.wait_for(senaryo(f"ws://127.0.0.1:{port}/analiz", sunucu), 10)
+        finally:
+            await sunucu.kapat()
+    return asyncio.run(calistir())
+
+
+async def _iste(soket, mesaj):
+    await soket.gonder(mesaj)
+    return json.loads(await soket.al())
+
+
+@pytest.mark.parametrize("mesaj", [
+    b"\x00\x01",  # zaman öneki için çok kısa ikili mesaj
+    "[1, 2]",
+    "bozuk json",
+    json.dumps({"keypoints": [[0, 0, 0.9]] * 17, "frame_height": 720, "zaman": "x"}),
+    json.dumps({"keypoints": [[0, 0]] * 17, "frame_height": 720}),
+], ids=["kisa_ikili", "json_liste", "bozuk_json", "metin_zaman", "keypoint_sekli"])
+def test_gecersiz_mesaj_oturumu_kapatmaz(mesaj):
+    async def senaryo(adres, sunucu):
+        soket = await baglan(adres)
+        yanit = await _iste(soket, mesaj)
+        assert yanit["hata"].startswith("Geçersiz mesaj")
+        # Oturum açık kalır ve sonraki mesajlar işlenir
+        yanit = await _iste(soket, json.dumps({"keypoints": [[0, 0, 0.9]] * 17, "frame_height": 720,
+                                               "zaman": 1.0}))
+        assert "hata" not in yanit and yanit["kare"] == 0
+        await soket.kapat()
+    _sunucuyla(senaryo)
+
+
+def test_bilinmeyen_mod_hata_doner():
+    async def senaryo(adres, sunucu):
+        soket = await baglan(adres)
+        yanit = await _iste(soket, json.dumps({"mod": "yuzme"}))
+        assert yanit["hata"] == "Bilinmeyen mod: yuzme"
+        assert (await _iste(soket, json.dumps({"mod": "sinav"})))["mod"] == "sinav"
+        await soket.kapat()
+    _sunucuyla(senaryo)
+
+
+def test_gecersiz_utf8_1007_ile_kapanir():
+    async def senaryo(adres, sunucu):
+        soket = await baglan(adres)
+        soket._cerceve_yaz(METIN, b"\xff\xfe{}")
+        await soket.writer.drain()
+        _, kod, veri = await soket._cerceve_oku()
+        assert kod == KAPAT
+        assert struct.unpack("!H", veri[:2])[0] == 1007
+        await soket.kapat()
+
+        # Sunucu oturumu düzgün kapatır ve yeni bağlantıları kabul etmeye devam eder
+        await asyncio.sleep(0.05)
+        assert not sunucu.oturumlar
+        soket = await baglan(adres)
+        assert "hata" not in await _iste(soket, json.dumps({"sifirla": True}))
+        await soket.kapat()
+    _sunucuyla(senaryo)
@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from cevrimdisi_sayac import tekrarlari_say  # noqa: E402
+from egzersiz_tanima import OTOMATIK  # noqa: E402
+from spor_gui import MODLAR, SporHareketAnalizi  # noqa: E402
+
+KARE_YUKSEKLIGI = 720
+FPS = 30.0
+KOL = 80.0
+
+# Egzersiz başına salınan eklem açısının aralığı, gövdenin duruşu ve dik gövdede omuz yüksekliği
+HAREKETLER = {
+    "squat": {"aci": (80.0, 180.0), "yatay": False, "omuz_y": 200.0},
+    "sinav": {"aci": (60.0, 175.0), "yatay": True, "omuz_y": 400.0},
+    "kol_kaldirma": {"aci": (50.0, 180.0), "yatay": False, "omuz_y": 200.0},
+}
+
+
+def _bukum(eklem, aci):
+    """Önceki nokta eklemin tam üstündeyken eklemde `aci` derecelik açı yapan sonraki nokta"""
+    radyan = np.radians(aci)
+    return np.stack([eklem[:, 0] + KOL * np.sin(radyan), eklem[:, 1] - KOL * np.cos(radyan)], axis=1)
+
+
+def sentetik_seri(mod, tohum, saniye=30.0, ters_saniye=0.0):
+    """mod egzersizini tekrarlayan (T, 17, 3) keypoint serisi, zamanlar ve tespit maskesi.
+
+    Periyot, genlik ve hız tekrar tekrar değişir; açıya gürültü, zamanlara titreşim
+    eklenir. Rastgele kareler ve birkaç uzun bölüm tespit edilmemiş sayılır, bazı
+    karelerde bazı noktaların güveni düşer. İlk ters_saniye boyunca gövde ters duruşta
+    (dik yerine yatay veya tersi) olur: tekrarlar sayılır ama egzersiz tanınmaz.
+    """
+    rng = np.random.default_rng(tohum)
+    hareket = HAREKETLER[mod]
+    T = int(saniye * FPS)
+    zamanlar = np.arange(T) / FPS + rng.uniform(0, 0.01, T)
+    zamanlar.sort()
+
+    # Tekrar hızı ve derinliği yavaşça değişen salınım
+    periyot = rng.uniform(1.2, 3.5) * np.exp(np.cumsum(rng.normal(0, 0.01, T)))
+    faz = np.cumsum(2 * np.pi / FPS / periyot)
+    alt, ust = hareket["aci"]
+    derinlik = np.clip(1 + np.cumsum(rng.normal(0, 0.02, T)) * 0.1, 0.6, 1.1)
+    aci = ust - (ust - alt) * derinlik * (1 - np.cos(faz)) / 2 + rng.normal(0, 3, T)
+    aci = np.clip(aci, 20, 180)
+
+    kp = np.zeros((T, 17, 3), dtype=np.float32)
+    kp[:, :, 2] = 0.9
+    x = 640 + rng.normal(0, 2, T)
+    yatay = (zamanlar < ters_saniye) != hareket["yatay"]
+    # Yatay gövde karenin alt yarısında; dik gövde egzersizin omuz yüksekliğinde
+    omuz = np.stack([x, np.where(yatay, 400.0, hareket["omuz_y"])], axis=1)
+    kalca = np.stack([np.where(yatay, x + 250, x), np.where(yatay, 410.0, hareket["omuz_y"] + 150)], axis=1)
+    for yan, kayma in ((0, -20.0), (1, 20.0)):
+        kp[:, 5 + yan, :2] = omuz + [kayma, 0]
+        kp[:, 11 + yan, :2] = kalca + [kayma, 0]
+        if mod == "squat":
+            kp[:, 13 + yan, :2] = kp[:, 11 + yan, :2] + [0, KOL]
+            kp[:, 15 + yan, :2] = _bukum(kp[:, 13 + yan, :2], aci)
+            # Kollar gövde yanında, bilekler karenin üst yarısında
+            kp[:, 7 + yan, :2] = kp[:, 5 + yan, :2] + [0, 60]
+            kp[:, 9 + yan, :2] = kp[:, 7 + yan, :2] + [0, 60]
+        else:
+            kp[:, 7 + yan, :2] = kp[:, 5 + yan, :2] + [0, KOL]
+            kp[:, 9 + yan, :2] = _bukum(kp[:, 7 + yan, :2], aci)
+            kp[:, 13 + yan, :2] = kp[:, 11 + yan, :2] + [0, 120]
+            kp[:, 15 + yan, :2] = kp[:, 13 + yan, :2] + [0, 120]
+
+    # Düşük güvenli noktalar
+    dusuk = rng.random((T, 17)) < 0.02
+    kp[:, :, 2][dusuk] = rng.uniform(0, 0.4, dusuk.sum())
+
+    # Tek tük ve uzun tespit boşlukları
+    tespit = rng.random(T) > 0.03
+    for _ in range(4):
+        bas = rng.integers(0, T - 40)
+        tespit[bas:bas + rng.integers(5, 40)] = False
+    return kp, zamanlar, tespit
+
+
+def akistan_say(mod, kp, zamanlar, tespit):
+    analiz = SporHareketAnalizi(model=object())
+    analiz.mod_degistir(mod, float(zamanlar[0]))
+    for i in np.flatnonzero(tespit):
+        analiz.hareket_analiz(kp[i], KARE_YUKSEKLIGI, float(zamanlar[i]), kare_no=int(i))
+    return analiz
+
+
+def _ozet(tekrarlar):
+    return [(t["mod"], t["baslangic"], t["bitis"], t["baslangic_kare"], t["bitis_kare"]) for t in tekrarlar]
+
+
+@pytest.mark.parametrize("mod", MODLAR)
+@pytest.mark.parametrize("tohum", range(6))
+def test_akis_ile_ayni_tekrarlar(mod, tohum):
+    kp, zamanlar, tespit = sentetik_seri(mod, tohum)
+    analiz = akistan_say(mod, kp, zamanlar, tespit)
+    cevrimdisi = tekrarlari_say(mod, kp, zamanlar, tespit, KARE_YUKSEKLIGI)
+
+    assert analiz.sayaclar[mod] == len(cevrimdisi)
+    assert _ozet(analiz.tekrar_kayitlari) == _ozet(cevrimdisi)
+
+
+@pytest.mark.parametrize("mod", MODLAR)
+def test_sentetik_seri_tekrar_icerir(mod):
+    # Eşlik testi boş sayımlarla geçmesin
+    kp, zamanlar, tespit = sentetik_seri(mod, 0)
+    assert len(tekrarlari_say(mod, kp, zamanlar, tespit, KARE_YUKSEKLIGI)) >= 5
+
+
+@pytest.mark.parametrize("mod", MODLAR)
+def test_otomatik_tanimadan_sonra_ayni_tekrarlar(mod):
+    # Otomatik modda akış tanıma penceresinin başından sayar; çevrimdışı sayım o kareden başlatılır
+    kp, zamanlar, tespit = sentetik_seri(mod, 1, ters_saniye=10.0)
+    analiz = akistan_say(OTOMATIK, kp, zamanlar, tespit)
+    assert analiz.aktif_mod == mod
+    assert analiz.tanima_karesi > 0
+    # Tanımadan önceki tekrarlar akışta sayılmaz; bütün seri karşılaştırılamaz
+    assert len(tekrarlari_say(mod, kp, zamanlar, tespit, KARE_YUKSEKLIGI)) > analiz.sayaclar[mod]
+
+    kesik = tespit.copy()
+    kesik[:analiz.tanima_karesi] = False
+    cevrimdisi = tekrarlari_say(mod, kp, zamanlar, kesik, KARE_YUKSEKLIGI)
+    akis = [t for t in analiz.tekrar_kayitlari
+            if t["mod"] == mod and t["baslangic_kare"] >= analiz.tanima_karesi]
+    assert cevrimdisi
+    assert _ozet(akis) == _ozet(cevrimdisi)
+
+
+def test_bos_seri():
+    assert tekrarlari_say("squat", np.zeros((0, 17, 3), dtype=np.float32), np.zeros(0)) == []
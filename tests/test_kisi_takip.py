@@ -0,0 +1,114 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from egzersiz_tanima import OTOMATIK  # noqa: E402
+from kisi_takip import CokKisiAnalizi  # noqa: E402
+from spor_gui import SporHareketAnalizi  # noqa: E402
+from test_cevrimdisi_sayac import KARE_YUKSEKLIGI, sentetik_seri  # noqa: E402
+
+# Kişiler yan yana durur, kutuları örtüşmez
+ARALIK = 700.0
+
+
+def _sahne(modlar, tohum, saniye=40.0):
+    """Kişi başına (keypoint, zaman, görünürlük) serisi; biri geç gelir, biri erken gider"""
+    kisiler = []
+    for k, mod in enumerate(modlar):
+        kp, zamanlar, tespit = sentetik_seri(mod, tohum * 10 + k, saniye)
+        kp[:, :, 0] += k * ARALIK
+        kisiler.append((kp, tespit))
+    T = len(zamanlar)
+    if len(kisiler) > 1:
+        kisiler[1][1][int(T * 0.6):] = False
+    if len(kisiler) > 2:
+        kisiler[2][1][:int(T * 0.2)] = False
+    return kisiler, zamanlar
+
+
+def _kutular(kp):
+    return np.concatenate([kp[:, :2].min(axis=0) - 10, kp[:, :2].max(axis=0) + 10])
+
+
+def _karsilastir(mod, modlar, tohum):
+    kisiler, zamanlar = _sahne(modlar, tohum)
+    coklu = CokKisiAnalizi()
+    coklu.mod_degistir(mod)
+    tekliler = {}
+    for i, zaman in enumerate(zamanlar):
+        gorunen = [k for k, (_, tespit) in enumerate(kisiler) if tespit[i]]
+        kp = np.stack([kisiler[k][0][i] for k in gorunen]) if gorunen else np.zeros((0, 17, 3))
+        kimlikler = coklu.guncelle(np.array([_kutular(p) for p in kp]).reshape(-1, 4), kp,
+                                   KARE_YUKSEKLIGI, float(zaman), i)
+        for k, kimlik in zip(gorunen, kimlikler):
+            # Her kişi kendi tek kişilik analizcisiyle de sayılır
+            if kimlik not in tekliler:
+                tekliler[kimlik] = SporHareketAnalizi(model=object())
+                tekliler[kimlik].mod_degistir(mod, float(zaman))
+            tekliler[kimlik].hareket_analiz(kisiler[k][0][i], KARE_YUKSEKLIGI, float(zaman), kare_no=i)
+    return coklu, tekliler
+
+
+@pytest.mark.parametrize("mod,modlar", [
+    ("squat", ["squat"] * 3),
+    ("sinav", ["sinav", "sinav"]),
+    (OTOMATIK, ["squat", "sinav", "kol_kaldirma"]),
+])
+@pytest.mark.parametrize("tohum", range(2))
+def test_tek_kisilik_analizciyle_ayni(mod, modlar, tohum):
+    coklu, tekliler = _karsilastir(mod, modlar, tohum)
+    ozetler = coklu.kisi_ozetleri()
+    assert set(ozetler) == set(tekliler)
+    for kimlik, analiz in tekliler.items():
+        assert ozetler[kimlik] == analiz.ozet()
+    # Erken giden kişi takipten düşer, özeti saklanır
+    if len(modlar) > 1:
+        assert coklu.biten_kisiler
+    assert sum(len(ozet["tekrarlar"]) for ozet in ozetler.values()) >= 5 * len(modlar)
+
+
+def test_otomatik_her_kisi_kendi_egzersizi():
+    coklu, _ = _karsilastir(OTOMATIK, ["squat", "sinav", "kol_kaldirma"], 0)
+    modlar = {kimlik: ozet["mod"] for kimlik, ozet in coklu.kisi_ozetleri().items()}
+    assert sorted(modlar.values()) == ["kol_kaldirma", "sinav", "squat"]
+
+
+def test_istekler_analiz_threadinde_uygulanir():
+    kisiler, zamanlar = _sahne(["squat", "squat", "squat"], 0, saniye=20.0)
+    coklu = CokKisiAnalizi()
+    coklu.mod_degistir("squat")
+    bitti = threading.Event()
+
+    def arayuz():
+        # Arayüz thread'i analiz sürerken mod değiştirip sayaç sıfırlar
+        while not bitti.is_set():
+            coklu.mod_degistir("squat")
+            coklu.sayaci_sifirla("squat")
+
+    thread = threading.Thread(target=arayuz)
+    thread.start()
+    try:
+        for i, zaman in enumerate(zamanlar):
+            gorunen = [k for k, (_, tespit) in enumerate(kisiler) if tespit[i]]
+            kp = np.stack([kisiler[k][0][i] for k in gorunen]) if gorunen else np.zeros((0, 17, 3))
+            coklu.guncelle(np.array([_kutular(p) for p in kp]).reshape(-1, 4), kp, KARE_YUKSEKLIGI,
+                           float(zaman), i)
+    finally:
+        bitti.set()
+        thread.join()
+
+    coklu.sayaci_sifirla("squat")
+    coklu.guncelle(np.zeros((0, 4)), np.zeros((0, 17, 3)), KARE_YUKSEKLIGI, float(zamanlar[-1]) + 0.1)
+    assert all(sayi == 0 for sayi in coklu.kisi_sayilari().values())
+
+
+def test_kisi_basina_durum_kucuk():
+    coklu, _ = _karsilastir("squat", ["squat"] * 3, 0)
+    durum = sum(dizi.nbytes for dizi in (coklu.kimlikler, coklu.aktifler, coklu.durumlar, coklu.durum_zamanlari,
+                                        coklu.durum_kareleri, coklu.aci_araliklari, coklu.sayaclar))
+    assert durum < 1024
+    assert not coklu.tanicilar
@@ -0,0 +1,176 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from egzersiz_motoru import varsayilan_katalog
+from egzersiz_tanima import OTOMATIK
+
+VIDEO_UZANTILARI = (".mp4", ".avi", ".mov", ".mkv")
+
+# Her işçi sürecin kendi modeli; _isci_baslat içinde yüklenir
+_isci_modeli = None
+
+
+def mod_tahmin_et(video_path):
+    """Dosya adından egzersiz modunu tahmin eder (squat.mp4, sinav_1.mp4, kol_kaldirma.mp4)"""
+    ad = os.path.basename(video_path).lower()
+    # Uzun adlar önce; bir mod adı diğerinin öneki olabilir
+    for mod in sorted(varsayilan_katalog().adlar, key=len, reverse=True):
+        if ad.startswith(mod):
+            return mod
+    return None
+
+
+def videolari_bul(yollar):
+    """Verilen dosya ve klasörlerdeki videoları sıralı liste olarak döndürür"""
+    videolar = []
+    for yol in yollar:
+        if os.path.isdir(yol):
+            for ad in sorted(os.listdir(yol)):
+                if ad.lower().endswith(VIDEO_UZANTILARI):
+                    videolar.append(os.path.join(yol, ad))
+        else:
+            videolar.append(yol)
+    return videolar
+
+
+def _isci_baslat(thread_sayisi, arka_uc="pytorch", imgsz=None):
+    # Thread sınırları torch/OpenCV yüklenmeden önce ayarlanmalı,
+    # yoksa her işçi tüm çekirdekleri kullanmaya çalışır
+    for degisken in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[degisken] = str(thread_sayisi)
+
+    import cv2
+    import torch
+    cv2.setNumThreads(thread_sayisi)
+    torch.set_num_threads(thread_sayisi)
+
+    import model_deposu
+
+    # spawn ile başlayan işçi ana sürecin seçimini görmez
+    model_deposu.arka_uc_sec(arka_uc)
+    if imgsz is not None:
+        model_deposu.imgsz_sec(imgsz)
+
+    # İlk videonun süresine ısıtma çıkarımı eklenmesin
+    global _isci_modeli
+    _isci_modeli = model_deposu.model_al()
+
+
+def _videoyu_isle(video_path, mod, parti_boyutu, onbellek_ayari, yumusat=False):
+    from spor_gui import SporHareketAnalizi, video_analiz_et
+    from keypoint_onbellek import KeypointOnbellegi
+
+    baslangic = time.perf_counter()
+    try:
+        # Model süreçte bir kez yüklenir, sayaç durumu her video için sıfırdan başlar
+        analiz = SporHareketAnalizi(model=_isci_modeli)
+        onbellek = KeypointOnbellegi(*onbellek_ayari) if onbellek_ayari else None
+        sonuc = video_analiz_et(video_path, mod, analiz, parti_boyutu=parti_boyutu, onbellek=onbellek,
+                                yumusat=yumusat)
+    except Exception as e:
+        sonuc = {"video": video_path, "mod": mod, "hata": str(e)}
+    sonuc["duvar_suresi"] = time.perf_counter() - baslangic
+    sonuc["isci_pid"] = os.getpid()
+    return sonuc
+
+
+def toplu_analiz_et(videolar, mod=None, isci_sayisi=None, thread_sayisi=None, parti_boyutu=1,
+                    onbellek_ayari=None, arka_uc="pytorch", imgsz=None, yumusat=False):
+    """Videoları süreç havuzuna dağıtır ve sonuçları video sırasıyla döndürür"""
+    if isci_sayisi is None:
+        isci_sayisi = min(len(videolar), os.cpu_count() or 1)
+    isci_sayisi = max(1, isci_sayisi)
+    if thread_sayisi is None:
+        thread_sayisi = max(1, (os.cpu_count() or 1) // isci_sayisi)
+
+    sonuclar = {}
+    baslangic = time.perf_counter()
+
+    # Qt ve torch ile güvenli olması için fork yerine spawn
+    baglam = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=isci_sayisi, mp_context=baglam,
+                             initializer=_isci_baslat, initargs=(thread_sayisi, arka_uc, imgsz)) as havuz:
+        isler = {}
+        for video in videolar:
+            # Dosya adı bir mod belirtmiyorsa egzersiz hareketten tanınır
+            video_modu = mod or mod_tahmin_et(video) or OTOMATIK
+            is_ = havuz.submit(_videoyu_isle, video, video_modu, parti_boyutu, onbellek_ayari, yumusat)
+            isler[is_] = video
+
+        for is_ in as_completed(isler):
+            sonuclar[isler[is_]] = is_.result()
+
+    toplam_sure = time.perf_counter() - baslangic
+    dosyalar = [sonuclar[video] for video in videolar]
+    toplam_kare = sum(sonuc.get("kare_sayisi", 0) for sonuc in dosyalar)
+
+    return {
+        "isci_sayisi": isci_sayisi,
+        "thread_sayisi": thread_sayisi,
+        "parti_boyutu": parti_boyutu,
+        "arka_uc": arka_uc,
+        "imgsz": imgsz,
+        "yumusatma": yumusat,
+        "toplam_sure": toplam_sure,
+        "toplam_kare": toplam_kare,
+        "toplam_fps": toplam_kare / toplam_sure if toplam_sure > 0 else 0,
+        "dosyalar": dosyalar
+    }
+
+
+def raporu_yazdir(rapor):
+    """Toplu analiz özetini tablo halinde konsola yazar"""
+    print(f"{'Video':<24}{'Mod':<14}{'Tekrar':>7}{'Kare':>7}{'Süre (sn)':>11}{'FPS':>8}")
+    for sonuc in rapor["dosyalar"]:
+        ad = os.path.basename(sonuc["video"])
+        if "hata" in sonuc:
+            print(f"{ad:<24}{str(sonuc['mod']):<14}  HATA: {sonuc['hata']}")
+            continue
+        print(f"{ad:<24}{sonuc['mod'] or 'tanınamadı':<14}{sonuc['sayi']:>7}{sonuc['kare_sayisi']:>7}"
+              f"{sonuc['duvar_suresi']:>11.2f}{sonuc['fps']:>8.1f}")
+    print(f"Toplam: {rapor['toplam_kare']} kare, {rapor['toplam_sure']:.2f} sn, "
+          f"{rapor['toplam_fps']:.1f} fps ({rapor['isci_sayisi']} işçi x "
+          f"{rapor['thread_sayisi']} thread)")
+
+
+def batch_main(argv):
+    """python spor_gui.py batch <klasör|video...> komutunu çalıştırır"""
+    from spor_gui import arka_uc_argumanlari_ekle, onbellek_argumanlari_ekle, yumusatma_argumani_ekle
+
+    parser = argparse.ArgumentParser(prog="spor_gui.py batch",
+                                     description="Videoları paralel süreçlerde toplu analiz eder")
+    parser.add_argument("yollar", nargs="+", help="Video dosyaları veya video içeren klasörler")
+    parser.add_argument("--mode", choices=varsayilan_katalog().adlar + [OTOMATIK],
+                        help="Tüm videolar için egzersiz modu (verilmezse dosya adından tahmin edilir, "
+                             "ad bir mod içermiyorsa hareketten tanınır)")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="İşçi başına thread sayısı (varsayılan: çekirdek / işçi)")
+    parser.add_argument("--batch", type=int, default=1, help="Toplu çıkarım parti boyutu")
+    parser.add_argument("--rapor", default=None, help="Özet raporun yazılacağı JSON dosyası")
+    yumusatma_argumani_ekle(parser)
+    onbellek_argumanlari_ekle(parser)
+    arka_uc_argumanlari_ekle(parser)
+    args = parser.parse_args(argv)
+
+    videolar = videolari_bul(args.yollar)
+    if not videolar:
+        print("Analiz edilecek video bulunamadı.", file=sys.stderr)
+        return 1
+
+    onbellek_ayari = None if args.onbellek_yok else (args.onbellek, args.onbellek_mb)
+    rapor = toplu_analiz_et(videolar, args.mode, args.workers, args.threads, args.batch,
+                            onbellek_ayari, args.arka_uc, args.imgsz, args.yumusat)
+    raporu_yazdir(rapor)
+
+    if args.rapor:
+        with open(args.rapor, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"Rapor kaydedildi: {args.rapor}")
+
+    return 1 if any("hata" in sonuc for sonuc in rapor["dosyalar"]) else 0
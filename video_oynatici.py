@@ -0,0 +1,209 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from keypoint_onbellek import KayitliKeypointler
+
+
+class KareDizini:
+    """Videonun sunum sırasındaki kare zaman damgaları ve anahtar kareleri.
+
+    İlk açılışta paketler çözülmeden (ham okuma) bir kez taranır; dizin birkaç
+    ms'de çıkar. Kare numarasından zamana ve önündeki anahtar kareye erişim O(1).
+    """
+
+    def __init__(self, zamanlar, anahtar_kareler, fps):
+        self.zamanlar = np.asarray(zamanlar, dtype=np.float64)
+        self.anahtar_kareler = np.asarray(anahtar_kareler, dtype=np.intp)
+        self.fps = fps
+        # Her karenin çözümüne başlanabilecek en yakın önceki anahtar kare
+        onceki = np.zeros(len(self.zamanlar), dtype=np.intp)
+        onceki[self.anahtar_kareler] = self.anahtar_kareler
+        self._onceki_anahtar = np.maximum.accumulate(onceki) if len(onceki) else onceki
+
+    @classmethod
+    def olustur(cls, video_path):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        zamanlar, anahtar = [], []
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            while cap.isOpened() and cap.grab():
+                zamanlar.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+                anahtar.append(bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME)))
+        finally:
+            cap.release()
+
+        if not zamanlar or not any(anahtar):
+            return cls._kare_sayisindan(video_path)
+
+        # Paketler çözme sırasıyla gelir (B kareler); sunum sırası zamana göre sıralamadır
+        zamanlar = np.asarray(zamanlar)
+        sunum = np.sort(zamanlar, kind="stable")
+        anahtar_kareler = np.searchsorted(sunum, zamanlar[np.asarray(anahtar)])
+        return cls(sunum, np.unique(anahtar_kareler), fps)
+
+    @classmethod
+    def _kare_sayisindan(cls, video_path):
+        # Ham okuma desteklenmiyor; zamanlar kare hızından, her kare ayrı aranır
+        cap = cv2.VideoCapture(video_path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            kare_sayisi = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        finally:
+            cap.release()
+        return cls(np.arange(kare_sayisi) / fps, np.arange(kare_sayisi), fps)
+
+    def __len__(self):
+        return len(self.zamanlar)
+
+    def anahtar_kare(self, no):
+        return int(self._onceki_anahtar[no])
+
+    def kare_no(self, zaman):
+        """Verilen saniyedeki (en yakın önceki) kare numarası"""
+        return max(0, int(np.searchsorted(self.zamanlar, zaman, side="right")) - 1)
+
+
+class VideoOynatici:
+    """Video dosyasını kare numarasıyla, iki yönde de adım adım oynatır.
+
+    Çözülen son kareler bellek sınırlı bir LRU tamponda tutulur. Geri giderken
+    hedefin geri_parca kadar gerisinden (en fazla anahtar kareye kadar) ileri
+    çözülür ve aradaki kareler tampona girer; art arda geri adımların çoğu
+    yeniden arama yapmaz. İleride aynı GOP içindeki karelere arama yerine ileri
+    çözülerek gidilir.
+
+    Çıkarılan keypoint'ler kare başına saklanır; daha önce görülen kareye
+    dönüldüğünde model yeniden çağrılmaz.
+    """
+
+    def __init__(self, video_path, dizin=None, tampon_mb=64, geri_parca=16):
+        self.video_path = video_path
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"Video açılamadı: {video_path}")
+        self.dizin = dizin or KareDizini.olustur(video_path)
+        self.tampon_bayt = int(tampon_mb * 1024 * 1024)
+        # Geri adımda tek aramayla çözülüp tampona alınan en fazla kare
+        self.geri_parca = max(1, geri_parca)
+
+        # cap'in bir sonraki read() ile vereceği kare
+        self._konum = 0
+        self._tampon = OrderedDict()
+        self._tampon_boyutu = 0
+
+        kare_sayisi = len(self.dizin)
+        self.keypoints = np.zeros((kare_sayisi, 17, 3), dtype=np.float32)
+        self.tespit = np.zeros(kare_sayisi, dtype=bool)
+        self.cikarildi = np.zeros(kare_sayisi, dtype=bool)
+        self.frame_height = 0
+
+        self.arama_sayisi = 0
+        self.cozulen_kare = 0
+        self.tampon_isabeti = 0
+        self.model_cagrisi = 0
+        self.yeniden_kullanilan = 0
+
+    def __len__(self):
+        return len(self.dizin)
+
+    def kapat(self):
+        self.cap.release()
+        self._tampon.clear()
+
+    def kare(self, no):
+        """no. kareyi (BGR) döndürür; video dışındaysa veya okunamazsa None"""
+        if not 0 <= no < len(self.dizin):
+            return None
+        frame = self._tampon.get(no)
+        if frame is not None:
+            self._tampon.move_to_end(no)
+            self.tampon_isabeti += 1
+            return frame
+
+        if no < self._konum:
+            # Geri: birkaç kare geriden (anahtar kareden öteye gitmeden) ileri çöz
+            parca = min(self.geri_parca, self._tampon_boyutu)
+            self._ara(max(self.dizin.anahtar_kare(no), no - parca + 1, 0))
+        elif self.dizin.anahtar_kare(no) > self._konum:
+            # Arada anahtar kare var; arama ileri çözmekten ucuz
+            self._ara(no)
+
+        while self._konum <= no:
+            basarili, frame = self.cap.read()
+            if not basarili:
+                return None
+            self._konum += 1
+            self.cozulen_kare += 1
+            self._tampona_koy(self._konum - 1, frame)
+        return frame
+
+    def _ara(self, no):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, no)
+        self._konum = no
+        self.arama_sayisi += 1
+
+    def _tampona_koy(self, no, frame):
+        if not self._tampon_boyutu:
+            # Tampon kaç kare tutacak, ilk kare boyutundan belirlenir
+            self._tampon_boyutu = max(2, self.tampon_bayt // max(frame.nbytes, 1))
+            self.frame_height = frame.shape[0]
+        self._tampon[no] = frame
+        self._tampon.move_to_end(no)
+        while len(self._tampon) > self._tampon_boyutu:
+            self._tampon.popitem(last=False)
+
+    def keypoint(self, no, frame, cikarim):
+        """Kare için saklanan keypoint'leri, yoksa cikarim(frame) sonucunu saklayıp döndürür.
+
+        cikarim tek kişilik (17, 3) keypoint veya kişi yoksa None döndürmelidir.
+        """
+        if self.cikarildi[no]:
+            self.yeniden_kullanilan += 1
+            return self.keypoints[no] if self.tespit[no] else None
+        keypoints = cikarim(frame)
+        self.model_cagrisi += 1
+        self.cikarildi[no] = True
+        if keypoints is not None:
+            self.keypoints[no] = keypoints[:17]
+            self.tespit[no] = True
+        return keypoints
+
+    def kayittan_yukle(self, kayit):
+        """Önbellekteki keypoint kaydını (aynı kare sayısında ise) saklanan keypoint'lere alır"""
+        if len(kayit) != len(self.dizin):
+            return False
+        self.keypoints[:] = kayit.keypoints
+        self.tespit[:] = kayit.tespit
+        self.cikarildi[:] = True
+        self.frame_height = kayit.meta.get("frame_height", self.frame_height)
+        return True
+
+    def kayit(self, meta):
+        """Bütün kareler çıkarıldıysa önbelleğe yazılabilecek kayıt, değilse None"""
+        if not len(self.dizin) or not self.cikarildi.all():
+            return None
+        return KayitliKeypointler(self.keypoints, self.dizin.zamanlar, self.tespit, meta)
+
+    def istatistik(self):
+        return {
+            "kare_sayisi": len(self.dizin),
+            "anahtar_kare": len(self.dizin.anahtar_kareler),
+            "arama": self.arama_sayisi,
+            "cozulen_kare": self.cozulen_kare,
+            "tampon_isabeti": self.tampon_isabeti,
+            "model_cagrisi": self.model_cagrisi,
+            "yeniden_kullanilan": self.yeniden_kullanilan,
+        }
+
+
+def iskelet_ciz(frame, keypoints):
+    """Keypoint'leri modelin kendi çizimiyle aynı renklerde kopya kare üzerine çizer"""
+    # ultralytics içe aktarımı saniyeler sürer; önbellekten oynatmada ilk çizime kadar ertelenir
+    from ultralytics.utils.plotting import Annotator
+
+    cizim = Annotator(frame.copy())
+    if keypoints is not None:
+        cizim.kpts(np.asarray(keypoints), frame.shape[:2])
+    return cizim.result()
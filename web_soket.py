@@ -0,0 +1,211 @@
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+# RFC 6455 el sıkışmasında istemci anahtarına eklenen sabit
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+METIN, IKILI, KAPAT, PING, PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+_DEVAM = 0x0
+
+VARSAYILAN_EN_BUYUK_MESAJ = 16 * 1024 * 1024
+
+
+class WebSoketHatasi(Exception):
+    pass
+
+
+async def _basliklari_oku(reader):
+    basliklar = {}
+    while True:
+        satir = await reader.readline()
+        if satir in (b"\r\n", b"\n", b""):
+            return basliklar
+        ad, _, deger = satir.decode("latin-1").partition(":")
+        basliklar[ad.strip().lower()] = deger.strip()
+
+
+async def http_istegi_oku(reader):
+    """İstek satırını ve başlıkları okur; (yöntem, yol, sorgu sözlüğü, başlıklar) döndürür"""
+    satir = await reader.readline()
+    if not satir:
+        raise WebSoketHatasi("Bağlantı istek gelmeden kapandı")
+    try:
+        yontem, hedef, _ = satir.decode("latin-1").split()
+    except ValueError:
+        raise WebSoketHatasi(f"Geçersiz istek satırı: {satir[:80]!r}")
+    basliklar = await _basliklari_oku(reader)
+    adres = urlsplit(hedef)
+    return yontem, adres.path, dict(parse_qsl(adres.query)), basliklar
+
+
+def yukseltme_istegi_mi(basliklar):
+    return ("websocket" in basliklar.get("upgrade", "").lower()
+            and "sec-websocket-key" in basliklar)
+
+
+def _kabul_anahtari(anahtar):
+    return base64.b64encode(hashlib.sha1((anahtar + _GUID).encode()).digest()).decode()
+
+
+def yukseltme_yaniti(basliklar):
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {_kabul_anahtari(basliklar['sec-websocket-key'])}\r\n"
+            "\r\n").encode()
+
+
+def http_yaniti(durum, govde, icerik_turu="text/plain; charset=utf-8"):
+    if isinstance(govde, str):
+        govde = govde.encode("utf-8")
+    return (f"HTTP/1.1 {durum}\r\n"
+            f"Content-Type: {icerik_turu}\r\n"
+            f"Content-Length: {len(govde)}\r\n"
+            "Connection: close\r\n"
+            "\r\n").encode() + govde
+
+
+def _maskele(veri, maske):
+    # Bayt bayt XOR Python döngüsünde yavaş; JPEG kareleri için dizi üzerinden yapılır
+    dizi = np.frombuffer(veri, dtype=np.uint8)
+    return (dizi ^ np.resize(np.frombuffer(maske, dtype=np.uint8), len(dizi))).tobytes()
+
+
+class WebSoket:
+    """asyncio akışları üzerinde en temel RFC 6455 WebSocket bağlantısı.
+
+    Metin ve ikili mesajlar, parçalı mesajlar, ping/pong ve kapanış desteklenir;
+    uzantı (sıkıştırma) ve alt protokol yoktur. İstemci tarafında giden
+    çerçeveler standardın istediği gibi maskelenir.
+    """
+
+    def __init__(self, reader, writer, istemci=False, en_buyuk_mesaj=VARSAYILAN_EN_BUYUK_MESAJ):
+        self.reader = reader
+        self.writer = writer
+        self.istemci = istemci
+        self.en_buyuk_mesaj = en_buyuk_mesaj
+        self.kapandi = False
+
+    async def _cerceve_oku(self):
+        bas = await self.reader.readexactly(2)
+        fin = bas[0] & 0x80
+        kod = bas[0] & 0x0F
+        maskeli = bas[1] & 0x80
+        uzunluk = bas[1] & 0x7F
+        if uzunluk == 126:
+            uzunluk = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif uzunluk == 127:
+            uzunluk = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if uzunluk > self.en_buyuk_mesaj:
+            raise WebSoketHatasi(f"Mesaj çok büyük: {uzunluk} bayt")
+        maske = await self.reader.readexactly(4) if maskeli else None
+        veri = await self.reader.readexactly(uzunluk)
+        if maske is not None:
+            veri = _maskele(veri, maske)
+        return fin, kod, veri
+
+    def _cerceve_yaz(self, kod, veri):
+        bas = bytearray([0x80 | kod])
+        maske_biti = 0x80 if self.istemci else 0
+        if len(veri) < 126:
+            bas.append(maske_biti | len(veri))
+        elif len(veri) < 1 << 16:
+            bas.append(maske_biti | 126)
+            bas += struct.pack("!H", len(veri))
+        else:
+            bas.append(maske_biti | 127)
+            bas += struct.pack("!Q", len(veri))
+        if self.istemci:
+            maske = os.urandom(4)
+            bas += maske
+            veri = _maskele(veri, maske)
+        self.writer.write(bytes(bas) + veri)
+
+    async def al(self):
+        """Sıradaki mesajı str (metin) veya bytes (ikili) olarak döndürür; kapanınca None"""
+        parcalar = []
+        mesaj_kodu = None
+        while not self.kapandi:
+            try:
+                fin, kod, veri = await self._cerceve_oku()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.kapandi = True
+                return None
+            if kod == PING:
+                self._cerceve_yaz(PONG, veri)
+                await self.writer.drain()
+                continue
+            if kod == PONG:
+                continue
+            if kod == KAPAT:
+                if not self.kapandi:
+                    self.kapandi = True
+                    self._cerceve_yaz(KAPAT, veri[:2])
+                    await self.writer.drain()
+                return None
+            if kod != _DEVAM:
+                mesaj_kodu = kod
+            parcalar.append(veri)
+            if sum(map(len, parcalar)) > self.en_buyuk_mesaj:
+                raise WebSoketHatasi("Parçalı mesaj çok büyük")
+            if fin:
+                veri = b"".join(parcalar)
+                if mesaj_kodu != METIN:
+                    return veri
+                try:
+                    return veri.decode("utf-8")
+                except UnicodeDecodeError as hata:
+                    # RFC 6455: geçersiz UTF-8 metin bağlantıyı 1007 koduyla kapatır
+                    await self.kapat(1007)
+                    raise WebSoketHatasi(f"Metin mesajı geçerli UTF-8 değil: {hata}")
+        return None
+
+    async def gonder(self, veri):
+        if isinstance(veri, str):
+            self._cerceve_yaz(METIN, veri.encode("utf-8"))
+        else:
+            self._cerceve_yaz(IKILI, bytes(veri))
+        await self.writer.drain()
+
+    async def kapat(self, kod=1000):
+        if not self.kapandi:
+            self.kapandi = True
+            try:
+                self._cerceve_yaz(KAPAT, struct.pack("!H", kod))
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+        self.writer.close()
+
+
+async def baglan(adres, en_buyuk_mesaj=VARSAYILAN_EN_BUYUK_MESAJ):
+    """ws://sunucu:port/yol?sorgu adresine bağlanıp istemci WebSoket'i döndürür"""
+    parca = urlsplit(adres)
+    if parca.scheme != "ws":
+        raise WebSoketHatasi(f"Yalnızca ws:// adresleri desteklenir: {adres}")
+    reader, writer = await asyncio.open_connection(parca.hostname, parca.port or 80)
+    anahtar = base64.b64encode(os.urandom(16)).decode()
+    yol = parca.path or "/"
+    if parca.query:
+        yol += "?" + parca.query
+    writer.write((f"GET {yol} HTTP/1.1\r\n"
+                  f"Host: {parca.hostname}:{parca.port or 80}\r\n"
+                  "Upgrade: websocket\r\n"
+                  "Connection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {anahtar}\r\n"
+                  "Sec-WebSocket-Version: 13\r\n"
+                  "\r\n").encode())
+    await writer.drain()
+
+    durum = await reader.readline()
+    basliklar = await _basliklari_oku(reader)
+    if b" 101 " not in durum or basliklar.get("sec-websocket-accept") != _kabul_anahtari(anahtar):
+        writer.close()
+        raise WebSoketHatasi(f"WebSocket el sıkışması başarısız: {durum.decode('latin-1').strip()}")
+    return WebSoket(reader, writer, istemci=True, en_buyuk_mesaj=en_buyuk_mesaj)
@@ -0,0 +1,192 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+
+from analiz_sunucusu import VARSAYILAN_PORT, kare_mesaji
+from web_soket import baglan
+
+
+def video_mesajlari(video_path, en_fazla_kare=None, kalite=80):
+    """Videonun karelerini zamanlarıyla birlikte JPEG kare mesajlarına çevirir"""
+    from boru_hatti import video_kare_zamani
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    mesajlar, zamanlar = [], []
+    try:
+        while en_fazla_kare is None or len(mesajlar) < en_fazla_kare:
+            basarili, frame = cap.read()
+            if not basarili:
+                break
+            zaman = video_kare_zamani(cap, len(mesajlar), video_fps)
+            _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, kalite])
+            mesajlar.append(kare_mesaji(jpeg.tobytes(), zaman))
+            zamanlar.append(zaman)
+    finally:
+        cap.release()
+    return mesajlar, zamanlar
+
+
+def keypoint_mesajlari(kayit, en_fazla_kare=None):
+    """Önbellekteki keypoint kaydını, kişi bulunan kareler için JSON mesajlarına çevirir"""
+    frame_height = kayit.meta["frame_height"]
+    mesajlar, zamanlar = [], []
+    for no in np.flatnonzero(kayit.tespit)[:en_fazla_kare]:
+        zaman = float(kayit.zamanlar[no])
+        mesajlar.append(json.dumps({"keypoints": np.round(kayit.keypoints[no], 2).tolist(),
+                                    "frame_height": frame_height, "zaman": zaman}))
+        zamanlar.append(zaman)
+    return mesajlar, zamanlar
+
+
+async def _oturum_calistir(adres, mesajlar, zamanlar, gecikmeler, hiz):
+    """Mesajları sırayla gönderip her yanıtı bekler; son yanıtı döndürür"""
+    soket = await baglan(adres)
+    yanit = None
+    try:
+        baslangic = time.perf_counter()
+        for mesaj, zaman in zip(mesajlar, zamanlar):
+            if hiz:
+                # Gerçek kamera gibi kareler zamanında gönderilir
+                bekle = baslangic + (zaman - zamanlar[0]) / hiz - time.perf_counter()
+                if bekle > 0:
+                    await asyncio.sleep(bekle)
+            gonderim = time.perf_counter()
+            await soket.gonder(mesaj)
+            metin = await soket.al()
+            if metin is None:
+                raise ConnectionError("Sunucu bağlantıyı kapattı")
+            gecikmeler.append(time.perf_counter() - gonderim)
+            yanit = json.loads(metin)
+            if "hata" in yanit:
+                raise ValueError(yanit["hata"])
+    finally:
+        await soket.kapat()
+    return yanit
+
+
+async def yuk_uret(adres, mesajlar, zamanlar, oturum_sayisi, hiz=None):
+    """oturum_sayisi bağlantıyı aynı anda açıp aynı mesajları gönderir; ölçümleri döndürür"""
+    gecikmeler = []
+    baslangic = time.perf_counter()
+    yanitlar = await asyncio.gather(
+        *(_oturum_calistir(adres, mesajlar, zamanlar, gecikmeler, hiz) for _ in range(oturum_sayisi)),
+        return_exceptions=True)
+    gecen = time.perf_counter() - baslangic
+
+    hatalar = [str(yanit) for yanit in yanitlar if isinstance(yanit, BaseException)]
+    sonlar = [yanit for yanit in yanitlar if not isinstance(yanit, BaseException)]
+    gecikme = np.asarray(gecikmeler) * 1000
+    return {
+        "oturum_sayisi": oturum_sayisi,
+        "mesaj_sayisi": len(gecikmeler),
+        "sure": gecen,
+        "mesaj_hizi": len(gecikmeler) / gecen if gecen > 0 else 0,
+        "gecikme_ms": {
+            yuzde: float(np.percentile(gecikme, yuzde)) if len(gecikme) else 0.0 for yuzde in (50, 95, 99)
+        },
+        # Oturumlar aynı mesajları gönderdi; birbirini etkilemiyorsa sayaçlar aynı olmalı
+        "sayaclar": [yanit["sayaclar"] if yanit else {} for yanit in sonlar],
+        "modlar": [yanit["mod"] if yanit else "" for yanit in sonlar],
+        "hatalar": hatalar,
+    }
+
+
+def sunucu_durumu(host, port):
+    with urllib.request.urlopen(f"http://{host}:{port}/durum", timeout=5) as yanit:
+        return json.load(yanit)
+
+
+def raporu_yazdir(rapor):
+    gecikme = rapor["gecikme_ms"]
+    print(f"{rapor['oturum_sayisi']} oturum | {rapor['mesaj_sayisi']} mesaj | {rapor['sure']:.2f} sn | "
+          f"{rapor['mesaj_hizi']:.1f} mesaj/sn | gecikme p50 {gecikme[50]:.1f} ms, "
+          f"p95 {gecikme[95]:.1f} ms, p99 {gecikme[99]:.1f} ms")
+    cikarim = rapor.get("sunucu", {}).get("cikarim")
+    if cikarim and cikarim["parti_sayisi"]:
+        print(f"Sunucu: {cikarim['parti_sayisi']} parti, ortalama {cikarim['ortalama_parti']:.2f} kare, "
+              f"çıkarım {cikarim['cikarim_fps']:.1f} fps")
+    farkli = {json.dumps(sayac, sort_keys=True) for sayac in rapor["sayaclar"]}
+    if len(farkli) > 1:
+        print(f"UYARI: oturumların sayaçları farklı: {sorted(farkli)}")
+    elif rapor["sayaclar"]:
+        sayac = rapor["sayaclar"][0]
+        mod = rapor["modlar"][0]
+        print(f"Her oturumda: {mod or 'tanınamadı'} {sayac.get(mod, 0)} tekrar")
+    for hata in rapor["hatalar"]:
+        print(f"HATA: {hata}", file=sys.stderr)
+
+
+def yuk_main(argv):
+    """python spor_gui.py yuk <video> komutunu çalıştırır"""
+    from egzersiz_tanima import OTOMATIK
+    from keypoint_onbellek import KeypointOnbellegi
+    from model_deposu import MODEL_YOLU
+    from spor_gui import MODLAR, onbellek_argumanlari_ekle, onbellek_ayarlari
+
+    parser = argparse.ArgumentParser(prog="spor_gui.py yuk",
+                                     description="Analiz sunucusuna aynı anda birçok oturum açıp "
+                                                 "gecikme ve hızı ölçer")
+    parser.add_argument("video", help="Oturumların göndereceği video")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=VARSAYILAN_PORT)
+    parser.add_argument("--oturum", type=int, nargs="+", default=[1, 4, 8],
+                        help="Denenecek eşzamanlı oturum sayıları (varsayılan: 1 4 8)")
+    parser.add_argument("--mode", default=OTOMATIK, choices=MODLAR + [OTOMATIK])
+    parser.add_argument("--kare", type=int, default=None, help="Oturum başına en fazla kare")
+    parser.add_argument("--keypoint", action="store_true",
+                        help="JPEG yerine önbellekteki keypoint'leri gönder (çıkarımsız, analiz yükü)")
+    parser.add_argument("--hiz", type=float, default=None,
+                        help="Kareleri video zamanına göre bu hızda gönder (1: gerçek zaman; "
+                             "varsayılan: yanıt gelir gelmez)")
+    parser.add_argument("--rapor", default=None, help="Ölçümlerin yazılacağı JSON dosyası")
+    onbellek_argumanlari_ekle(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.keypoint:
+            onbellek = KeypointOnbellegi(args.onbellek, args.onbellek_mb)
+            kayit = onbellek.oku(onbellek.anahtar(args.video, MODEL_YOLU, onbellek_ayarlari()))
+            if kayit is None:
+                print(f"Önbellekte keypoint yok; önce çalıştırın: spor_gui.py analyze {args.video}",
+                      file=sys.stderr)
+                return 1
+            mesajlar, zamanlar = keypoint_mesajlari(kayit, args.kare)
+        else:
+            mesajlar, zamanlar = video_mesajlari(args.video, args.kare)
+    except IOError as hata:
+        print(hata, file=sys.stderr)
+        return 1
+
+    adres = f"ws://{args.host}:{args.port}/analiz?mod={args.mode}"
+    raporlar = []
+    for oturum_sayisi in args.oturum:
+        try:
+            oncesi = sunucu_durumu(args.host, args.port)["cikarim"]
+            rapor = asyncio.run(yuk_uret(adres, mesajlar, zamanlar, oturum_sayisi, args.hiz))
+            sonrasi = sunucu_durumu(args.host, args.port)["cikarim"]
+        except OSError as hata:
+            print(f"Sunucuya bağlanılamadı ({args.host}:{args.port}): {hata}", file=sys.stderr)
+            return 1
+        # Yalnızca bu turun partileri
+        parti = sonrasi["parti_sayisi"] - oncesi["parti_sayisi"]
+        kare = sonrasi["kare_sayisi"] - oncesi["kare_sayisi"]
+        rapor["sunucu"] = {"cikarim": {"parti_sayisi": parti, "kare_sayisi": kare,
+                                       "ortalama_parti": kare / parti if parti else 0,
+                                       "cikarim_fps": sonrasi["cikarim_fps"]}}
+        raporu_yazdir(rapor)
+        raporlar.append(rapor)
+
+    if args.rapor:
+        with open(args.rapor, "w", encoding="utf-8") as f:
+            json.dump(raporlar, f, ensure_ascii=False, indent=2)
+        print(f"Rapor kaydedildi: {args.rapor}")
+    return 1 if any(rapor["hatalar"] for rapor in raporlar) else 0
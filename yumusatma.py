@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+
+from ozellikler import GUVEN_ESIGI
+
+
+def _alfa(kesim, dt):
+    # Birinci derece alçak geçiren süzgecin katsayısı; kesim (Hz) ve dt (sn) dizi olabilir
+    tau = 1.0 / (2 * math.pi * kesim)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class KeypointYumusatici:
+    """Model keypoint'lerindeki titremeyi One-Euro süzgeciyle akış halinde bastırır.
+
+    Her iz (tek kişide 0, çoklu kişide takip kimliği) için konum, hız ve güven
+    paralel NumPy dizilerinde tutulur; karedeki bütün kişilerin 17 noktası tek
+    seferde güncellenir. Yavaş hareketlerde kesim frekansı min_kesim'e iner ve
+    titreme bastırılır, hızlı hareketlerde beta ile yükselir ve gecikme azalır.
+    Hız kare yüksekliğine oranla ölçülür, ayarlar çözünürlükten bağımsızdır.
+
+    Güncelleme noktanın güveniyle ağırlıklanır: tam_guven ve üstü tam adım,
+    altı orantılı olarak daha küçük adım atar; güveni sıfır olan nokta yerinde
+    kalır. Güven de ayrıca süzülür, böylece eşik çevresinde gidip gelen bir nokta
+    analizcide her karede geçerli/geçersiz arasında sıçramaz.
+    """
+
+    def __init__(self, min_kesim=1.0, beta=1.0, d_kesim=1.0, tam_guven=GUVEN_ESIGI, kayip_suresi=0.5,
+                 kapasite=4):
+        self.min_kesim = min_kesim
+        self.beta = beta
+        self.d_kesim = d_kesim
+        self.tam_guven = tam_guven
+        # Bu süreden uzun görülmeyen iz, sonraki gözlemde sıfırdan başlar
+        self.kayip_suresi = kayip_suresi
+
+        self._satirlar = {}
+        self._bos = []
+        self._x = np.zeros((kapasite, 17, 2))
+        self._dx = np.zeros((kapasite, 17, 2))
+        self._guven = np.zeros((kapasite, 17))
+        self._zaman = np.full(kapasite, -np.inf)
+        self._bos.extend(range(kapasite - 1, -1, -1))
+
+    def sifirla(self):
+        self._bos.extend(self._satirlar.values())
+        self._satirlar.clear()
+
+    def birak(self, kimlikler):
+        """Takipten düşen izlerin satırlarını yeniden kullanıma açar"""
+        for kimlik in kimlikler:
+            satir = self._satirlar.pop(kimlik, None)
+            if satir is not None:
+                self._bos.append(satir)
+
+    def _satir_al(self, kimlik):
+        satir = self._satirlar.get(kimlik)
+        if satir is None:
+            if not self._bos:
+                self._buyut()
+            satir = self._bos.pop()
+            self._zaman[satir] = -np.inf
+            self._satirlar[kimlik] = satir
+        return satir
+
+    def _buyut(self):
+        eski = len(self._zaman)
+        self._x = np.concatenate([self._x, np.zeros_like(self._x)])
+        self._dx = np.concatenate([self._dx, np.zeros_like(self._dx)])
+        self._guven = np.concatenate([self._guven, np.zeros_like(self._guven)])
+        self._zaman = np.concatenate([self._zaman, np.full(eski, -np.inf)])
+        self._bos.extend(range(2 * eski - 1, eski - 1, -1))
+
+    def guncelle(self, kimlikler, keypoints, zaman, frame_height):
+        """(P, 17, 3) keypoint'leri kimlik sırasıyla süzer, aynı biçimde float32 döndürür"""
+        kp = np.asarray(keypoints, dtype=np.float64).reshape(-1, 17, 3)
+        satirlar = np.array([self._satir_al(k) for k in kimlikler], dtype=np.intp)
+        if not len(satirlar):
+            return np.zeros((0, 17, 3), dtype=np.float32)
+
+        gecen = zaman - self._zaman[satirlar]
+        yeni = ~(gecen <= self.kayip_suresi)
+        dt = np.maximum(gecen, 1e-3)[:, None]
+
+        xy = kp[..., :2]
+        guven = kp[..., 2]
+        x = self._x[satirlar]
+        dx = self._dx[satirlar]
+        g = self._guven[satirlar]
+
+        agirlik = np.minimum(guven / self.tam_guven, 1.0)
+        a_d = agirlik * _alfa(self.d_kesim, dt)
+        dx += a_d[..., None] * ((xy - x) / dt[..., None] - dx)
+        hiz = np.sqrt(np.einsum("pjd,pjd->pj", dx, dx)) / max(frame_height, 1)
+        a = agirlik * _alfa(self.min_kesim + self.beta * hiz, dt)
+        x += a[..., None] * (xy - x)
+        g += _alfa(self.min_kesim, dt) * (guven - g)
+
+        # Yeni veya uzun süre kayıp iz gözlemin kendisiyle başlar
+        x[yeni] = xy[yeni]
+        dx[yeni] = 0.0
+        g[yeni] = guven[yeni]
+
+        self._x[satirlar] = x
+        self._dx[satirlar] = dx
+        self._guven[satirlar] = g
+        self._zaman[satirlar] = zaman
+
+        sonuc = np.empty(kp.shape, dtype=np.float32)
+        sonuc[..., :2] = x
+        sonuc[..., 2] = g
+        return sonuc
+
+    def tek(self, keypoints, zaman, frame_height):
+        """Tek kişilik (17, 3) keypoint'i süzer; kişi yoksa (None) durum değişmez"""
+        if keypoints is None:
+            return None
+        return self.guncelle((0,), keypoints[np.newaxis, :17], zaman, frame_height)[0]
+
+
+def seriyi_yumusat(keypoints, zamanlar, tespit, frame_height, **ayarlar):
+    """Kayıtlı (T, 17, 3) seriyi akıştaki süzgeçle aynı sırada süzer.
+
+    Çevrimdışı sayaç ile akış analizcisinin aynı keypoint'leri görmesi için
+    kareler tek tek aynı güncellemeden geçer; kişi bulunmayan kareler atlanır.
+    """
+    yumusatici = KeypointYumusatici(**ayarlar)
+    keypoints = np.asarray(keypoints)
+    sonuc = np.array(keypoints[:, :17], dtype=np.float32)
+    for no in np.flatnonzero(np.asarray(tespit, dtype=bool)):
+        sonuc[no] = yumusatici.tek(keypoints[no], float(zamanlar[no]), frame_height)
+    return sonuc